@@ -0,0 +1,257 @@
+"""
+Forget to Win - Weighted Sampling
+
+This module implements Vose's alias method for constant-time weighted
+draws, and a two-level sampler that weights item buckets (categories)
+and, optionally, individual items inside them.
+
+Classes:
+    - AliasTable: O(n) build, O(1) weighted draw over n outcomes
+    - BucketSampler: Weighted draws of distinct positions from index buckets
+
+Author: Development Team
+Version: 1.0
+"""
+
+from array import array
+import random
+from typing import Dict, List, Optional, Sequence
+
+
+class AliasTable:
+    """
+    Vose's alias method
+
+    Each of the n columns holds a probability and an alias. A draw picks a
+    column uniformly and keeps it or takes its alias with one comparison.
+
+    Example:
+        >>> table = AliasTable([1.0, 3.0])
+        >>> table.draw(random.Random(0)) in (0, 1)
+        True
+    """
+
+    def __init__(self, weights: Sequence[float]):
+        """
+        Args:
+            weights (Sequence[float]): Non-negative weight per outcome
+
+        Raises:
+            ValueError: If there are no outcomes or all weights are zero
+        """
+        n = len(weights)
+        total = float(sum(weights))
+        if n == 0 or total <= 0:
+            raise ValueError("Alias table needs a positive total weight")
+        if any(w < 0 for w in weights):
+            raise ValueError("Weights must be non-negative")
+
+        self._size = n
+        self._prob = array("d", bytes(8 * n))
+        self._alias = array("I", bytes(4 * n))
+
+        scaled = [w * n / total for w in weights]
+        small = [i for i, p in enumerate(scaled) if p < 1.0]
+        large = [i for i, p in enumerate(scaled) if p >= 1.0]
+
+        while small and large:
+            s = small.pop()
+            g = large.pop()
+            self._prob[s] = scaled[s]
+            self._alias[s] = g
+            scaled[g] = (scaled[g] + scaled[s]) - 1.0
+            (small if scaled[g] < 1.0 else large).append(g)
+
+        # Leftovers are 1.0 up to rounding error
+        for i in large + small:
+            self._prob[i] = 1.0
+            self._alias[i] = i
+
+    def __len__(self) -> int:
+        return self._size
+
+    def draw(self, rng: random.Random = None) -> int:
+        """Draw one outcome index in O(1)"""
+        rng = rng or random
+        column = rng.randrange(self._size)
+        return column if rng.random() < self._prob[column] else self._alias[column]
+
+
+class BucketSampler:
+    """
+    Weighted sampling of distinct positions from a list of index buckets
+
+    The outer alias table picks a bucket by its total weight; the position
+    inside the bucket is uniform, or drawn from a per-bucket alias table
+    when individual items carry their own weights. Building costs O(b)
+    for b buckets, plus O(m) for buckets holding item weights.
+    """
+
+    # Rejection draws per requested item before switching to exact sampling
+    MAX_REJECTIONS = 32
+
+    def __init__(
+        self,
+        buckets: List[Sequence[int]],
+        bucket_weights: Sequence[float],
+        item_weights: Optional[List[Optional[Sequence[float]]]] = None
+    ):
+        """
+        Args:
+            buckets (List[Sequence[int]]): Position sequences
+            bucket_weights (Sequence[float]): Weight of each item in the bucket
+            item_weights (List[Sequence[float] or None], optional): Per-bucket
+                multipliers for individual items; None keeps a bucket uniform
+
+        Raises:
+            ValueError: If every bucket has zero total weight
+        """
+        item_weights = item_weights or [None] * len(buckets)
+        self.buckets = []
+        self._inner: List[Optional[AliasTable]] = []
+        self._uniform: List[float] = []
+        self._weights: List[Optional[List[float]]] = []
+        totals = []
+        self.support = 0
+
+        for bucket, weight, multipliers in zip(buckets, bucket_weights, item_weights):
+            if multipliers is None:
+                total = weight * len(bucket)
+                inner = None
+                support = len(bucket) if weight > 0 else 0
+                weights = None
+            else:
+                weights = [weight * m for m in multipliers]
+                total = sum(weights)
+                inner = AliasTable(weights) if total > 0 else None
+                support = sum(1 for w in weights if w > 0)
+            if total <= 0:
+                continue
+            self.buckets.append(bucket)
+            self._inner.append(inner)
+            self._uniform.append(weight)
+            self._weights.append(weights)
+            totals.append(total)
+            self.support += support
+
+        self._outer = AliasTable(totals)
+
+    def draw(self, rng: random.Random = None) -> int:
+        """Draw one position (with replacement) in O(1)"""
+        rng = rng or random
+        b = self._outer.draw(rng)
+        inner = self._inner[b]
+        bucket = self.buckets[b]
+        return bucket[inner.draw(rng) if inner is not None else rng.randrange(len(bucket))]
+
+    def sample(self, count: int, rng: random.Random = None) -> List[int]:
+        """
+        Draw ``count`` distinct positions
+
+        Repeats are rejected, which matches successive weighted draws
+        without replacement. If a heavily skewed profile keeps producing
+        repeats, the remainder is drawn exactly over the remaining items.
+
+        Raises:
+            ValueError: If fewer than ``count`` positions have positive weight
+        """
+        rng = rng or random
+        if count > self.support:
+            raise ValueError(f"Only {self.support} items have positive weight, {count} requested")
+
+        chosen: Dict[int, None] = {}
+        attempts = self.MAX_REJECTIONS * count
+        while len(chosen) < count and attempts > 0:
+            chosen[self.draw(rng)] = None
+            attempts -= 1
+
+        if len(chosen) < count:
+            self._fill_exact(chosen, count, rng)
+        return list(chosen)
+
+    def _fill_exact(self, chosen: Dict[int, None], count: int, rng: random.Random):
+        """Slow path: successive weighted draws over items not chosen yet"""
+        positions = []
+        weights = []
+        for bucket, uniform, item_weights in zip(self.buckets, self._uniform, self._weights):
+            for i, position in enumerate(bucket):
+                w = item_weights[i] if item_weights is not None else uniform
+                if w > 0 and position not in chosen:
+                    positions.append(position)
+                    weights.append(w)
+
+        while len(chosen) < count:
+            i = rng.choices(range(len(positions)), weights)[0]
+            chosen[positions[i]] = None
+            weights[i] = 0.0
+
+
+def test_alias_sampler():
+    """Test function to verify draw frequencies and distinct sampling"""
+    print("\n" + "=" * 60)
+    print("  Weighted Sampling Test Suite")
+    print("=" * 60 + "\n")
+
+    rng = random.Random(7)
+    draws = 200000
+
+    # Test 1: Draw frequencies follow the weights
+    print("[OK] Test 1: Alias Table Frequencies")
+    weights = [1.0, 3.0, 0.0, 6.0, 0.5]
+    table = AliasTable(weights)
+    counts = [0] * len(weights)
+    for _ in range(draws):
+        counts[table.draw(rng)] += 1
+    total = sum(weights)
+    worst = max(abs(count / draws - w / total) for count, w in zip(counts, weights))
+    assert counts[2] == 0, "A zero weight must never be drawn"
+    assert worst < 0.01, worst
+    print(f"   {draws:,} draws over {len(weights)} outcomes, worst frequency error {worst:.2%}")
+    print()
+
+    # Test 2: Invalid weights are rejected
+    print("[OK] Test 2: Invalid Weights")
+    for bad in ([], [0.0, 0.0], [1.0, -1.0]):
+        try:
+            AliasTable(bad)
+        except ValueError:
+            pass
+        else:
+            raise AssertionError(f"{bad} must be rejected")
+    print()
+
+    # Test 3: Bucket weights and item multipliers combine
+    print("[OK] Test 3: Bucket Sampler Frequencies")
+    sampler = BucketSampler([[0, 1], [2, 3], [4]], [1.0, 2.0, 0.0], [None, [1.0, 3.0], None])
+    expected = {0: 1.0, 1: 1.0, 2: 2.0, 3: 6.0}
+    counts = dict.fromkeys(expected, 0)
+    for _ in range(draws):
+        counts[sampler.draw(rng)] += 1
+    total = sum(expected.values())
+    worst = max(abs(counts[p] / draws - w / total) for p, w in expected.items())
+    assert worst < 0.01, worst
+    assert sampler.support == 4
+    print(f"   Two-level weights within {worst:.2%}; zero-weight bucket dropped")
+    print()
+
+    # Test 4: Samples are distinct, even when repeats keep being drawn
+    print("[OK] Test 4: Distinct Samples")
+    skewed = BucketSampler([list(range(10))], [1.0], [[1e6] + [1.0] * 9])
+    sample = skewed.sample(10, rng)
+    assert sorted(sample) == list(range(10)) and sample[0] == 0
+    try:
+        sampler.sample(5, rng)
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("Sampling more items than have weight must fail")
+    print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Weighted Sampling Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_alias_sampler()
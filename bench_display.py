@@ -0,0 +1,81 @@
+"""
+Benchmark - ItemDisplay rendering on large boards
+
+Compares the cached, join-based ItemDisplay builders with the previous
+per-call formatting and ``box += ...`` concatenation on 10k-item boards.
+
+Run:
+    python bench_display.py
+"""
+
+import timeit
+
+from item_pool import Item, ItemDisplay
+
+BOARD_SIZE = 10_000
+REPEAT = 5
+
+
+def legacy_format_grid(items, columns=3):
+    """Previous format_grid: formats every fragment on every call"""
+    lines = []
+    for i in range(0, len(items), columns):
+        row_parts = []
+        for item in items[i:i + columns]:
+            symbol = "[+]" if item.is_good else "[-]"
+            color = "green" if item.is_good else "red"
+            row_parts.append(f"[{color}]{symbol}  {item.text:<20}[/{color}]")
+        lines.append("  " + "  ".join(row_parts))
+    return "\n".join(lines)
+
+
+def legacy_create_display_box(content, title=""):
+    """Previous create_display_box: grows the output with repeated +="""
+    lines = content.split("\n")
+    max_width = max(len(line) for line in lines) if lines else 0
+    width = max(max_width, len(title)) + 4
+    if title:
+        box = f"+{'-' * (width - 2)}+\n"
+        box += f"| {title.center(width - 4)} |\n"
+        box += f"+{'-' * (width - 2)}+\n"
+    else:
+        box = f"+{'-' * (width - 2)}+\n"
+    for line in lines:
+        box += f"| {line.ljust(width - 4)} |\n"
+    box += f"+{'-' * (width - 2)}+\n"
+    return box
+
+
+def best_ms(stmt) -> float:
+    """Best of REPEAT single runs, in milliseconds"""
+    return min(timeit.repeat(stmt, number=1, repeat=REPEAT)) * 1000
+
+
+def main():
+    board = [Item(f"Item {i}", i % 2 == 0, f"category_{i % 8}") for i in range(BOARD_SIZE)]
+    content = legacy_format_grid(board)
+
+    # Same output before timing anything
+    assert ItemDisplay.format_grid(board) == legacy_format_grid(board)
+    assert ItemDisplay.create_display_box(content, "Board") == legacy_create_display_box(content, "Board")
+
+    ItemDisplay.render_fragment.cache_clear()
+    cold = best_ms(lambda: (ItemDisplay.render_fragment.cache_clear(), ItemDisplay.format_grid(board)))
+    warm = best_ms(lambda: ItemDisplay.format_grid(board))
+    legacy_grid = best_ms(lambda: legacy_format_grid(board))
+    recall = best_ms(lambda: ItemDisplay.format_recall_list(board))
+    box = best_ms(lambda: ItemDisplay.create_display_box(content, "Board"))
+    legacy_box = best_ms(lambda: legacy_create_display_box(content, "Board"))
+
+    print(f"\nItemDisplay rendering, {BOARD_SIZE:,}-item board (best of {REPEAT})\n")
+    print(f"  {'format_grid (legacy)':<32}{legacy_grid:>10.2f} ms")
+    print(f"  {'format_grid (cold cache)':<32}{cold:>10.2f} ms")
+    print(f"  {'format_grid (warm cache)':<32}{warm:>10.2f} ms")
+    print(f"  {'format_recall_list (warm cache)':<32}{recall:>10.2f} ms")
+    print(f"  {'create_display_box (legacy +=)':<32}{legacy_box:>10.2f} ms")
+    print(f"  {'create_display_box (join)':<32}{box:>10.2f} ms")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,67 @@
+"""
+Benchmark - High score store throughput and latency
+
+Inserts games in batches into a fresh SQLite store and, at each size
+checkpoint, times the top-10 and personal-best queries.
+
+Run:
+    python bench_high_scores.py [games]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from high_scores import HighScore, HighScoreStore
+
+DEFAULT_GAMES = 1_000_000
+PLAYERS = 50_000
+QUERIES = 2_000
+
+
+def query_us(func, args) -> float:
+    """Mean latency of ``func`` over ``args``, in microseconds"""
+    start = time.perf_counter()
+    for arg in args:
+        func(arg)
+    return (time.perf_counter() - start) / len(args) * 1e6
+
+
+def main():
+    total = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_GAMES
+    checkpoints = [n for n in (10_000, 100_000, 1_000_000, 10_000_000) if n < total] + [total]
+    rng = random.Random(0)
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HighScoreStore(os.path.join(tmp, "scores.db"), batch_size=4096)
+        now = time.time()
+        inserted = 0
+        insert_time = 0.0
+
+        print(f"\nHigh score store, {PLAYERS:,} players\n")
+        print(f"  {'games':>12}{'insert/s':>14}{'top 10':>12}{'my best':>12}")
+        for checkpoint in checkpoints:
+            games = [
+                HighScore(f"player{rng.randrange(PLAYERS)}", rng.randrange(300),
+                          rng.uniform(0, 100), rng.uniform(30, 300), now + n)
+                for n in range(inserted, checkpoint)
+            ]
+            start = time.perf_counter()
+            store.record_many(games)
+            store.flush()
+            insert_time += time.perf_counter() - start
+            inserted = checkpoint
+
+            top = query_us(store.top, [10] * QUERIES)
+            players = [f"player{rng.randrange(PLAYERS)}" for _ in range(QUERIES)]
+            best = query_us(store.best, players)
+            print(f"  {inserted:>12,}{inserted / insert_time:>14,.0f}{top:>10.1f}us{best:>10.1f}us")
+
+        store.close()
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark - Game history analytics: list of dicts vs mapped columns
+
+Builds a synthetic history, then times accuracy-by-level and the
+longest-streak distribution over a list of dicts (how analysis scripts
+loaded history before) and over the memory-mapped column files.
+
+Run:
+    python bench_history.py [games]
+"""
+
+import os
+import random
+import sys
+import tempfile
+import time
+
+from event_log import GameHeader
+from game_engine import LevelResult
+from game_history import STREAK_ACCURACY, GameHistory, export_columns
+
+DEFAULT_GAMES = 200_000
+
+
+def make_games(count: int):
+    rng = random.Random(0)
+    for game_id in range(1, count + 1):
+        levels = []
+        for level in range(1, 6):
+            good, bad = level + 2, level + 1
+            correct, wrong = rng.randint(0, good), rng.randint(0, bad)
+            accuracy = (correct + bad - wrong) / (good + bad) * 100
+            levels.append(LevelResult(level, correct, good, wrong, bad, good - correct,
+                                      correct * 10, 0, correct * 10, accuracy, 30.0))
+        yield GameHeader(game_id, game_id % 5000, game_id, 0.0, sum(r.total_score for r in levels), 5), levels
+
+
+def dict_aggregates(rows):
+    sums, counts, streaks = {}, {}, {}
+    for game in rows:
+        streak = best = 0
+        for level in game["levels"]:
+            sums[level["level_number"]] = sums.get(level["level_number"], 0.0) + level["accuracy"]
+            counts[level["level_number"]] = counts.get(level["level_number"], 0) + 1
+            streak = streak + 1 if level["accuracy"] >= STREAK_ACCURACY else 0
+            best = max(best, streak)
+        streaks[best] = streaks.get(best, 0) + 1
+    return {level: sums[level] / counts[level] for level in counts}, streaks
+
+
+def timed(func):
+    start = time.perf_counter()
+    result = func()
+    return result, time.perf_counter() - start
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_GAMES
+    print(f"\nGame history analytics, {games:,} games ({games * 5:,} level rows)\n")
+
+    rows = [
+        {"game_id": header.game_id, "levels": [vars(result) for result in levels]}
+        for header, levels in make_games(games)
+    ]
+    (expected, _), dict_time = timed(lambda: dict_aggregates(rows))
+    del rows
+
+    with tempfile.TemporaryDirectory() as tmp:
+        _, export_time = timed(lambda: export_columns(make_games(games), tmp))
+        print(f"  {'export':<28}{export_time:>8.2f}s")
+        print(f"  {'list of dicts':<28}{dict_time:>8.3f}s")
+        for use_numpy in (False, True):
+            with GameHistory(tmp, use_numpy=use_numpy) as history:
+                (by_level, _), elapsed = timed(
+                    lambda: (history.accuracy_by_level(), history.streak_distribution())
+                )
+            assert all(abs(by_level[k] - expected[k]) < 1e-6 for k in expected)
+            if use_numpy and not history.use_numpy:
+                print("  (NumPy not installed)")
+                break
+            label = "columns + NumPy" if use_numpy else "columns, memoryview loops"
+            print(f"  {label:<28}{elapsed:>8.3f}s")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,66 @@
+"""
+Benchmark - Cost of the API rate limiter per request
+
+Times RateLimitMiddleware.limit() on prepared requests: a path with no
+limit, a limited path and a path under a limited prefix with the
+client's bucket already kept (the common case), then a limited path
+with a new client every time (bucket insert and eviction).
+The cost of an empty call is subtracted.
+
+Run:
+    python bench_ratelimit.py [calls]
+"""
+
+import os
+import sys
+import timeit
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "forgetwingame.settings")
+
+import django
+
+DEFAULT_CALLS = 1_000_000
+
+
+def main():
+    calls = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_CALLS
+    django.setup()
+
+    from django.test import RequestFactory
+    from game.middleware import RateLimitMiddleware, TokenBuckets
+
+    middleware = RateLimitMiddleware(lambda request: None)
+    # Limits high enough that every call is let through
+    middleware.limits = {
+        "/api/start/": TokenBuckets(1e12, 1e12, 100_000),
+    }
+    middleware.prefixes = [("/api/stream/", TokenBuckets(1e12, 1e12, 100_000))]
+    factory = RequestFactory()
+
+    def request(path, address="10.0.0.1"):
+        return factory.get(path, REMOTE_ADDR=address)
+
+    empty = timeit.timeit(lambda: None, number=calls) / calls
+    cases = [
+        ("not limited", request("/api/submit/")),
+        ("limited, known client", request("/api/start/")),
+        ("prefix, known client", request("/api/stream/0123abcd/")),
+    ]
+
+    print(f"\nRate limiter overhead, {calls:,} calls each\n")
+    for label, req in cases:
+        middleware.limit(req)
+        cost = timeit.timeit(lambda: middleware.limit(req), number=calls) / calls - empty
+        print(f"  {label:<28}{cost * 1e9:>8.0f} ns")
+
+    # A new client on every call: 1,000 distinct addresses through room for 100
+    middleware.limits["/api/start/"] = TokenBuckets(1e12, 1e12, 100)
+    crowd = [request("/api/start/", f"10.0.{n // 256}.{n % 256}") for n in range(1000)]
+    rounds = max(1, calls // len(crowd))
+    cost = timeit.timeit(lambda: [middleware.limit(req) for req in crowd], number=rounds) / (rounds * len(crowd))
+    print(f"  {'limited, client churn':<28}{(cost - empty) * 1e9:>8.0f} ns")
+    print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+"""
+Benchmark - Batch scoring vs. the scalar Python loop
+
+Rescores a block of random historical levels with
+``ScoreCalculator.score_levels_batch`` and with a loop over
+``calculate_level_score`` / ``calculate_accuracy``, and checks that both
+give the same numbers.
+
+Run:
+    python bench_scoring.py [levels]
+"""
+
+from array import array
+import random
+import sys
+import time
+
+import game_engine
+from game_engine import GameConfig, ScoreCalculator
+
+DEFAULT_LEVELS = 1_000_000
+
+
+def random_levels(count: int, seed: int = 0):
+    """Columns of random but valid level outcomes"""
+    rng = random.Random(seed)
+    configs = [GameConfig.LEVELS[level] for level in range(1, 6)]
+    columns = [array("q") for _ in range(5)]
+    for _ in range(count):
+        config = rng.choice(configs)
+        good, bad = config["good_items"], config["bad_items"]
+        for column, value in zip(columns, (
+            rng.randint(0, good), good, rng.randint(0, bad), bad, rng.randint(0, 4)
+        )):
+            column.append(value)
+    return columns
+
+
+def score_loop(correct_good, total_good, remembered_bad, total_bad, streak):
+    """Scalar path, one level at a time"""
+    results = []
+    for c, t, r, tb, s in zip(correct_good, total_good, remembered_bad, total_bad, streak):
+        base, bonus, total = ScoreCalculator.calculate_level_score(c, t, r, s)
+        results.append((base, bonus, total, ScoreCalculator.calculate_accuracy(c, t, r, tb)))
+    return results
+
+
+def timed(func, *args):
+    """(result, seconds) for one call"""
+    start = time.perf_counter()
+    result = func(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_LEVELS
+    columns = random_levels(count)
+
+    expected, loop_time = timed(score_loop, *columns)
+    timings = [("Python loop", loop_time)]
+
+    numpy_module = game_engine.np
+    backends = [("array fallback", None)]
+    if numpy_module is not None:
+        backends.insert(0, ("NumPy batch", numpy_module))
+        arrays = [numpy_module.frombuffer(column, dtype=numpy_module.int64) for column in columns]
+
+    for name, backend in backends:
+        game_engine.np = backend
+        inputs = arrays if backend is not None else columns
+        batch, elapsed = timed(ScoreCalculator.score_levels_batch, *inputs)
+        assert [tuple(v) for v in zip(*batch)] == expected, f"{name} differs from the scalar path"
+        timings.append((name, elapsed))
+    game_engine.np = numpy_module
+
+    print(f"\nRescoring {count:,} levels (results identical across all paths)\n")
+    for name, elapsed in timings:
+        rate = count / elapsed / 1e6
+        print(f"  {name:<16}{elapsed * 1000:>10.1f} ms  {rate:>8.2f} M levels/s  "
+              f"{loop_time / elapsed:>7.1f}x")
+    print()
+
+
+if __name__ == "__main__":
+    main()
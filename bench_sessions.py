@@ -0,0 +1,101 @@
+"""
+Benchmark - Game API requests per second by session engine
+
+Plays whole games through the Django test client (start, then level,
+recall, submit and next for five levels) from several threads, once per
+session engine. The database engine runs against a throwaway copy of the
+schema, never db.sqlite3.
+
+Run:
+    python bench_sessions.py [games] [threads]
+"""
+
+import os
+import sys
+import tempfile
+import threading
+import time
+
+os.environ.setdefault("DJANGO_SETTINGS_MODULE", "forgetwingame.settings")
+
+import django
+from django.conf import settings
+
+ENGINES = [
+    ("database (current)", "django.contrib.sessions.backends.db"),
+    ("memory LRU", "game.session_backends.memory"),
+    ("file, coalesced", "game.session_backends.file"),
+]
+DEFAULT_GAMES = 200
+DEFAULT_THREADS = 8
+
+
+def play(client, games: int, errors: list) -> int:
+    """Play ``games`` games; returns the number of requests made"""
+    requests = 0
+    for _ in range(games):
+        client.get("/api/start/")
+        requests += 1
+        for _ in range(5):
+            level = client.get("/api/level/").json()
+            good = {item["name"] for item in level.get("items", []) if item["is_good"]}
+            recall = client.get("/api/recall/").json()
+            selected = [item["index"] for item in recall.get("items", []) if item["name"] in good]
+            result = client.post("/api/submit/", {"selected": selected}, content_type="application/json").json()
+            if not result.get("success"):
+                errors.append(result.get("error"))
+            client.get("/api/next/")
+            requests += 4
+    return requests
+
+
+def run(engine: str, games: int, threads: int):
+    from django.test import Client
+    from django.test.utils import override_settings
+
+    with override_settings(SESSION_ENGINE=engine):
+        errors, counts = [], []
+        lock = threading.Lock()
+
+        def worker():
+            made = play(Client(), games // threads, errors)
+            with lock:
+                counts.append(made)
+
+        workers = [threading.Thread(target=worker) for _ in range(threads)]
+        start = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - start
+    return sum(counts) / elapsed, len(errors)
+
+
+def main():
+    games = int(sys.argv[1]) if len(sys.argv) > 1 else DEFAULT_GAMES
+    threads = int(sys.argv[2]) if len(sys.argv) > 2 else DEFAULT_THREADS
+
+    with tempfile.TemporaryDirectory() as tmp:
+        settings.DATABASES["default"]["NAME"] = os.path.join(tmp, "bench.sqlite3")
+        settings.GAME_SESSION_FILE_DIR = os.path.join(tmp, "sessions")
+        settings.GAME_EVENT_LOG_DIR = None
+        settings.GAME_PERCENTILE_DIR = None
+        settings.GAME_LEADERBOARD_FLUSH_SECONDS = 0
+        settings.GAME_RATE_LIMITS = {}  # Every simulated player shares one address
+        settings.ALLOWED_HOSTS = ["testserver"]
+        django.setup()
+
+        from django.core.management import call_command
+        call_command("migrate", verbosity=0)
+
+        print(f"\nGame API, {games:,} games from {threads} threads ({games * 21:,} requests)\n")
+        print(f"  {'session engine':<22}{'requests/s':>12}{'errors':>8}")
+        for label, engine in ENGINES:
+            rate, errors = run(engine, games, threads)
+            print(f"  {label:<22}{rate:>12,.0f}{errors:>8}")
+        print()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,338 @@
+"""
+Forget to Win - Catalog Validation
+
+This module checks an item catalog once, when it is built or loaded.
+Item equality compares all fields, so the same text listed as both good
+and bad would be two different items that look identical to the player
+and break the set logic in scoring. Texts are compared after
+normalizing whitespace and case.
+
+One linear pass over the catalog:
+    - hashes each normalized text to 64 bits into an open-addressing table
+      (12 bytes per slot instead of a dict of str objects)
+    - reports duplicates (same text, same polarity) and conflicts (same
+      text, opposite polarity)
+    - computes a SHA-256 digest of the catalog content, for caches and
+      generated files to use as a version key (text and category are
+      length-prefixed, so no two catalogs share an encoding)
+
+Classes:
+    - TextIndex: Normalized text -> first catalog position
+    - CatalogReport: Result of a validation pass
+    - CatalogValidator: Validation pass fed one item at a time
+
+Author: Development Team
+Version: 1.0
+"""
+
+from array import array
+from dataclasses import dataclass, field
+import hashlib
+from typing import Callable, Iterable, Optional, Tuple
+
+from item_search import normalize_name
+
+DIGEST_BATCH = 4096  # Records hashed per digest update
+
+
+def text_key(text: str) -> int:
+    """
+    64-bit hash of a normalized text (never 0, which marks empty slots)
+
+    Example:
+        >>> text_key("Deep  Work") == text_key("deep work")
+        True
+    """
+    digest = hashlib.blake2b(normalize_name(text).encode("utf-8"), digest_size=8).digest()
+    return int.from_bytes(digest, "little") | 1
+
+
+class TextIndex:
+    """
+    Open-addressing hash table from normalized text to catalog position
+
+    Keys are 64-bit text hashes stored in an ``array('Q')``, values are
+    positions in an ``array('I')``. A key match is confirmed by comparing
+    the normalized texts, so a hash collision never merges two items.
+    """
+
+    def __init__(self, capacity: int, text_of: Callable[[int], str]):
+        """
+        Args:
+            capacity (int): Number of entries to size the table for
+            text_of (Callable[[int], str]): Text at a catalog position
+        """
+        size = 8
+        while size < capacity * 2:
+            size <<= 1
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._positions = array("I", bytes(4 * size))
+        self._text_of = text_of
+        self._count = 0
+
+    @classmethod
+    def from_arrays(cls, keys, positions, count: int, text_of: Callable[[int], str]) -> "TextIndex":
+        """
+        Wrap saved table arrays (e.g. memory-mapped from a catalog sidecar)
+
+        Args:
+            keys (Sequence[int]): Slot keys, a power of two long
+            positions (Sequence[int]): Slot positions, as long as ``keys``
+            count (int): Entries in the table
+            text_of (Callable[[int], str]): Text at a catalog position
+        """
+        index = cls.__new__(cls)
+        index._mask = len(keys) - 1
+        index._keys = keys
+        index._positions = positions
+        index._text_of = text_of
+        index._count = count
+        return index
+
+    def arrays(self) -> Tuple[array, array]:
+        """The (keys, positions) table arrays, for saving"""
+        return self._keys, self._positions
+
+    def __len__(self) -> int:
+        return self._count
+
+    def _probe(self, key: int, normalized: str) -> Tuple[int, Optional[int]]:
+        """Slot for ``normalized`` and the position already stored there, if any"""
+        slot = key & self._mask
+        keys = self._keys
+        while keys[slot]:
+            if keys[slot] == key:
+                position = self._positions[slot]
+                if normalize_name(self._text_of(position)) == normalized:
+                    return slot, position
+            slot = (slot + 1) & self._mask
+        return slot, None
+
+    def add(self, text: str, position: int) -> Optional[int]:
+        """
+        Add ``text`` at ``position`` unless an equal text is already indexed
+
+        Returns:
+            int or None: Position of the earlier equal text, if there is one
+        """
+        key = text_key(text)
+        slot, existing = self._probe(key, normalize_name(text))
+        if existing is None:
+            self._keys[slot] = key
+            self._positions[slot] = position
+            self._count += 1
+            if self._count * 2 > len(self._keys):
+                self._grow()
+        return existing
+
+    def _grow(self):
+        """Double the table (when the capacity given was too small)"""
+        keys, positions = self._keys, self._positions
+        size = len(keys) * 2
+        self._mask = size - 1
+        self._keys = array("Q", bytes(8 * size))
+        self._positions = array("I", bytes(4 * size))
+        for key, position in zip(keys, positions):
+            if key:
+                slot = key & self._mask
+                while self._keys[slot]:
+                    slot = (slot + 1) & self._mask
+                self._keys[slot] = key
+                self._positions[slot] = position
+
+    def get(self, text: str) -> Optional[int]:
+        """
+        Catalog position of ``text``, ignoring case and extra whitespace
+
+        Returns:
+            int or None: First position holding the text
+        """
+        return self._probe(text_key(text), normalize_name(text))[1]
+
+    def nbytes(self) -> int:
+        """Bytes held by the table arrays"""
+        return (
+            self._keys.buffer_info()[1] * self._keys.itemsize
+            + self._positions.buffer_info()[1] * self._positions.itemsize
+        )
+
+
+@dataclass(frozen=True)
+class CatalogReport:
+    """
+    Data Transfer Object: Result of validating a catalog
+
+    Attributes:
+        count (int): Items checked
+        digest (str): SHA-256 hex digest of the catalog content, in order
+        duplicates (Tuple[Tuple[int, int], ...]): (position, first position)
+            pairs repeating a text with the same polarity
+        conflicts (Tuple[Tuple[int, int], ...]): (position, first position)
+            pairs repeating a text with the opposite polarity
+        index (TextIndex): Normalized text -> first position
+    """
+    count: int
+    digest: str
+    duplicates: Tuple[Tuple[int, int], ...]
+    conflicts: Tuple[Tuple[int, int], ...]
+    index: TextIndex = field(repr=False, compare=False)
+
+    @property
+    def ok(self) -> bool:
+        """True if no text is both good and bad"""
+        return not self.conflicts
+
+
+class CatalogValidator:
+    """
+    Validation pass fed one item at a time, for callers that already scan
+    the catalog (``CatalogIndex.build`` checks a file while indexing it)
+    """
+
+    def __init__(self, capacity: int, text_of: Callable[[int], str]):
+        """
+        Args:
+            capacity (int): Expected item count (the text index grows past it)
+            text_of (Callable[[int], str]): Text at an earlier catalog position
+        """
+        self.index = TextIndex(capacity, text_of)
+        self._polarity = bytearray()
+        self._duplicates = []
+        self._conflicts = []
+        self._sha = hashlib.sha256()
+        self._batch = []
+
+    def add(self, text: str, is_good: bool, category: str):
+        """Check the next item in catalog order"""
+        position = len(self._polarity)
+        self._polarity.append(is_good)
+        first = self.index.add(text, position)
+        if first is not None:
+            repeats = self._duplicates if self._polarity[first] == is_good else self._conflicts
+            repeats.append((position, first))
+
+        self._batch.append(f"{len(text)}:{text}{int(is_good)}{len(category)}:{category}")
+        if len(self._batch) == DIGEST_BATCH:
+            self._sha.update("".join(self._batch).encode("utf-8"))
+            self._batch.clear()
+
+    def report(self) -> CatalogReport:
+        """Result for the items added so far"""
+        sha = self._sha.copy()
+        sha.update("".join(self._batch).encode("utf-8"))
+        return CatalogReport(
+            count=len(self._polarity),
+            digest=sha.hexdigest(),
+            duplicates=tuple(self._duplicates),
+            conflicts=tuple(self._conflicts),
+            index=self.index,
+        )
+
+
+def validate_catalog(catalog) -> CatalogReport:
+    """
+    Check a catalog for duplicate and conflicting texts in one pass
+
+    Catalogs that keep a saved report (``MappedCatalog.report``) should be
+    asked for it instead; this reads every item.
+
+    Args:
+        catalog (Sequence[Item]): Items to check; must support ``len`` and
+            indexing (``CompactCatalog``, ``MappedCatalog`` or a list)
+
+    Returns:
+        CatalogReport: Duplicates, conflicts, digest and text index
+    """
+    text_of = getattr(catalog, "text_at", None) or (lambda p: catalog[p].text)
+    validator = CatalogValidator(len(catalog), text_of)
+    for item in catalog:
+        validator.add(item.text, item.is_good, item.category)
+    return validator.report()
+
+
+def describe_conflicts(catalog, conflicts: Iterable[Tuple[int, int]], limit: int = 5) -> str:
+    """Readable summary of the first ``limit`` conflicts"""
+    conflicts = list(conflicts)
+    lines = [
+        f"'{catalog[p].text}' ({'good' if catalog[p].is_good else 'bad'}, position {p}) "
+        f"vs '{catalog[f].text}' ({'good' if catalog[f].is_good else 'bad'}, position {f})"
+        for p, f in conflicts[:limit]
+    ]
+    if len(conflicts) > limit:
+        lines.append(f"... and {len(conflicts) - limit} more")
+    return "\n".join(lines)
+
+
+# Module-level test function
+def test_catalog_validation():
+    """Test function to verify duplicate/conflict detection and digests"""
+    import time
+    from item_pool import Item, ItemPool
+
+    print("\n" + "=" * 60)
+    print("  Catalog Validation Test Suite")
+    print("=" * 60 + "\n")
+
+    # Test 1: Built-in catalog is clean
+    print("[OK] Test 1: Built-in Catalog")
+    pool = ItemPool()
+    report = pool.catalog_report
+    assert report.ok and not report.duplicates and report.count == 80
+    print(f"   80 items, digest {report.digest[:16]}...")
+    print()
+
+    # Test 2: Duplicates and conflicts after normalization
+    print("[OK] Test 2: Duplicates and Conflicts")
+    items = [
+        Item("Deep Work", True, "productivity"),
+        Item("deep  work", True, "code_quality"),
+        Item("Soda", False, "healthy_habits"),
+        Item(" SODA ", True, "healthy_habits"),
+    ]
+    report = validate_catalog(items)
+    assert report.duplicates == ((1, 0),)
+    assert report.conflicts == ((3, 2),)
+    assert report.index.get("DEEP WORK") == 0 and report.index.get("water") is None
+    try:
+        ItemPool(items)
+        assert False, "Conflicting catalog must be rejected"
+    except ValueError as e:
+        print(f"   Rejected: {str(e).splitlines()[1]}")
+    print()
+
+    # Test 3: Duplicates are dropped from the index
+    print("[OK] Test 3: Dedup")
+    deduped = ItemPool(items[:3])
+    assert deduped.get_stats()["good_items"] == 1 and deduped.get_stats()["total_items"] == 2
+    print(f"   {deduped.get_stats()['total_items']} of 3 items dealt, 1 duplicate left out of the deal index")
+    print()
+
+    # Test 4: Digest tracks content and order
+    print("[OK] Test 4: Content Digest")
+    assert validate_catalog(items[:3]).digest == validate_catalog(list(items[:3])).digest
+    assert validate_catalog(items[:3]).digest != validate_catalog(items[1::-1] + items[2:3]).digest
+    # Separators inside fields cannot make two catalogs encode alike
+    joined = [Item("Walk\t1\tfitness\nRun", True, "fitness")]
+    split = [Item("Walk", True, "fitness"), Item("Run", True, "fitness")]
+    assert validate_catalog(joined).digest != validate_catalog(split).digest
+    print()
+
+    # Test 5: Linear pass on a large catalog
+    print("[OK] Test 5: Large Catalog")
+    big = [Item(f"Item {n}", n % 2 == 0, f"category_{n % 16}") for n in range(200000)]
+    start = time.perf_counter()
+    report = validate_catalog(big)
+    elapsed = time.perf_counter() - start
+    assert report.ok and report.index.get("item 199999") == 199999
+    print(f"   {len(big):,} items in {elapsed:.2f}s, index {report.index.nbytes() / len(big):.1f} bytes/item")
+    print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Catalog Validation Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_catalog_validation()
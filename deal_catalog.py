@@ -0,0 +1,340 @@
+"""
+Forget to Win - Pre-generated Deal Catalogs
+
+This module writes seeded deals to a compact binary file ahead of time and
+serves them back through a memory map, so the game can look a deal up
+instead of sampling and shuffling on every request.
+
+A deal covers all levels of one game. For each level it stores the item
+positions (good items first, then bad), the display permutation and the
+recall permutation.
+
+File layout (little-endian):
+    - Header: magic, catalog digest (first 16 bytes), catalog size, seed,
+      deal count, level count
+    - Level table: (level number, good count, bad count) per level
+    - Records: fixed-width, one per deal
+        * item positions for every level as uint32
+        * display permutations for every level as uint8
+        * recall permutations for every level as uint8
+
+Usage:
+    python deal_catalog.py deals.bin --count 1000000 --seed 42
+
+Classes:
+    - LevelDeal: Positions and permutations for one level of a deal
+    - DealCatalog: Memory-mapped reader for a deal file
+
+Author: Development Team
+Version: 1.0
+"""
+
+from array import array
+from dataclasses import dataclass
+import mmap
+import random
+import struct
+import sys
+from typing import Dict, List, Tuple
+
+from item_pool import Item, ItemPool
+
+DEAL_MAGIC = b"FTWDEAL2"
+DEAL_HEADER = struct.Struct("<8s16sQQQB")  # magic, digest, catalog size, seed, deal count, level count
+DIGEST_BYTES = 16
+LEVEL_ENTRY = struct.Struct("<BBB")     # level number, good count, bad count
+
+WRITE_BATCH = 4096  # Deals buffered per write
+
+
+def _default_levels() -> Dict[int, Dict]:
+    """Level table from the game configuration"""
+    from game_engine import GameConfig
+    return GameConfig.LEVELS
+
+
+@dataclass(frozen=True)
+class LevelDeal:
+    """
+    Data Transfer Object: One level of a pre-generated deal
+
+    Attributes:
+        good_positions (Tuple[int, ...]): Catalog positions of good items
+        bad_positions (Tuple[int, ...]): Catalog positions of bad items
+        display_order (Tuple[int, ...]): Order to show good + bad items in
+        recall_order (Tuple[int, ...]): Order to list good + bad items for recall
+    """
+    good_positions: Tuple[int, ...]
+    bad_positions: Tuple[int, ...]
+    display_order: Tuple[int, ...]
+    recall_order: Tuple[int, ...]
+
+    def items(self, pool: ItemPool) -> Tuple[List[Item], List[Item], List[Item], List[Item]]:
+        """
+        Materialize the deal against its item pool
+
+        Returns:
+            Tuple: (good_items, bad_items, display_items, recall_items)
+        """
+        good_items = [pool.all_items[p] for p in self.good_positions]
+        bad_items = [pool.all_items[p] for p in self.bad_positions]
+        combined = good_items + bad_items
+        return (
+            good_items,
+            bad_items,
+            [combined[i] for i in self.display_order],
+            [combined[i] for i in self.recall_order],
+        )
+
+
+def _level_layout(levels: Dict[int, Dict]) -> List[Tuple[int, int, int]]:
+    """(level, good count, bad count) in level order"""
+    return [
+        (level, config["good_items"], config["bad_items"])
+        for level, config in sorted(levels.items())
+    ]
+
+
+def _record_size(layout: List[Tuple[int, int, int]]) -> int:
+    """Bytes per deal record for a level layout"""
+    slots = sum(good + bad for _, good, bad in layout)
+    return slots * 4 + slots * 2
+
+
+def generate_deals(
+    path: str,
+    count: int,
+    seed: int,
+    pool: ItemPool = None,
+    levels: Dict[int, Dict] = None
+):
+    """
+    Write ``count`` seeded deals to a binary deal file
+
+    Args:
+        path (str): Output file
+        count (int): Number of deals to generate
+        seed (int): Seed for the generator; the same seed reproduces the file
+        pool (ItemPool, optional): Item pool to draw from (default built-in)
+        levels (Dict[int, Dict], optional): Level table (default GameConfig.LEVELS)
+
+    Raises:
+        ValueError: If a level has more than 256 items to permute
+    """
+    pool = pool or ItemPool()
+    layout = _level_layout(levels or _default_levels())
+    if any(good + bad > 256 for _, good, bad in layout):
+        raise ValueError("Deal files support at most 256 items per level")
+
+    rng = random.Random(seed)
+    positions = array("I")
+
+    with open(path, "wb") as f:
+        digest = bytes.fromhex(pool.catalog_digest)[:DIGEST_BYTES]
+        f.write(DEAL_HEADER.pack(DEAL_MAGIC, digest, len(pool.all_items), seed, count, len(layout)))
+        for entry in layout:
+            f.write(LEVEL_ENTRY.pack(*entry))
+
+        buffer = bytearray()
+        for n in range(count):
+            del positions[:]
+            display = bytearray()
+            recall = bytearray()
+            for _, good, bad in layout:
+                good_positions, bad_positions = pool.get_level_positions(good, bad, rng=rng)
+                positions.extend(good_positions)
+                positions.extend(bad_positions)
+
+                order = list(range(good + bad))
+                rng.shuffle(order)
+                display += bytes(order)
+                rng.shuffle(order)
+                recall += bytes(order)
+
+            if sys.byteorder != "little":
+                positions.byteswap()
+            buffer += positions.tobytes()
+            buffer += display
+            buffer += recall
+
+            if (n + 1) % WRITE_BATCH == 0:
+                f.write(buffer)
+                buffer.clear()
+        f.write(buffer)
+
+
+class DealCatalog:
+    """
+    Memory-mapped reader for a deal file
+
+    Example:
+        >>> deals = DealCatalog.open("deals.bin", pool)
+        >>> good, bad, display, recall = deals.level(42, 1).items(pool)
+    """
+
+    def __init__(self, data: mmap.mmap, catalog_digest: str, catalog_size: int, seed: int,
+                 count: int, layout: List[Tuple[int, int, int]], records_start: int):
+        self._data = data
+        self.catalog_digest = catalog_digest
+        self.catalog_size = catalog_size
+        self.seed = seed
+        self.count = count
+        self._record_size = _record_size(layout)
+        self._records_start = records_start
+        self._slots = sum(good + bad for _, good, bad in layout)
+
+        # Slot offset and size of each level inside a record
+        self._levels: Dict[int, Tuple[int, int, int, int]] = {}
+        slot = 0
+        for level, good, bad in layout:
+            self._levels[level] = (good, bad, slot, good + bad)
+            slot += good + bad
+
+    @classmethod
+    def open(cls, path: str, pool: ItemPool = None) -> "DealCatalog":
+        """
+        Map a deal file
+
+        Args:
+            path (str): Deal file written by ``generate_deals``
+            pool (ItemPool, optional): If given, check the file was built for
+                a catalog with the same content digest
+
+        Raises:
+            ValueError: If the file is not a deal file or does not match ``pool``
+        """
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        magic, digest, catalog_size, seed, count, level_count = DEAL_HEADER.unpack_from(data, 0)
+        if magic != DEAL_MAGIC:
+            data.close()
+            raise ValueError(f"{path} is not a deal file")
+        digest = digest.hex()
+        if pool is not None and not pool.catalog_digest.startswith(digest):
+            data.close()
+            raise ValueError(
+                f"{path} was built for catalog {digest} ({catalog_size} items), "
+                f"pool has {pool.catalog_digest[:len(digest)]} ({len(pool.all_items)} items)"
+            )
+
+        offset = DEAL_HEADER.size
+        layout = []
+        for _ in range(level_count):
+            layout.append(LEVEL_ENTRY.unpack_from(data, offset))
+            offset += LEVEL_ENTRY.size
+
+        return cls(data, digest, catalog_size, seed, count, layout, offset)
+
+    def __len__(self) -> int:
+        return self.count
+
+    def level(self, deal: int, level: int) -> LevelDeal:
+        """
+        Look up one level of a deal
+
+        Args:
+            deal (int): Deal number (0 <= deal < len(catalog))
+            level (int): Level number
+
+        Returns:
+            LevelDeal: Positions and permutations for the level
+        """
+        if not 0 <= deal < self.count:
+            raise IndexError("deal number out of range")
+        good, bad, slot, size = self._levels[level]
+
+        record = self._records_start + deal * self._record_size
+        positions = struct.unpack_from(f"<{size}I", self._data, record + slot * 4)
+        display_at = record + self._slots * 4 + slot
+        recall_at = display_at + self._slots
+
+        return LevelDeal(
+            good_positions=positions[:good],
+            bad_positions=positions[good:],
+            display_order=tuple(self._data[display_at:display_at + size]),
+            recall_order=tuple(self._data[recall_at:recall_at + size]),
+        )
+
+    def close(self):
+        """Unmap the deal file"""
+        self._data.close()
+
+
+# Module-level test function
+def test_deal_catalog():
+    """Test function to verify deal generation and lookup"""
+    import os
+    import tempfile
+
+    print("\n" + "=" * 60)
+    print("  Deal Catalog Test Suite")
+    print("=" * 60 + "\n")
+
+    pool = ItemPool()
+    levels = _default_levels()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "deals.bin")
+        other = os.path.join(tmp, "deals-again.bin")
+
+        # Test 1: Generation is reproducible from the seed
+        print("[OK] Test 1: Seeded Generation")
+        generate_deals(path, 100, seed=7, pool=pool)
+        generate_deals(other, 100, seed=7, pool=pool)
+        with open(path, "rb") as a, open(other, "rb") as b:
+            assert a.read() == b.read(), "Same seed must produce identical files"
+        print(f"   100 deals in {os.path.getsize(path)} bytes")
+        print()
+
+        # Test 2: Lookups return valid levels
+        print("[OK] Test 2: Deal Lookup")
+        deals = DealCatalog.open(path, pool)
+        assert len(deals) == 100
+        for level, config in levels.items():
+            good, bad, display, recall = deals.level(99, level).items(pool)
+            assert len(good) == config["good_items"] and len(bad) == config["bad_items"]
+            assert all(i.is_good for i in good) and not any(i.is_good for i in bad)
+            assert sorted(display, key=repr) == sorted(good + bad, key=repr)
+            assert sorted(recall, key=repr) == sorted(good + bad, key=repr)
+        print(f"   Level 1 of deal 99: {', '.join(i.text for i in display[:5])}")
+        deals.close()
+        print()
+
+        # Test 3: A file built for another catalog is refused
+        print("[OK] Test 3: Catalog Digest Check")
+        other_pool = ItemPool(list(pool.all_items)[:-1])
+        try:
+            DealCatalog.open(path, other_pool)
+            assert False, "Deal file must not open against a different catalog"
+        except ValueError as e:
+            print(f"   {e}")
+        print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Deal Catalog Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+def main():
+    """Generate a deal file from the command line"""
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Pre-generate Forget to Win deals")
+    parser.add_argument("output", help="Deal file to write")
+    parser.add_argument("--count", type=int, default=100000, help="Number of deals")
+    parser.add_argument("--seed", type=int, default=0, help="Generator seed")
+    parser.add_argument("--catalog", help="JSONL/CSV item catalog (default: built-in items)")
+    args = parser.parse_args()
+
+    pool = ItemPool.from_catalog_file(args.catalog) if args.catalog else ItemPool()
+    generate_deals(args.output, args.count, args.seed, pool)
+    print(f"Wrote {args.count} deals to {args.output}")
+
+
+if __name__ == "__main__":
+    if len(sys.argv) > 1:
+        main()
+    else:
+        # Run tests when module is executed directly
+        test_deal_catalog()
@@ -0,0 +1,458 @@
+"""
+Forget to Win - Game Event Log
+
+This module keeps every finished game in an append-only binary log so
+level results survive the process and can be replayed for analytics.
+
+Each game is one game header followed by one fixed-width record per
+level. Appends only copy bytes into a shared buffer; a committer thread
+writes the whole buffer with one write() and one fsync() per commit
+interval (group commit), so the syscall count does not grow with the
+game rate. Logs are split into numbered segment files that rotate at a
+size limit; a game never spans two segments. Every writer creates its
+own segments, so several processes can share one log directory.
+
+File layout (little-endian):
+    - Segment header: magic, format version
+    - Game header: game id, player id, seed, finished at, total score,
+      level count, source (version 1 segments have no player id)
+    - Level records: LevelResult fields, fixed width
+
+Classes:
+    - GameHeader: Per-game header record
+    - EventLog: Group-committing writer with segment rotation
+
+Author: Development Team
+Version: 1.0
+"""
+
+from dataclasses import dataclass, replace
+import glob
+import hashlib
+import mmap
+import os
+import struct
+import threading
+import time
+from typing import Iterator, List, Optional, Sequence, Tuple
+
+from game_engine import LevelResult
+
+SEGMENT_MAGIC = b"FTWEVT01"
+SEGMENT_HEADER = struct.Struct("<8sI")         # magic, format version
+GAME_RECORD = struct.Struct("<QQQdiBB")        # game id, player id, seed, finished at, total score, levels, source
+GAME_RECORD_V1 = struct.Struct("<QQdiBB")      # version 1: no player id
+LEVEL_RECORD = struct.Struct("<BBBBBBiiidd")   # see _pack_level
+FORMAT_VERSION = 2
+
+SOURCE_CLI = 0
+SOURCE_WEB = 1
+
+SEGMENT_PATTERN = "events-{:08d}.log"
+
+
+@dataclass(frozen=True)
+class GameHeader:
+    """
+    Data Transfer Object: Header written before a game's level records
+
+    Attributes:
+        game_id (int): 64-bit game id
+        player_id (int): 64-bit player id (see player_key)
+        seed (int): Session seed the game was dealt from
+        finished_at (float): Unix time the game ended
+        total_score (int): Final score
+        level_count (int): Level records that follow
+        source (int): SOURCE_CLI or SOURCE_WEB
+    """
+    game_id: int
+    player_id: int
+    seed: int
+    finished_at: float
+    total_score: int
+    level_count: int
+    source: int = SOURCE_CLI
+
+
+def player_key(player: str) -> int:
+    """Stable 64-bit id for a player name or public player id"""
+    return int.from_bytes(hashlib.blake2b(player.encode("utf-8"), digest_size=8).digest(), "little")
+
+
+def _pack_level(result: LevelResult) -> bytes:
+    return LEVEL_RECORD.pack(
+        result.level_number, result.correct_good, result.total_good,
+        result.incorrect_bad, result.total_bad, result.forgotten_good,
+        result.base_score, result.streak_bonus, result.total_score,
+        result.accuracy, result.time_taken,
+    )
+
+
+def encode_game(header: GameHeader, levels: Sequence[LevelResult]) -> bytes:
+    """Binary form of one game: header plus one record per level"""
+    if header.level_count != len(levels):
+        raise ValueError("Header level count does not match the level records")
+    return GAME_RECORD.pack(
+        header.game_id, header.player_id, header.seed, header.finished_at,
+        header.total_score, header.level_count, header.source,
+    ) + b"".join(_pack_level(result) for result in levels)
+
+
+class EventLog:
+    """
+    Append-only event log with group commit and segment rotation
+
+    Example:
+        >>> log = EventLog("events")
+        >>> log.append_game(header, level_results)      # returns at once
+        >>> log.append_game(header, level_results, durable=True)  # waits for fsync
+        >>> log.close()
+    """
+
+    def __init__(self, directory: str, segment_bytes: int = 64 << 20,
+                 commit_interval: float = 0.005, fsync: bool = True):
+        """
+        Args:
+            directory (str): Directory holding the segment files
+            segment_bytes (int): Size at which a new segment is started
+            commit_interval (float): Seconds the committer waits to gather
+                more games into one write + fsync
+            fsync (bool): fsync each commit (turn off only for throwaway logs)
+        """
+        self.directory = directory
+        self.segment_bytes = segment_bytes
+        self.commit_interval = commit_interval
+        self.fsync = fsync
+
+        os.makedirs(directory, exist_ok=True)
+        existing = segment_paths(directory)
+        # A new writer starts a new segment, so a torn tail never gets appended to
+        self._segment_number = _segment_number(existing[-1]) + 1 if existing else 1
+        self._file = None
+        self._file_size = 0
+
+        self._lock = threading.Condition()
+        self._commit_lock = threading.Lock()  # keeps batches in append order
+        self._buffer = bytearray()
+        self._appended = 0   # games appended so far
+        self._durable = 0    # games written and synced, or lost to a failed commit
+        self._failures: List[Tuple[int, int, BaseException]] = []  # lost games: first, last, error
+        self._closed = False
+        self._committer: Optional[threading.Thread] = None
+        self.commits = 0
+
+    def append_game(self, header: GameHeader, levels: Sequence[LevelResult], durable: bool = False) -> int:
+        """
+        Add one finished game to the log
+
+        Args:
+            header (GameHeader): Game header
+            levels (Sequence[LevelResult]): The game's level results
+            durable (bool): Wait until the game has been fsynced
+
+        Returns:
+            int: Sequence number of the game in this log instance
+
+        Raises:
+            OSError: If ``durable`` and the commit holding the game failed
+        """
+        record = encode_game(header, levels)
+        with self._lock:
+            if self._closed:
+                raise ValueError("Event log is closed")
+            self._buffer += record
+            self._appended += 1
+            sequence = self._appended
+            if self._committer is None:
+                self._committer = threading.Thread(target=self._commit_loop, name="event-log", daemon=True)
+                self._committer.start()
+            self._lock.notify_all()
+            if durable:
+                while self._durable < sequence:
+                    self._lock.wait()
+                for first, last, error in self._failures:
+                    if first <= sequence <= last:
+                        raise error
+        return sequence
+
+    def _commit_loop(self):
+        while True:
+            with self._lock:
+                while not self._buffer and not self._closed:
+                    self._lock.wait()
+                if not self._buffer and self._closed:
+                    return
+            # Let concurrent games join this commit
+            time.sleep(self.commit_interval)
+            try:
+                self.commit()
+            except Exception:
+                pass  # Raised to the batch's durable appenders; keep committing later games
+
+    def commit(self):
+        """
+        Write and sync everything appended so far (one write, one fsync)
+
+        Raises:
+            OSError: If the batch could not be written; its games are lost
+                and their durable appenders get the same error
+        """
+        with self._commit_lock:
+            with self._lock:
+                data, self._buffer = self._buffer, bytearray()
+                first, sequence = self._durable + 1, self._appended
+            try:
+                if data:
+                    self._write(data)
+            except BaseException as error:
+                # The segment may hold part of the batch: later games go to a new one
+                self._close_segment()
+                with self._lock:
+                    self._failures.append((first, sequence, error))
+                    self._durable = max(self._durable, sequence)
+                    self._lock.notify_all()
+                raise
+            with self._lock:
+                self._durable = max(self._durable, sequence)
+                self._lock.notify_all()
+
+    def _write(self, data: bytearray):
+        """Append a batch of whole games, rotating first if the segment is full"""
+        if self._file is not None and self._file_size + len(data) > self.segment_bytes:
+            self._close_segment()
+        if self._file is None:
+            self._file = self._create_segment()
+            self._file.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, FORMAT_VERSION))
+            self._file_size = SEGMENT_HEADER.size
+        self._file.write(data)
+        self._file_size += len(data)
+        if self.fsync:
+            os.fsync(self._file.fileno())
+        self.commits += 1
+
+    def _create_segment(self):
+        """Create the next free segment file (another writer may have taken a number)"""
+        while True:
+            path = os.path.join(self.directory, SEGMENT_PATTERN.format(self._segment_number))
+            try:
+                fd = os.open(path, os.O_WRONLY | os.O_CREAT | os.O_EXCL | os.O_APPEND, 0o644)
+            except FileExistsError:
+                self._segment_number += 1
+                continue
+            return os.fdopen(fd, "ab", buffering=0)
+
+    def _close_segment(self):
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._segment_number += 1
+
+    def close(self):
+        """Commit pending games and close the current segment"""
+        with self._lock:
+            self._closed = True
+            self._lock.notify_all()
+            committer = self._committer
+        if committer is not None:
+            committer.join()
+        try:
+            self.commit()
+        finally:
+            self._close_segment()
+
+    def __enter__(self) -> "EventLog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def _segment_number(path: str) -> int:
+    return int(os.path.basename(path)[len("events-"):-len(".log")])
+
+
+def segment_paths(directory: str) -> List[str]:
+    """Segment files in write order"""
+    return sorted(glob.glob(os.path.join(directory, SEGMENT_PATTERN.replace("{:08d}", "*"))))
+
+
+def read_games(directory: str) -> Iterator[Tuple[GameHeader, List[LevelResult]]]:
+    """
+    Replay every game in the log, oldest first
+
+    Segments are memory-mapped and each game's level block is decoded
+    with a single ``iter_unpack``. A game cut short at the end of a
+    segment (a crash mid-write) is skipped. Games in version 1 segments,
+    written before headers carried a player id, have ``player_id`` 0.
+
+    Yields:
+        Tuple[GameHeader, List[LevelResult]]: One finished game
+    """
+    for path in segment_paths(directory):
+        if os.path.getsize(path) < SEGMENT_HEADER.size:
+            continue
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            magic, version = SEGMENT_HEADER.unpack_from(data, 0)
+            if magic != SEGMENT_MAGIC or version not in (1, FORMAT_VERSION):
+                raise ValueError(f"{path} is not a version 1 or {FORMAT_VERSION} event log segment")
+            record = GAME_RECORD if version == FORMAT_VERSION else GAME_RECORD_V1
+            offset, end = SEGMENT_HEADER.size, len(data)
+            while offset + record.size <= end:
+                fields = record.unpack_from(data, offset)
+                if record is GAME_RECORD_V1:
+                    fields = (fields[0], 0) + fields[1:]
+                header = GameHeader(*fields)
+                offset += record.size
+                block = header.level_count * LEVEL_RECORD.size
+                if offset + block > end:
+                    break
+                levels = [
+                    LevelResult(*fields)
+                    for fields in LEVEL_RECORD.iter_unpack(data[offset:offset + block])
+                ]
+                offset += block
+                yield header, levels
+
+
+# Module-level test function
+def test_event_log():
+    """Test function to verify encoding, group commit, rotation and replay"""
+    import random
+    import tempfile
+
+    print("\n" + "=" * 60)
+    print("  Event Log Test Suite")
+    print("=" * 60 + "\n")
+
+    rng = random.Random(5)
+
+    def make_game(game_id: int) -> Tuple[GameHeader, List[LevelResult]]:
+        levels = []
+        for level in range(1, 6):
+            good, bad = level + 2, level + 1
+            correct, wrong = rng.randint(0, good), rng.randint(0, bad)
+            levels.append(LevelResult(level, correct, good, wrong, bad, good - correct,
+                                      correct * 10, 0, correct * 10, rng.uniform(0, 100), rng.uniform(1, 60)))
+        header = GameHeader(game_id, player_key(f"player{game_id % 10}"), rng.getrandbits(64), time.time(),
+                            sum(r.total_score for r in levels), 5)
+        return header, levels
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Test 1: Round trip is exact
+        print("[OK] Test 1: Encode and Replay")
+        games = [make_game(n) for n in range(100)]
+        with EventLog(tmp) as log:
+            for header, levels in games:
+                log.append_game(header, levels)
+        assert list(read_games(tmp)) == games
+        print(f"   Game: {GAME_RECORD.size} bytes + {LEVEL_RECORD.size} bytes per level")
+        print()
+
+        # Test 2: Concurrent producers share commits
+        print("[OK] Test 2: Group Commit")
+        log = EventLog(tmp, commit_interval=0.01)
+        threads = [
+            threading.Thread(target=lambda: [log.append_game(*make_game(7), durable=True) for _ in range(25)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        log.close()
+        assert log.commits < 200, log.commits
+        print(f"   200 durable games from 8 threads in {log.commits} fsyncs")
+        print()
+
+        # Test 3: Rotation keeps games whole
+        print("[OK] Test 3: Segment Rotation")
+        with EventLog(tmp, segment_bytes=4096, commit_interval=0) as log:
+            for n in range(300):
+                log.append_game(*make_game(1000 + n), durable=True)
+        replayed = list(read_games(tmp))
+        assert len(replayed) == 100 + 200 + 300
+        print(f"   {len(segment_paths(tmp))} segments, {len(replayed)} games replayed")
+        print()
+
+        # Test 4: A torn tail is skipped
+        print("[OK] Test 4: Torn Tail")
+        last = segment_paths(tmp)[-1]
+        with open(last, "ab") as f:
+            f.write(encode_game(*make_game(9999))[:-7])
+        assert len(list(read_games(tmp))) == 600
+        print()
+
+        # Test 5: Writers sharing a directory keep their own segments
+        print("[OK] Test 5: Shared Directory")
+        first, second = EventLog(tmp, commit_interval=0), EventLog(tmp, commit_interval=0)
+        shared = [make_game(2000 + n) for n in range(10)]
+        for n, game in enumerate(shared):
+            (first if n % 2 else second).append_game(*game, durable=True)
+        first.close()
+        second.close()
+        replayed = list(read_games(tmp))
+        assert len(replayed) == 610 and all(game in replayed for game in shared)
+        print()
+
+        # Test 6: A failed commit reaches its durable appenders
+        print("[OK] Test 6: Failed Commit")
+        log = EventLog(tmp, commit_interval=0)
+
+        def fail(data):
+            raise OSError("disk full")
+
+        log._write = fail
+        try:
+            log.append_game(*make_game(3000), durable=True)
+        except OSError:
+            pass
+        else:
+            raise AssertionError("A durable append must see the failed commit")
+        del log._write
+        log.append_game(*make_game(3001), durable=True)
+        log.close()
+        assert len(list(read_games(tmp))) == 611
+        print()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        # Test 7: Version 1 segments are still read
+        print("[OK] Test 7: Version 1 Segments")
+        header, levels = make_game(42)
+        with open(os.path.join(tmp, SEGMENT_PATTERN.format(1)), "wb") as f:
+            f.write(SEGMENT_HEADER.pack(SEGMENT_MAGIC, 1))
+            f.write(GAME_RECORD_V1.pack(header.game_id, header.seed, header.finished_at,
+                                        header.total_score, header.level_count, header.source))
+            f.write(b"".join(_pack_level(result) for result in levels))
+        with EventLog(tmp) as log:
+            log.append_game(header, levels)
+        (old_header, old_levels), (new_header, new_levels) = read_games(tmp)
+        assert old_header == replace(header, player_id=0)
+        assert new_header == header and old_levels == new_levels == levels
+        print()
+
+        # Test 8: Throughput
+        print("[OK] Test 8: Throughput")
+        batch = [make_game(n) for n in range(2000)]
+        with EventLog(os.path.join(tmp, "bench")) as log:
+            start = time.perf_counter()
+            for _ in range(25):
+                for header, levels in batch:
+                    log.append_game(header, levels)
+            log.commit()
+            elapsed = time.perf_counter() - start
+        count = 25 * len(batch)
+        start = time.perf_counter()
+        assert sum(1 for _ in read_games(os.path.join(tmp, "bench"))) == count
+        read_time = time.perf_counter() - start
+        print(f"   Write: {count / elapsed:,.0f} games/s in {log.commits} commits")
+        print(f"   Read:  {count / read_time:,.0f} games/s")
+        print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Event Log Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_event_log()
@@ -12,5 +12,8 @@ import os
 from django.core.asgi import get_asgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'forgetwingame.settings')
+# The game API is served by the sync views unless GAME_ASYNC_VIEWS=1: the async
+# views lose to WSGI on throughput and p99 (bench_async.py). Set it to serve the
+# event streams (/api/stream/), which need the async views.
 
 application = get_asgi_application()
@@ -10,6 +10,7 @@ For the full list of settings and their values, see
 https://docs.djangoproject.com/en/5.2/ref/settings/
 """
 
+import os
 from pathlib import Path
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
@@ -40,14 +41,16 @@ INSTALLED_APPS = [
     'game',  # Forget to Win game app
 ]
 
+# Django's middleware, subclassed to run inline (not in a thread) under ASGI
 MIDDLEWARE = [
-    'django.middleware.security.SecurityMiddleware',
-    'django.contrib.sessions.middleware.SessionMiddleware',
-    'django.middleware.common.CommonMiddleware',
-    'django.middleware.csrf.CsrfViewMiddleware',
-    'django.contrib.auth.middleware.AuthenticationMiddleware',
-    'django.contrib.messages.middleware.MessageMiddleware',
-    'django.middleware.clickjacking.XFrameOptionsMiddleware',
+    'game.middleware.RateLimitMiddleware',
+    'game.middleware.SecurityMiddleware',
+    'game.middleware.SessionMiddleware',
+    'game.middleware.CommonMiddleware',
+    'game.middleware.CsrfViewMiddleware',
+    'game.middleware.AuthenticationMiddleware',
+    'game.middleware.MessageMiddleware',
+    'game.middleware.XFrameOptionsMiddleware',
 ]
 
 ROOT_URLCONF = 'forgetwingame.urls'
@@ -117,6 +120,58 @@ USE_TZ = True
 
 STATIC_URL = 'static/'
 
+# Forget to Win
+# Pre-generated deal file (see deal_catalog.py); None samples deals per request
+GAME_DEAL_CATALOG = None
+# Shared directory for per-worker score sketches; None turns percentiles off
+GAME_PERCENTILE_DIR = BASE_DIR / 'stats'
+# Leaderboard write-behind: seconds between database writes (0 = manual flush) and batch size
+GAME_LEADERBOARD_FLUSH_SECONDS = 2.0
+GAME_LEADERBOARD_BATCH = 500
+# Append-only binary log of finished games (see event_log.py); None turns it off
+GAME_EVENT_LOG_DIR = BASE_DIR / 'stats' / 'events'
+# Stateless API: game state travels in an encrypted, signed X-Game-Token header
+# instead of the session. Replay protection then uses the default cache, which must
+# be shared and must not evict or cull keys (e.g. Redis with maxmemory-policy noeviction);
+# `manage.py check` fails with the per-process LocMemCache used when CACHES is unset.
+GAME_STATELESS = False
+GAME_TOKEN_MAX_AGE = 2 * 60 * 60  # seconds
+# Faster session engines (see game/session_backends): set SESSION_ENGINE to
+# 'game.session_backends.memory' (per-process LRU) or 'game.session_backends.file'
+# (LRU written back to files at level boundaries). Both cap the LRU at this size,
+# and both need a single worker process or sticky routing: a worker serves sessions
+# from its own LRU, so it does not see changes another worker made.
+GAME_SESSION_MAX_ENTRIES = 100_000
+GAME_SESSION_FILE_DIR = BASE_DIR / 'stats' / 'sessions'
+GAME_SESSION_FILE_MAX_FILES = 1_000_000
+# Server-side level clock: answers later than the typing deadline plus this grace
+# are not accepted; the next level starts this long after an answer (round API);
+# at most this many games' clocks are kept for their event streams (ASGI only)
+GAME_SUBMIT_GRACE_SECONDS = 2.0
+GAME_RESULTS_SECONDS = 5.0
+GAME_STREAM_MAX_GAMES = 100_000
+# Per-address token buckets for API paths: (requests per second, burst); a path
+# ending in * limits every path under it together. Every path that reads or writes
+# game state is limited; only /api/start/ and /api/game/ create a session and deal
+# a game. Buckets are kept per worker, at most GAME_RATE_LIMIT_MAX_CLIENTS per rule.
+GAME_RATE_LIMITS = {
+    '/api/start/': (1, 10),
+    '/api/game/': (1, 10),
+    '/api/game/submit/': (1, 10),
+    '/api/level/': (2, 20),
+    '/api/recall/': (2, 20),
+    '/api/round/': (2, 20),
+    '/api/submit/': (2, 20),
+    '/api/answer/': (2, 20),
+    '/api/next/': (2, 20),
+    '/api/results/': (2, 20),
+    '/api/stream/*': (1, 10),
+}
+GAME_RATE_LIMIT_MAX_CLIENTS = 100_000
+# Serve the game API with async views under ASGI (needed for the event streams).
+# Off by default: bench_async.py measures them behind WSGI on throughput and p99
+GAME_ASYNC_VIEWS = os.environ.get('GAME_ASYNC_VIEWS', '0') == '1'
+
 # Default primary key field type
 # https://docs.djangoproject.com/en/5.2/ref/settings/#default-auto-field
 
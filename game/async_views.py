@@ -0,0 +1,104 @@
+"""
+Async versions of the game API views (served under ASGI)
+
+Each view awaits whatever could block, then runs the matching view in
+views.py inline. Once the session is loaded (and created, if new), the
+leaderboard is built and the deal catalog is mapped, those views only
+touch memory: the session dict, the in-memory leaderboard and the item
+pool. Views that can finish a game write the percentile store and the
+event log, and views that claim a token's answer use the shared cache;
+they run on Django's sync thread instead (``blocking``, ``claims``).
+The session is saved by game.middleware.SessionMiddleware with ``asave``.
+
+``game_stream`` is async all the way: a server-sent event stream of the
+game's phase changes, fed by the worker's timer wheel (game.timers).
+"""
+import asyncio
+import functools
+import json
+
+from asgiref.sync import sync_to_async
+from django.conf import settings
+from django.http import JsonResponse, StreamingHttpResponse
+
+from . import timers, views
+from .game_state import stateless
+from .leaderboard import aget_leaderboard
+
+
+async def prepare(request, creates: bool):
+    """Do the view's I/O up front with await"""
+    if getattr(settings, 'GAME_DEAL_CATALOG', None) and views._deal_catalog is None:
+        await asyncio.to_thread(views.get_deal_catalog)  # Opens and maps the file once
+    if stateless():
+        return
+    session = request.session
+    await session.ahas_key('seed')  # Loads the session
+    if creates and session.session_key is None:
+        await session.asave()  # Creates it; the key identifies the player
+
+
+def async_view(view, uses_leaderboard: bool = False, creates: bool = False,
+               blocking: bool = False, claims: bool = False):
+    """
+    Async twin of a game view
+
+    ``creates``: it starts a game, so may create the session.
+    ``blocking``: it does file I/O (finishing a game), so it runs on the
+    sync thread. ``claims``: it uses claim_once, which reaches the shared
+    cache in token mode, so it runs on the sync thread there.
+    """
+    threaded = sync_to_async(view)
+
+    @functools.wraps(view)
+    async def wrapper(request, *args, **kwargs):
+        await prepare(request, creates)
+        if uses_leaderboard:
+            await aget_leaderboard()
+        if blocking or (claims and stateless()):
+            return await threaded(request, *args, **kwargs)
+        return view(request, *args, **kwargs)
+
+    return wrapper
+
+
+start_game = async_view(views.start_game, creates=True)
+get_level = async_view(views.get_level)
+get_recall_items = async_view(views.get_recall_items)
+submit_answer = async_view(views.submit_answer, claims=True)
+next_level = async_view(views.next_level, uses_leaderboard=True, blocking=True)
+get_round = async_view(views.get_round)
+submit_and_advance = async_view(views.submit_and_advance, uses_leaderboard=True, blocking=True)
+start_whole_game = async_view(views.start_whole_game, creates=True)
+submit_game = async_view(views.submit_game, uses_leaderboard=True, blocking=True)
+get_final_results = async_view(views.get_final_results, blocking=True)
+
+
+async def game_stream(request, key):
+    """
+    Server-sent events for one game: ``results``, ``memorize``, ``recall``
+    and ``closed`` with the level and the phase's deadline, then
+    ``complete``. A comment line is sent every 15 seconds as keep-alive.
+    """
+    queue = timers.listen(key)
+    if queue is None:
+        return JsonResponse({'success': False, 'error': 'No such game'}, status=404)
+
+    async def events():
+        try:
+            yield 'retry: 3000\n\n'
+            while True:
+                event = await queue.get()
+                if event['phase'] == 'ping':
+                    yield ': ping\n\n'
+                    continue
+                yield f"event: {event['phase']}\ndata: {json.dumps(event)}\n\n"
+                if event['phase'] == 'complete':
+                    return
+        finally:
+            timers.unlisten(key, queue)
+
+    response = StreamingHttpResponse(events(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'  # No proxy buffering
+    return response
@@ -0,0 +1,48 @@
+"""
+System checks for the game app
+"""
+from django.conf import settings
+from django.core.checks import Error, Tags, Warning, register
+
+from .game_state import stateless
+
+# Caches that are per process, or keep nothing
+UNSHARED_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+    'django.core.cache.backends.dummy.DummyCache',
+)
+# Caches that drop a third of their keys once MAX_ENTRIES (default 300) is reached
+CULLING_CACHES = (
+    'django.core.cache.backends.db.DatabaseCache',
+    'django.core.cache.backends.filebased.FileBasedCache',
+)
+MIN_CLAIM_ENTRIES = 1_000_000
+
+
+@register(Tags.caches, Tags.security)
+def check_stateless_cache(app_configs, **kwargs):
+    """
+    Stateless tokens can be replayed, so the claims that stop a level being
+    scored twice must outlive every token: they need a shared cache that
+    does not lose them.
+    """
+    if not stateless():
+        return []
+    cache = settings.CACHES.get('default', {})
+    backend = cache.get('BACKEND', '')
+    if backend in UNSHARED_CACHES:
+        return [Error(
+            'GAME_STATELESS needs a shared, persistent default cache.',
+            hint='Configure CACHES["default"] with Redis (maxmemory-policy noeviction) '
+                 'or a database cache with a large MAX_ENTRIES.',
+            obj=backend,
+            id='game.E001',
+        )]
+    if backend in CULLING_CACHES and cache.get('OPTIONS', {}).get('MAX_ENTRIES', 300) < MIN_CLAIM_ENTRIES:
+        return [Warning(
+            'The default cache culls entries, so replay claims for stateless games can be lost.',
+            hint=f'Set CACHES["default"]["OPTIONS"]["MAX_ENTRIES"] to at least {MIN_CLAIM_ENTRIES:,}.',
+            obj=backend,
+            id='game.W001',
+        )]
+    return []
@@ -0,0 +1,229 @@
+"""
+Per-game state for the web API: where it lives and how it is encoded
+
+A dealt game is stored as item positions only: one byte for the
+position width, then per level a good count, a bad count and the
+packed positions, base64url-encoded. Display and recall orders are not
+stored at all; they are re-derived from the session seed on each
+request, so a level costs a few dozen bytes of state.
+
+The state is kept in the Django session, or, with GAME_STATELESS, in an
+encrypted, HMAC-signed expiring token that the client sends back on
+every call.
+Clients that play a whole game locally get a signed deal reference that
+names the deal they were given.
+"""
+import base64
+import functools
+import hashlib
+import json
+import secrets
+import time
+import zlib
+from array import array
+from typing import Dict, List, Tuple
+
+from django.conf import settings
+from django.core import signing
+from django.core.cache import cache
+from django.http import JsonResponse
+from django.utils.crypto import salted_hmac
+
+Deal = Dict[int, Tuple[List[int], List[int]]]
+
+
+def pack_deal(deal: Deal) -> str:
+    """
+    Encode {level: (good positions, bad positions)} as a short string
+
+    Positions are packed as 16-bit integers, or 32-bit if the catalog is
+    larger than that.
+    """
+    largest = max((p for good, bad in deal.values() for p in (*good, *bad)), default=0)
+    typecode = 'H' if largest < 1 << 16 else 'I'
+    data = bytearray(typecode.encode())
+    for level in sorted(deal):
+        good, bad = deal[level]
+        data += bytes((level, len(good), len(bad)))
+        data += array(typecode, [*good, *bad]).tobytes()
+    return base64.urlsafe_b64encode(bytes(data)).rstrip(b'=').decode()
+
+
+def unpack_deal(text: str) -> Deal:
+    """Decode a string from ``pack_deal``"""
+    data = base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    typecode = chr(data[0])
+    width = array(typecode).itemsize
+    deal: Deal = {}
+    offset = 1
+    while offset < len(data):
+        level, good, bad = data[offset:offset + 3]
+        offset += 3
+        positions = array(typecode, data[offset:offset + (good + bad) * width]).tolist()
+        offset += (good + bad) * width
+        deal[level] = (positions[:good], positions[good:])
+    return deal
+
+
+# Stateless mode: the game state travels in a signed token instead of the session
+
+TOKEN_SALT = 'game.token'
+TOKEN_HEADER = 'X-Game-Token'
+NONCE_BYTES = 16
+
+
+class TokenState(dict):
+    """Game state decoded from (and re-encoded into) a signed token"""
+
+
+def stateless() -> bool:
+    """True when settings.GAME_STATELESS keeps game state out of the session"""
+    return getattr(settings, 'GAME_STATELESS', False)
+
+
+def token_max_age() -> int:
+    return getattr(settings, 'GAME_TOKEN_MAX_AGE', 2 * 60 * 60)
+
+
+def _keystream(nonce: bytes, length: int) -> bytes:
+    """Keyed BLAKE2b in counter mode; the key is derived from SECRET_KEY"""
+    key = salted_hmac(TOKEN_SALT, 'encrypt', algorithm='sha256').digest()
+    blocks = (hashlib.blake2b(nonce + counter.to_bytes(8, 'little'), key=key).digest()
+              for counter in range((length + 63) // 64))
+    return b''.join(blocks)[:length]
+
+
+def _xor(data: bytes, stream: bytes) -> bytes:
+    return (int.from_bytes(data, 'little') ^ int.from_bytes(stream, 'little')).to_bytes(len(data), 'little')
+
+
+def dump_token(state: TokenState) -> str:
+    """
+    Encrypt, then sign and timestamp the state
+
+    The token carries the seed and deal, i.e. the answers, so the client
+    must not be able to read it: the compressed JSON is encrypted under a
+    fresh nonce before it is signed.
+    """
+    plain = zlib.compress(json.dumps(dict(state), separators=(',', ':')).encode())
+    nonce = secrets.token_bytes(NONCE_BYTES)
+    sealed = nonce + _xor(plain, _keystream(nonce, len(plain)))
+    return signing.TimestampSigner(salt=TOKEN_SALT).sign(
+        base64.urlsafe_b64encode(sealed).rstrip(b'=').decode())
+
+
+def load_token(token: str) -> TokenState:
+    """
+    Verify and decrypt a token; raises signing.BadSignature if forged or expired
+
+    A token expires ``GAME_TOKEN_MAX_AGE`` seconds after it was signed, and
+    its game expires that long after it started (``issued``): rotating a
+    token on every call does not keep an old game alive.
+    """
+    text = signing.TimestampSigner(salt=TOKEN_SALT).unsign(token, max_age=token_max_age())
+    sealed = base64.urlsafe_b64decode(text + '=' * (-len(text) % 4))
+    nonce, body = sealed[:NONCE_BYTES], sealed[NONCE_BYTES:]
+    state = TokenState(json.loads(zlib.decompress(_xor(body, _keystream(nonce, len(body))))))
+    if state.get('issued', 0) + token_max_age() < time.time():
+        raise signing.SignatureExpired('Game is older than GAME_TOKEN_MAX_AGE')
+    return state
+
+
+def issue(state):
+    """Start a token's game lifetime (sessions expire on their own)"""
+    if isinstance(state, TokenState):
+        state['issued'] = time.time()
+
+
+# Whole-game clients: a signed reference to the deal they play locally
+
+DEAL_REF_SALT = 'game.deal'
+DEAL_REF_FIELDS = ('seed', 'deal', 'catalog', 'deal_number', 'attempt')
+
+
+def dump_deal_ref(state) -> str:
+    """Sign the parts of a game state that fix its deal and this attempt"""
+    return signing.dumps({k: state[k] for k in DEAL_REF_FIELDS if k in state},
+                         salt=DEAL_REF_SALT, compress=True)
+
+
+def load_deal_ref(text: str) -> dict:
+    """Verify a deal reference; raises signing.BadSignature if forged or expired"""
+    return signing.loads(text, salt=DEAL_REF_SALT, max_age=token_max_age())
+
+
+def no_game() -> JsonResponse:
+    return JsonResponse({'success': False, 'error': 'No game in progress'}, status=409)
+
+
+def game_api(view=None, *, optional: bool = False):
+    """
+    Give a view its game state as ``request.game``
+
+    With sessions this is ``request.session``. In stateless mode the state
+    is read from the X-Game-Token request header and a freshly signed token
+    is returned in the same response header, so no session row is read or
+    written. A missing, forged or expired token is rejected unless the view
+    is ``optional`` (starting a game, reading the leaderboard), which then
+    starts from empty state. Other views get a 409 until a game has been
+    started, so only the start views ever create a session or a deal.
+    """
+    if view is None:
+        return functools.partial(game_api, optional=optional)
+
+    @functools.wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not stateless():
+            request.game = request.session
+            if not optional and 'seed' not in request.game:
+                return no_game()
+            return view(request, *args, **kwargs)
+        try:
+            token = request.headers.get(TOKEN_HEADER)
+            request.game = load_token(token) if token else None
+        except signing.BadSignature:
+            request.game = None
+        if request.game is None:
+            if not optional:
+                return JsonResponse({'success': False, 'error': 'Missing or expired game token'}, status=403)
+            request.game = TokenState()
+            issue(request.game)
+        elif not optional and 'seed' not in request.game:
+            return no_game()
+        response = view(request, *args, **kwargs)
+        response[TOKEN_HEADER] = dump_token(request.game)
+        return response
+
+    return wrapper
+
+
+def player_secret(request, create: bool = True):
+    """
+    The caller's private player id: the session key, or a random id kept
+    in the token. Never shown to other players (see views.leaderboard_id).
+    """
+    if isinstance(request.game, TokenState):
+        if create and 'player' not in request.game:
+            request.game['player'] = secrets.token_hex(16)
+        return request.game.get('player')
+    if create and request.session.session_key is None:
+        request.session.save()
+    return request.session.session_key
+
+
+def claim_once(request, name: str, value) -> bool:
+    """
+    True the first time ``value`` is claimed under ``name``
+
+    Used so a level is scored once and a game is recorded once. A session
+    remembers the claim itself; a token cannot, since an older copy of it
+    can be replayed, so stateless claims are kept in the shared cache (see
+    checks.check_stateless_cache) until the token's game has expired.
+    """
+    if isinstance(request.game, TokenState):
+        expires = request.game.get('issued', 0) + token_max_age() - time.time()
+        return cache.add(f'game:{name}:{value}', True, timeout=max(1, int(expires) + 60))
+    if name in request.game and request.game[name] == value:
+        return False
+    request.game[name] = value
+    return True
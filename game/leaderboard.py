@@ -0,0 +1,362 @@
+"""
+In-memory leaderboard for the web game
+
+Reads (top N, rank of a player, neighbours) are served from a
+process-local indexable skip list and never touch the database. Each
+player's best score is written behind: improvements are queued, and a
+daemon thread upserts them into ``LeaderboardEntry`` in batches. The
+skip list is rebuilt from the table the first time the leaderboard is
+used in a process, so another worker may have stored a better score
+since: an upsert never lowers a stored score.
+"""
+import atexit
+import random
+import threading
+import time
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from typing import Dict, List, Optional, Tuple
+
+from django.conf import settings
+from django.db import close_old_connections, connection, transaction
+
+# Sort key: best score first, then whoever got there first, then id
+Key = Tuple[int, float, str]
+
+
+@dataclass(frozen=True)
+class Standing:
+    """One leaderboard row"""
+    rank: int  # 1-based
+    player_id: str
+    name: str
+    score: int
+
+
+class _Node:
+    __slots__ = ('key', 'value', 'next', 'width')
+
+    def __init__(self, key, value, levels: int):
+        self.key = key
+        self.value = value
+        self.next: List[Optional['_Node']] = [None] * levels
+        # Items skipped by each forward link (the target included)
+        self.width: List[int] = [1] * levels
+
+
+class IndexableSkipList:
+    """
+    Sorted skip list whose links record how many items they skip
+
+    Summing link widths along a search path gives an item's position, so
+    insert, remove, rank and lookup by position are all O(log n) expected.
+    """
+
+    MAX_LEVELS = 32
+
+    def __init__(self, seed: int = None):
+        self._head = _Node(None, None, self.MAX_LEVELS)
+        self._levels = 1
+        self._size = 0
+        self._rng = random.Random(seed)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def _random_levels(self) -> int:
+        levels = 1
+        while levels < self.MAX_LEVELS and self._rng.random() < 0.5:
+            levels += 1
+        return levels
+
+    def _path(self, key) -> Tuple[List[_Node], List[int]]:
+        """Last node before ``key`` on each level, and its position"""
+        update = [self._head] * self.MAX_LEVELS
+        positions = [0] * self.MAX_LEVELS
+        node, position = self._head, 0
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and node.next[level].key < key:
+                position += node.width[level]
+                node = node.next[level]
+            update[level] = node
+            positions[level] = position
+        return update, positions
+
+    def insert(self, key, value):
+        """Insert ``key`` (keys must be unique)"""
+        update, positions = self._path(key)
+        levels = self._random_levels()
+        if levels > self._levels:
+            for level in range(self._levels, levels):
+                update[level] = self._head
+                positions[level] = 0
+                self._head.width[level] = self._size + 1
+            self._levels = levels
+
+        node = _Node(key, value, levels)
+        position = positions[0] + 1  # 1-based position of the new node
+        for level in range(levels):
+            before = update[level]
+            node.next[level] = before.next[level]
+            before.next[level] = node
+            skipped = position - positions[level]
+            node.width[level] = before.width[level] - skipped + 1
+            before.width[level] = skipped
+        for level in range(levels, self._levels):
+            update[level].width[level] += 1
+        self._size += 1
+
+    def remove(self, key):
+        """Remove ``key``; KeyError if it is not present"""
+        update, _ = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        for level in range(self._levels):
+            before = update[level]
+            if before.next[level] is node:
+                before.width[level] += node.width[level] - 1
+                before.next[level] = node.next[level]
+            else:
+                before.width[level] -= 1
+        self._size -= 1
+
+    def rank(self, key) -> int:
+        """0-based position of ``key``; KeyError if it is not present"""
+        update, positions = self._path(key)
+        node = update[0].next[0]
+        if node is None or node.key != key:
+            raise KeyError(key)
+        return positions[0]
+
+    def slice(self, start: int, stop: int) -> List[Tuple[Key, object]]:
+        """(key, value) pairs at positions ``start`` to ``stop - 1``"""
+        start, stop = max(0, start), min(stop, self._size)
+        if start >= stop:
+            return []
+        # Walk down to the node at ``start`` using the widths
+        node, position = self._head, 0
+        for level in reversed(range(self._levels)):
+            while node.next[level] is not None and position + node.width[level] <= start + 1:
+                position += node.width[level]
+                node = node.next[level]
+        items = []
+        while node is not None and len(items) < stop - start:
+            items.append((node.key, node.value))
+            node = node.next[0]
+        return items
+
+
+class Leaderboard:
+    """
+    Best score per player, ranked in memory and persisted write-behind
+
+    Example:
+        >>> board = Leaderboard(flush_seconds=0)
+        >>> board.submit('player-1', 'Ana', 180)
+        True
+        >>> board.rank('player-1')
+        1
+    """
+
+    def __init__(self, flush_seconds: float = 2.0, batch_size: int = 500):
+        """
+        Args:
+            flush_seconds (float): Longest time an improvement waits before
+                it is written; 0 disables the background writer (call
+                ``flush`` yourself)
+            batch_size (int): Pending improvements that trigger an early write
+        """
+        self.flush_seconds = flush_seconds
+        self.batch_size = batch_size
+        self._lock = threading.Lock()
+        self._ranked = IndexableSkipList()
+        self._keys: Dict[str, Key] = {}
+        self._pending: Dict[str, Tuple[str, int, float]] = {}
+        self._wake = threading.Event()
+        self._writer: Optional[threading.Thread] = None
+
+    def load(self):
+        """Rebuild the ranking from ``LeaderboardEntry`` (startup)"""
+        from .models import LeaderboardEntry
+
+        rows = LeaderboardEntry.objects.values_list('player_id', 'name', 'score', 'achieved_at')
+        with self._lock:
+            for player_id, name, score, achieved_at in rows.iterator(chunk_size=2000):
+                self._place(player_id, name, score, achieved_at.timestamp())
+
+    async def aload(self):
+        """``load`` with the async ORM (for async views)"""
+        from .models import LeaderboardEntry
+
+        rows = LeaderboardEntry.objects.values_list('player_id', 'name', 'score', 'achieved_at')
+        async for player_id, name, score, achieved_at in rows:
+            with self._lock:
+                self._place(player_id, name, score, achieved_at.timestamp())
+
+    def _place(self, player_id: str, name: str, score: int, achieved: float) -> bool:
+        """Insert or improve a player's entry; caller holds the lock"""
+        old = self._keys.get(player_id)
+        if old is not None:
+            if -old[0] >= score:
+                return False
+            self._ranked.remove(old)
+        key = (-score, achieved, player_id)
+        self._ranked.insert(key, name)
+        self._keys[player_id] = key
+        return True
+
+    def submit(self, player_id: str, name: str, score: int, achieved: float = None) -> bool:
+        """
+        Record a finished game
+
+        Args:
+            player_id (str): Stable public player id
+            name (str): Display name
+            score (int): Final score
+            achieved (float, optional): Unix time (default: now)
+
+        Returns:
+            bool: True if this is the player's new best
+        """
+        achieved = time.time() if achieved is None else achieved
+        with self._lock:
+            improved = self._place(player_id, name, score, achieved)
+            if improved:
+                self._pending[player_id] = (name, score, achieved)
+                full = len(self._pending) >= self.batch_size
+        if improved:
+            self._ensure_writer()
+            if full:
+                self._wake.set()
+        return improved
+
+    def top(self, limit: int = 10) -> List[Standing]:
+        """Best ``limit`` players"""
+        with self._lock:
+            return self._standings(0, limit)
+
+    def rank(self, player_id: str) -> Optional[int]:
+        """1-based rank of a player, or None if they have no game yet"""
+        with self._lock:
+            key = self._keys.get(player_id)
+            return None if key is None else self._ranked.rank(key) + 1
+
+    def neighbours(self, player_id: str, radius: int = 2) -> List[Standing]:
+        """The player's row with up to ``radius`` rows above and below"""
+        with self._lock:
+            key = self._keys.get(player_id)
+            if key is None:
+                return []
+            position = self._ranked.rank(key)
+            return self._standings(position - radius, position + radius + 1)
+
+    def __len__(self) -> int:
+        return len(self._ranked)
+
+    def _standings(self, start: int, stop: int) -> List[Standing]:
+        start = max(0, start)
+        return [
+            Standing(start + i + 1, key[2], name, -key[0])
+            for i, (key, name) in enumerate(self._ranked.slice(start, stop))
+        ]
+
+    def flush(self):
+        """Upsert all pending improvements in one batch"""
+        from .models import LeaderboardEntry
+
+        with self._lock:
+            pending, self._pending = self._pending, {}
+        if not pending:
+            return
+        try:
+            self._write(LeaderboardEntry, pending)
+        except Exception:
+            # Put the batch back unless a newer improvement replaced it
+            with self._lock:
+                for player_id, entry in pending.items():
+                    self._pending.setdefault(player_id, entry)
+            raise
+
+    @staticmethod
+    def _write(model, pending: Dict[str, Tuple[str, int, float]]):
+        """Upsert the entries that beat the stored best (rows are locked while compared)"""
+        with transaction.atomic():
+            stored = dict(
+                model.objects.select_for_update()
+                .filter(player_id__in=list(pending))
+                .values_list('player_id', 'score')
+            )
+            model.objects.bulk_create(
+                [
+                    model(
+                        player_id=player_id,
+                        name=name,
+                        score=score,
+                        achieved_at=datetime.fromtimestamp(achieved, tz=timezone.utc),
+                    )
+                    for player_id, (name, score, achieved) in pending.items()
+                    if score > stored.get(player_id, score - 1)
+                ],
+                update_conflicts=True,
+                unique_fields=['player_id'],
+                update_fields=['name', 'score', 'achieved_at'],
+            )
+
+    def _ensure_writer(self):
+        """Start the background writer on first use"""
+        if self.flush_seconds <= 0 or self._writer is not None:
+            return
+        with self._lock:
+            if self._writer is not None:
+                return
+            self._writer = threading.Thread(target=self._write_loop, name='leaderboard-writer', daemon=True)
+            self._writer.start()
+            atexit.register(self.flush)
+
+    def _write_loop(self):
+        while True:
+            self._wake.wait(self.flush_seconds)
+            self._wake.clear()
+            close_old_connections()
+            try:
+                self.flush()
+            except Exception:
+                pass  # The batch stays pending for the next round
+            finally:
+                connection.close()
+
+
+_leaderboard: Optional[Leaderboard] = None
+_leaderboard_lock = threading.Lock()
+
+
+def _new_leaderboard() -> Leaderboard:
+    return Leaderboard(
+        flush_seconds=getattr(settings, 'GAME_LEADERBOARD_FLUSH_SECONDS', 2.0),
+        batch_size=getattr(settings, 'GAME_LEADERBOARD_BATCH', 500),
+    )
+
+
+def get_leaderboard() -> Leaderboard:
+    """The process leaderboard, rebuilt from the database on first use"""
+    global _leaderboard
+    if _leaderboard is None:
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                board = _new_leaderboard()
+                board.load()
+                _leaderboard = board
+    return _leaderboard
+
+
+async def aget_leaderboard() -> Leaderboard:
+    """``get_leaderboard`` for async code: the first load uses the async ORM"""
+    global _leaderboard
+    if _leaderboard is None:
+        board = _new_leaderboard()
+        await board.aload()
+        with _leaderboard_lock:
+            if _leaderboard is None:
+                _leaderboard = board
+    return _leaderboard
@@ -0,0 +1,249 @@
+"""
+Middleware that stays async under ASGI
+
+Django's stock middleware are MiddlewareMixin classes, so under ASGI
+every hook runs through sync_to_async on the one thread-sensitive
+worker thread: a dozen thread hops per request, all queued behind each
+other. The hooks of the middleware below never block (they only look at
+headers, cookies and lazy objects), so these subclasses run them inline
+on the event loop. Under WSGI they behave exactly like Django's.
+
+SessionMiddleware does block, on session I/O; its async path saves the
+session with ``asave``, which the memory engine and Django's database
+engine implement natively.
+
+RateLimitMiddleware puts per-client token buckets in front of the API
+endpoints (and path prefixes) listed in GAME_RATE_LIMITS.
+"""
+import math
+import time
+from typing import Dict, List, Tuple
+
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+from django.conf import settings
+from django.contrib.auth.middleware import AuthenticationMiddleware as DjangoAuthenticationMiddleware
+from django.contrib.messages.middleware import MessageMiddleware as DjangoMessageMiddleware
+from django.contrib.sessions.backends.base import UpdateError
+from django.contrib.sessions.exceptions import SessionInterrupted
+from django.contrib.sessions.middleware import SessionMiddleware as DjangoSessionMiddleware
+from django.middleware.clickjacking import XFrameOptionsMiddleware as DjangoXFrameOptionsMiddleware
+from django.middleware.common import CommonMiddleware as DjangoCommonMiddleware
+from django.middleware.csrf import CsrfViewMiddleware as DjangoCsrfViewMiddleware
+from django.middleware.security import SecurityMiddleware as DjangoSecurityMiddleware
+from django.http import JsonResponse
+from django.utils.cache import patch_vary_headers
+from django.utils.http import http_date
+
+
+class InlineAsyncMixin:
+    """Run a non-blocking MiddlewareMixin's hooks inline when serving async"""
+
+    def __init__(self, get_response):
+        super().__init__(get_response)
+        if self.async_mode and hasattr(self, 'process_view'):
+            # The handler awaits coroutine functions and threads everything else
+            process_view = self.process_view
+
+            async def aprocess_view(request, view_func, view_args, view_kwargs):
+                return process_view(request, view_func, view_args, view_kwargs)
+
+            self.process_view = aprocess_view
+
+    async def __acall__(self, request):
+        response = self.process_request(request) if hasattr(self, 'process_request') else None
+        response = response or await self.get_response(request)
+        if hasattr(self, 'process_response'):
+            response = self.process_response(request, response)
+        return response
+
+
+class SecurityMiddleware(InlineAsyncMixin, DjangoSecurityMiddleware):
+    pass
+
+
+class CommonMiddleware(InlineAsyncMixin, DjangoCommonMiddleware):
+    pass
+
+
+class CsrfViewMiddleware(InlineAsyncMixin, DjangoCsrfViewMiddleware):
+    pass
+
+
+class AuthenticationMiddleware(InlineAsyncMixin, DjangoAuthenticationMiddleware):
+    pass
+
+
+class MessageMiddleware(InlineAsyncMixin, DjangoMessageMiddleware):
+    pass
+
+
+class XFrameOptionsMiddleware(InlineAsyncMixin, DjangoXFrameOptionsMiddleware):
+    pass
+
+
+class SessionMiddleware(DjangoSessionMiddleware):
+    """Drop-in SessionMiddleware with a native async path"""
+
+    async def __acall__(self, request):
+        self.process_request(request)  # Only builds the store; no I/O
+        response = await self.get_response(request)
+        return await self.aprocess_response(request, response)
+
+    async def aprocess_response(self, request, response):
+        """``process_response`` with the session saved by ``asave``"""
+        session = getattr(request, 'session', None)
+        if session is None:
+            return response
+        empty = session.is_empty()
+        if settings.SESSION_COOKIE_NAME in request.COOKIES and empty:
+            response.delete_cookie(
+                settings.SESSION_COOKIE_NAME,
+                path=settings.SESSION_COOKIE_PATH,
+                domain=settings.SESSION_COOKIE_DOMAIN,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+            patch_vary_headers(response, ('Cookie',))
+            return response
+        need_vary_cookie = session.accessed
+        if (session.modified or settings.SESSION_SAVE_EVERY_REQUEST) and not empty and response.status_code < 500:
+            if await session.aget_expire_at_browser_close():
+                max_age = expires = None
+            else:
+                max_age = await session.aget_expiry_age()
+                expires = http_date(time.time() + max_age)
+            try:
+                await session.asave()
+            except UpdateError:
+                raise SessionInterrupted(
+                    "The request's session was deleted before the request completed."
+                )
+            response.set_cookie(
+                settings.SESSION_COOKIE_NAME,
+                session.session_key,
+                max_age=max_age,
+                expires=expires,
+                domain=settings.SESSION_COOKIE_DOMAIN,
+                path=settings.SESSION_COOKIE_PATH,
+                secure=settings.SESSION_COOKIE_SECURE or None,
+                httponly=settings.SESSION_COOKIE_HTTPONLY or None,
+                samesite=settings.SESSION_COOKIE_SAMESITE,
+            )
+            need_vary_cookie = True
+        if need_vary_cookie:
+            patch_vary_headers(response, ('Cookie',))
+        return response
+
+
+class TokenBuckets:
+    """
+    Token buckets for one limit, one per client, at most ``max_clients``
+
+    A bucket holds up to ``burst`` tokens and refills at ``rate`` tokens a
+    second; each request takes one. Refilling is worked out when the
+    client is next seen, so idle buckets cost nothing until they are
+    dropped (a dropped client comes back with a full bucket). When full,
+    the least recently seen client is dropped: every take moves its
+    bucket to the end, so an active client keeps its (possibly empty)
+    bucket however many new clients arrive.
+
+    There is no lock: each dict operation is atomic under the GIL, and
+    two threads racing on one bucket can at worst both get its last token.
+    """
+
+    __slots__ = ('rate', 'burst', 'max_clients', '_buckets')
+
+    def __init__(self, rate: float, burst: float, max_clients: int):
+        self.rate = rate
+        self.burst = burst
+        self.max_clients = max_clients
+        self._buckets: Dict[str, list] = {}  # client -> [tokens, last refill], least recent first
+
+    def __len__(self) -> int:
+        return len(self._buckets)
+
+    def take(self, client, now: float) -> float:
+        """Take a token; returns 0.0, or the seconds until one will be available"""
+        buckets = self._buckets
+        bucket = buckets.pop(client, None)
+        if bucket is None:
+            bucket = self._add(client, now)
+        else:
+            buckets[client] = bucket  # Now the most recent
+            tokens = bucket[0] + (now - bucket[1]) * self.rate
+            bucket[0] = tokens if tokens < self.burst else self.burst
+            bucket[1] = now
+        tokens = bucket[0]
+        if tokens >= 1:
+            bucket[0] = tokens - 1
+            return 0.0
+        return (1 - tokens) / self.rate
+
+    def _add(self, client, now: float) -> list:
+        """A full bucket for a new client, dropping the least recent if over capacity"""
+        buckets = self._buckets
+        bucket = buckets[client] = [self.burst, now]
+        if len(buckets) > self.max_clients:
+            try:
+                del buckets[next(iter(buckets))]
+            except (KeyError, RuntimeError, StopIteration):  # Changed by another thread
+                pass
+        return bucket
+
+
+class RateLimitMiddleware:
+    """
+    Token-bucket rate limits per client address for the paths in
+    GAME_RATE_LIMITS
+
+    Each limited path maps to (requests per second, burst); a path ending
+    in ``*`` is a prefix, and every path under it shares one limit (so a
+    client cannot escape it by varying the rest). Clients are told apart by REMOTE_ADDR only: session cookies and tokens are chosen
+    by the client, so a made-up one must not buy a fresh bucket. A client
+    over its limit gets a 429 with Retry-After before the session is
+    loaded. Other paths cost one dict lookup plus a check per prefix.
+    Buckets are per worker and per rule, at most
+    GAME_RATE_LIMIT_MAX_CLIENTS of each.
+    """
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.async_mode = iscoroutinefunction(get_response)
+        if self.async_mode:
+            markcoroutinefunction(self)
+        max_clients = getattr(settings, 'GAME_RATE_LIMIT_MAX_CLIENTS', 100_000)
+        self.limits: Dict[str, TokenBuckets] = {}
+        self.prefixes: List[Tuple[str, TokenBuckets]] = []
+        for path, (rate, burst) in getattr(settings, 'GAME_RATE_LIMITS', {}).items():
+            buckets = TokenBuckets(float(rate), float(burst), max_clients)
+            if path.endswith('*'):
+                self.prefixes.append((path[:-1], buckets))
+            else:
+                self.limits[path] = buckets
+
+    def __call__(self, request):
+        if self.async_mode:
+            return self.__acall__(request)
+        return self.limit(request) or self.get_response(request)
+
+    async def __acall__(self, request):
+        return self.limit(request) or await self.get_response(request)
+
+    def limit(self, request):
+        """A 429 response if the client has no token left for this path, else None"""
+        path = request.path_info
+        buckets = self.limits.get(path)
+        if buckets is None:
+            for prefix, prefix_buckets in self.prefixes:
+                if path.startswith(prefix):
+                    buckets = prefix_buckets
+                    break
+            else:
+                return None
+        wait = buckets.take(request.META.get('REMOTE_ADDR'), time.monotonic())
+        if not wait:
+            return None
+        response = JsonResponse({'success': False, 'error': 'Too many requests'}, status=429)
+        response['Retry-After'] = str(math.ceil(wait))
+        return response
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-18 03:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    initial = True
+
+    dependencies = [
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='LeaderboardEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('player_id', models.CharField(max_length=64, unique=True)),
+                ('name', models.CharField(max_length=32)),
+                ('score', models.IntegerField()),
+                ('achieved_at', models.DateTimeField()),
+            ],
+            options={
+                'indexes': [models.Index(fields=['-score', 'achieved_at'], name='leaderboard_rank_idx')],
+            },
+        ),
+    ]
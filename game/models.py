@@ -1,3 +1,17 @@
 from django.db import models
 
-# Create your models here.
+
+class LeaderboardEntry(models.Model):
+    """A player's best finished game (written behind by game.leaderboard)"""
+    player_id = models.CharField(max_length=64, unique=True)
+    name = models.CharField(max_length=32)
+    score = models.IntegerField()
+    achieved_at = models.DateTimeField()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['-score', 'achieved_at'], name='leaderboard_rank_idx'),
+        ]
+
+    def __str__(self):
+        return f"{self.name}: {self.score}"
@@ -0,0 +1,135 @@
+"""
+Fast session engines for the game API
+
+    SESSION_ENGINE = 'game.session_backends.memory'  # in-process LRU
+    SESSION_ENGINE = 'game.session_backends.file'    # LRU written back to files
+
+Both keep sessions in one process-wide LRU (``SessionCache``) capped at
+GAME_SESSION_MAX_ENTRIES and evicting expired sessions by TTL. The memory
+engine never persists, so sessions are per worker and lost on restart.
+The file engine writes a session to GAME_SESSION_FILE_DIR only when the
+game crosses a level boundary (new game, level scored, next level), when
+the session is evicted from the LRU, and at exit; other writes only
+touch memory. Both engines therefore need a single worker process or
+sticky routing: a worker serves a cached session without looking at
+what another worker has written since.
+"""
+import threading
+import time
+from collections import OrderedDict
+from itertools import islice
+from typing import Callable, Dict, Optional, Tuple
+
+from django.conf import settings
+
+
+def level_marker(data: Dict) -> Tuple:
+    """Changes exactly when the session's game crosses a level boundary"""
+    return (
+        data.get('seed'),
+        data.get('current_level'),
+        len(data.get('level_history', ())),
+        data.get('player_name'),
+    )
+
+
+class SessionCache:
+    """
+    Thread-safe LRU of session key -> (expires at, data) with TTL eviction
+
+    ``on_evict(key, expires_at, data)`` is called for live sessions pushed
+    out by the size cap, so a write-back store can persist them, and
+    ``on_expire(key)`` for sessions dropped because they expired.
+
+    Expired sessions are dropped when next read, and each eviction checks
+    only the ``EXPIRE_BATCH`` least recent entries, so a full cache still
+    stores a session in O(1).
+    """
+
+    # Least recent entries checked for expiry per eviction
+    EXPIRE_BATCH = 16
+
+    def __init__(self, max_entries: int, on_evict: Callable = None, on_expire: Callable = None):
+        self.max_entries = max_entries
+        self.on_evict = on_evict
+        self.on_expire = on_expire
+        self._entries: 'OrderedDict[str, Tuple[float, Dict]]' = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[Tuple[float, Dict]]:
+        """(expires at, data) of a live session, refreshing its LRU position"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] > time.time():
+                self._entries.move_to_end(key)
+                return entry
+            del self._entries[key]
+        if self.on_expire is not None:
+            self.on_expire(key)
+        return None
+
+    def put(self, key: str, expires_at: float, data: Dict, must_create: bool = False) -> bool:
+        """Store a session; False if ``must_create`` and the key is taken"""
+        expired, evicted = [], []
+        with self._lock:
+            if must_create and key in self._entries and self._entries[key][0] > time.time():
+                return False
+            self._entries[key] = (expires_at, data)
+            self._entries.move_to_end(key)
+            if len(self._entries) > self.max_entries:
+                expired, evicted = self._evict()
+        self._expired(expired)
+        if self.on_evict is not None:
+            for old_key, (old_expiry, old_data) in evicted:
+                self.on_evict(old_key, old_expiry, old_data)
+        return True
+
+    def _drop_expired(self, limit: int = None) -> list:
+        """Remove expired sessions, all or among the ``limit`` least recent (lock held); returns their keys"""
+        now = time.time()
+        entries = self._entries.items() if limit is None else islice(self._entries.items(), limit)
+        expired = [key for key, (expires_at, _) in entries if expires_at <= now]
+        for key in expired:
+            del self._entries[key]
+        return expired
+
+    def _expired(self, keys: list):
+        """Report dropped expired sessions (lock released)"""
+        if self.on_expire is not None:
+            for key in keys:
+                self.on_expire(key)
+
+    def _evict(self):
+        """Drop a batch of expired sessions, then least recently used ones, down to the cap"""
+        expired = self._drop_expired(self.EXPIRE_BATCH)
+        evicted = []
+        now = time.time()
+        while len(self._entries) > self.max_entries:
+            key, entry = self._entries.popitem(last=False)
+            if entry[0] <= now:
+                expired.append(key)
+            else:
+                evicted.append((key, entry))
+        return expired, evicted
+
+    def pop(self, key: str):
+        with self._lock:
+            return self._entries.pop(key, None)
+
+    def items(self):
+        with self._lock:
+            return list(self._entries.items())
+
+    def clear_expired(self):
+        with self._lock:
+            expired = self._drop_expired()
+        self._expired(expired)
+
+
+def max_entries() -> int:
+    return getattr(settings, 'GAME_SESSION_MAX_ENTRIES', 100_000)
@@ -0,0 +1,223 @@
+"""
+File-backed session engine with write coalescing
+
+Reads and writes go to the shared LRU (see the package docstring). A
+session file is rewritten only when ``level_marker`` changes, when the
+session is evicted from the LRU, and at exit, so the several writes a
+level makes (level, recall, submit, next) reach the disk about twice.
+Files are signed with SessionBase.encode and replaced atomically; once
+there are more than GAME_SESSION_FILE_MAX_FILES, the oldest are removed.
+
+The files let sessions survive a restart; they are not a way to share
+sessions between workers. A worker serves a session from its own LRU
+without looking at the file, and the other workers' recent writes are
+not on disk yet, so run one worker or route each session to the same
+worker (sticky sessions), as with the memory engine.
+"""
+import atexit
+import os
+import tempfile
+import threading
+import time
+
+from django.conf import settings
+from django.contrib.sessions.backends.base import VALID_KEY_CHARS, CreateError, SessionBase, UpdateError
+
+from . import SessionCache, level_marker, max_entries
+
+FILE_PREFIX = 'session-'
+
+
+class FileSessions:
+    """The LRU plus the session directory it writes back to"""
+
+    def __init__(self, directory: str, max_files: int, max_entries: int):
+        self.directory = directory
+        self.max_files = max_files
+        os.makedirs(directory, exist_ok=True)
+        self.cache = SessionCache(max_entries, on_evict=self.write_evicted, on_expire=self.forget)
+        self._persisted = {}  # session key -> level marker on disk, for sessions in the LRU
+        self._files = sum(1 for name in os.listdir(directory) if name.startswith(FILE_PREFIX))
+        self._lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def path(self, key: str) -> str:
+        if not key or not set(key) <= set(VALID_KEY_CHARS):
+            raise ValueError('invalid session key')
+        return os.path.join(self.directory, FILE_PREFIX + key)
+
+    def read(self, key: str):
+        """(expires at, encoded data) from disk, or None"""
+        try:
+            with open(self.path(key), encoding='ascii') as f:
+                expires_at, encoded = f.read().split('\n', 1)
+        except (OSError, ValueError):
+            return None
+        return float(expires_at), encoded
+
+    def write(self, key: str, expires_at: float, encoded: str, marker):
+        path = self.path(key)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        with os.fdopen(fd, 'w', encoding='ascii') as f:
+            f.write(f'{expires_at!r}\n{encoded}')
+        new = not os.path.exists(path)
+        os.replace(tmp, path)
+        self.mark_persisted(key, marker)
+        with self._lock:
+            if new:
+                self._files += 1
+                prune = self._files > self.max_files
+            else:
+                prune = False
+        if prune:
+            self.prune()
+
+    def remove(self, key: str):
+        with self._lock:
+            self._persisted.pop(key, None)
+        try:
+            os.remove(self.path(key))
+        except (OSError, ValueError):
+            return
+        with self._lock:
+            self._files -= 1
+
+    def needs_write(self, key: str, marker) -> bool:
+        with self._lock:
+            return self._persisted.get(key) != marker
+
+    def mark_persisted(self, key: str, marker):
+        with self._lock:
+            self._persisted[key] = marker
+
+    def forget(self, key: str):
+        """The session left the LRU; its file (if any) stays until it expires"""
+        with self._lock:
+            self._persisted.pop(key, None)
+
+    def write_evicted(self, key, expires_at, data):
+        marker = level_marker(data)
+        if self.needs_write(key, marker):
+            self.write(key, expires_at, SessionBase().encode(data), marker)
+        self.forget(key)
+
+    def prune(self):
+        """Remove the least recently written files down to 90% of the cap"""
+        with os.scandir(self.directory) as scan:
+            entries = sorted(
+                (entry.stat().st_mtime, entry.name[len(FILE_PREFIX):])
+                for entry in scan if entry.name.startswith(FILE_PREFIX)
+            )
+        for _, key in entries[:max(0, len(entries) - int(self.max_files * 0.9))]:
+            self.remove(key)
+
+    def flush(self):
+        """Write every session changed since its last write (exit, tests)"""
+        for key, (expires_at, data) in self.cache.items():
+            marker = level_marker(data)
+            if self.needs_write(key, marker):
+                self.write(key, expires_at, SessionBase().encode(data), marker)
+
+
+_sessions = None
+_sessions_lock = threading.Lock()
+
+
+def get_sessions() -> FileSessions:
+    global _sessions
+    directory = str(getattr(settings, 'GAME_SESSION_FILE_DIR', None) or settings.BASE_DIR / 'stats' / 'sessions')
+    if _sessions is None or _sessions.directory != directory:
+        with _sessions_lock:
+            if _sessions is None or _sessions.directory != directory:
+                _sessions = FileSessions(
+                    directory,
+                    getattr(settings, 'GAME_SESSION_FILE_MAX_FILES', 1_000_000),
+                    max_entries(),
+                )
+    return _sessions
+
+
+class SessionStore(SessionBase):
+    """Session in the LRU, written back to its file at level boundaries"""
+
+    def load(self):
+        if not self.session_key:
+            return {}
+        sessions = get_sessions()
+        entry = sessions.cache.get(self.session_key)
+        if entry is None:
+            entry = self._load_file(sessions)
+        if entry is None:
+            self._session_key = None
+            return {}
+        return dict(entry[1])
+
+    def _load_file(self, sessions: FileSessions):
+        try:
+            stored = sessions.read(self.session_key)
+        except ValueError:
+            return None
+        if stored is None or stored[0] <= time.time():
+            return None
+        data = self.decode(stored[1])
+        sessions.cache.put(self.session_key, stored[0], data)
+        sessions.mark_persisted(self.session_key, level_marker(data))
+        return stored[0], data
+
+    def exists(self, session_key):
+        if not session_key:
+            return False
+        sessions = get_sessions()
+        if sessions.cache.get(session_key) is not None:
+            return True
+        try:
+            stored = sessions.read(session_key)
+        except ValueError:
+            return False
+        return stored is not None and stored[0] > time.time()
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        sessions = get_sessions()
+        if must_create and self.exists(self.session_key):
+            raise CreateError
+        if not must_create and sessions.cache.get(self.session_key) is None and not self.exists(self.session_key):
+            raise UpdateError
+        data = dict(self._get_session(no_load=must_create))
+        expires_at = time.time() + self.get_expiry_age()
+        if not sessions.cache.put(self.session_key, expires_at, data, must_create):
+            raise CreateError
+        marker = level_marker(data)
+        if sessions.needs_write(self.session_key, marker):
+            sessions.write(self.session_key, expires_at, self.encode(data), marker)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        sessions = get_sessions()
+        sessions.cache.pop(session_key)
+        sessions.remove(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        sessions = get_sessions()
+        sessions.cache.clear_expired()
+        now = time.time()
+        for name in os.listdir(sessions.directory):
+            if name.startswith(FILE_PREFIX):
+                stored = sessions.read(name[len(FILE_PREFIX):])
+                if stored is None or stored[0] <= now:
+                    sessions.remove(name[len(FILE_PREFIX):])
@@ -0,0 +1,86 @@
+"""
+In-process LRU session engine
+
+Sessions live in this worker's memory only: no serialization and no
+I/O per request. Use it with a single worker process (or sticky
+routing); sessions are lost on restart.
+"""
+import time
+
+from django.contrib.sessions.backends.base import CreateError, SessionBase, UpdateError
+
+from . import SessionCache, max_entries
+
+_cache = None
+
+
+def get_cache() -> SessionCache:
+    global _cache
+    if _cache is None:
+        _cache = SessionCache(max_entries())
+    return _cache
+
+
+class SessionStore(SessionBase):
+    """Session kept in the process-wide LRU"""
+
+    def _store(self) -> SessionCache:
+        return get_cache()
+
+    def load(self):
+        entry = self._store().get(self.session_key) if self.session_key else None
+        if entry is None:
+            self._session_key = None
+            return {}
+        # A copy, so an unsaved request never changes the stored session
+        return dict(entry[1])
+
+    def exists(self, session_key):
+        return bool(session_key) and self._store().get(session_key) is not None
+
+    def create(self):
+        while True:
+            self._session_key = self._get_new_session_key()
+            try:
+                self.save(must_create=True)
+            except CreateError:
+                continue
+            self.modified = True
+            return
+
+    def save(self, must_create=False):
+        if self.session_key is None:
+            return self.create()
+        store = self._store()
+        if not must_create and store.get(self.session_key) is None:
+            raise UpdateError
+        data = dict(self._get_session(no_load=must_create))
+        if not store.put(self.session_key, time.time() + self.get_expiry_age(), data, must_create):
+            raise CreateError
+
+    # Nothing here blocks, so the async API runs inline instead of in a thread
+    async def aload(self):
+        return self.load()
+
+    async def aexists(self, session_key):
+        return self.exists(session_key)
+
+    async def acreate(self):
+        return self.create()
+
+    async def asave(self, must_create=False):
+        return self.save(must_create)
+
+    async def adelete(self, session_key=None):
+        return self.delete(session_key)
+
+    def delete(self, session_key=None):
+        if session_key is None:
+            if self.session_key is None:
+                return
+            session_key = self.session_key
+        self._store().pop(session_key)
+
+    @classmethod
+    def clear_expired(cls):
+        get_cache().clear_expired()
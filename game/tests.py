@@ -1,3 +1,910 @@
-from django.test import TestCase
+import asyncio
+import base64
+import hashlib
+import json
+import os
+import random
+import tempfile
+import threading
+import time
+import zlib
+from unittest import mock
 
-# Create your tests here.
+from django.contrib.sessions.models import Session
+from django.test import TestCase, override_settings
+from django.urls import path
+
+from deal_catalog import DealCatalog, generate_deals
+from event_log import SOURCE_WEB, player_key, read_games
+from game_engine import GameConfig
+from item_pool import session_rng
+from game import async_views, leaderboard, timers, views
+from game.checks import check_stateless_cache
+from game.game_state import pack_deal, unpack_deal
+from game.leaderboard import IndexableSkipList, Leaderboard
+from game.middleware import TokenBuckets
+from game.session_backends import SessionCache, level_marker
+from game.timers import TimerWheel
+from game.session_backends import file as file_sessions
+from game.session_backends import memory as memory_sessions
+from game.models import LeaderboardEntry
+
+# Nothing the suite does may write to the working tree: every game data
+# directory points into one temporary directory while the tests run
+_data_dir = tempfile.TemporaryDirectory()
+_data_settings = override_settings(
+    GAME_EVENT_LOG_DIR=os.path.join(_data_dir.name, 'events'),
+    GAME_PERCENTILE_DIR=_data_dir.name,
+    GAME_SESSION_FILE_DIR=os.path.join(_data_dir.name, 'sessions'),
+)
+
+
+def setUpModule():
+    _data_settings.enable()
+
+
+def tearDownModule():
+    views.close_event_log()
+    views._percentile_store = None
+    _data_settings.disable()
+    _data_dir.cleanup()
+
+
+class LevelFlowTests(TestCase):
+    """Level setup and recall endpoints"""
+
+    def test_get_level_deals_configured_items(self):
+        self.client.get('/api/start/')
+        data = self.client.get('/api/level/').json()
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['level'], 1)
+        self.assertEqual(len(data['items']), data['good_count'] + data['bad_count'])
+        self.assertEqual(sum(item['is_good'] for item in data['items']), data['good_count'])
+
+    def test_recall_lists_the_dealt_items(self):
+        self.client.get('/api/start/')
+        level = self.client.get('/api/level/').json()
+        recall = self.client.get('/api/recall/').json()
+
+        self.assertEqual(
+            sorted(item['name'] for item in recall['items']),
+            sorted(item['name'] for item in level['items'])
+        )
+
+    def test_game_never_repeats_an_item(self):
+        self.client.get('/api/start/')
+        seen = []
+        for level in range(1, 6):
+            session = self.client.session
+            session['current_level'] = level
+            session.save()
+            seen += [item['name'] for item in self.client.get('/api/level/').json()['items']]
+
+        self.assertEqual(len(seen), len(set(seen)))
+
+    def test_session_seed_replays_the_level(self):
+        seed = self.client.get('/api/start/').json()['seed']
+        first = self.client.get('/api/level/').json()
+        again = self.client.get('/api/level/').json()
+
+        self.assertEqual(self.client.session['seed'], int(seed))
+        self.assertEqual(first['items'], again['items'])
+
+    def test_returned_seed_replays_the_deal(self):
+        # Later games fall in the player's cooldown window; their seeds must still replay
+        for url in ('/api/start/', '/api/game/', '/api/start/'):
+            seed = int(self.client.get(url).json()['seed'])
+            replayed = views.SCHEDULER.deal_game_positions(GameConfig.LEVELS, rng=session_rng(seed, 'deal'))
+
+            self.assertEqual(unpack_deal(self.client.session['deal']), replayed)
+
+    def test_session_keeps_only_the_compact_deal(self):
+        self.client.get('/api/start/')
+        level = self.client.get('/api/level/').json()
+        self.client.get('/api/recall/')
+        session = self.client.session
+
+        for key in ('good_items', 'bad_items', 'all_items', 'recall_order'):
+            self.assertNotIn(key, session)
+        good, bad = unpack_deal(session['deal'])[1]
+        self.assertEqual(len(good), level['good_count'])
+        self.assertEqual(len(bad), level['bad_count'])
+        self.assertLess(len(session['deal']), 200)  # All five levels
+
+    def test_deal_encoding_round_trips(self):
+        deal = {1: ([3, 70000], [5]), 2: ([], [1, 2])}
+
+        self.assertEqual(unpack_deal(pack_deal(deal)), deal)
+        self.assertEqual(unpack_deal(pack_deal({})), {})
+
+
+class DealCatalogViewTests(TestCase):
+    """Serving levels from a pre-generated deal file"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.tmp.name, 'deals.bin')
+        generate_deals(self.path, 3, seed=1, pool=views.ITEM_POOL)
+        views._deal_catalog = None
+
+    def tearDown(self):
+        if views._deal_catalog is not None:
+            views._deal_catalog.close()
+            views._deal_catalog = None
+        self.tmp.cleanup()
+
+    def test_level_and_recall_come_from_the_deal(self):
+        with override_settings(GAME_DEAL_CATALOG=self.path):
+            self.client.get('/api/start/')
+            deal_number = self.client.session['deal_number']
+            level = self.client.get('/api/level/').json()
+            recall = self.client.get('/api/recall/').json()
+
+        deals = DealCatalog.open(self.path)
+        _, _, display, recall_items = deals.level(deal_number, 1).items(views.ITEM_POOL)
+        deals.close()
+
+        self.assertEqual([item['name'] for item in level['items']], [i.text for i in display])
+        self.assertEqual([item['name'] for item in recall['items']], [i.text for i in recall_items])
+
+
+class FinalResultsTests(TestCase):
+    """Ranking on the results screen"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings = override_settings(GAME_PERCENTILE_DIR=self.tmp.name)
+        self.settings.enable()
+
+    def tearDown(self):
+        self.settings.disable()
+        views._percentile_store = None
+        self.tmp.cleanup()
+
+    def finish_game(self, total_score, level_scores=()):
+        self.client.get('/api/start/')
+        session = self.client.session
+        session['total_score'] = total_score
+        session['level_history'] = [
+            {'level': level, 'total_score': score} for level, score in level_scores
+        ]
+        session.save()
+        return self.client.get('/api/results/').json()
+
+    def test_rank_uses_percentage_of_max_score(self):
+        data = self.finish_game(125)  # 50% of the 250-point maximum
+
+        self.assertTrue(data['success'])
+        self.assertEqual(data['percentage'], 50.0)
+        self.assertEqual(data['rank_name'], 'Selective Learner')
+
+    def test_fractional_percentage_between_tiers(self):
+        data = self.finish_game(51)  # 20.4%, between the 0-20 and 21-40 tiers
+
+        self.assertEqual(data['rank_name'], 'Information Overloaded')
+
+    def test_percentile_against_earlier_games(self):
+        first = self.finish_game(100, [(1, 30)])
+        self.assertIsNone(first['percentile'])
+
+        for score in (40, 80, 120, 160):
+            self.finish_game(score, [(1, score // 4)])
+        data = self.finish_game(130, [(1, 35)])
+
+        self.assertEqual(data['percentile'], 80.0)  # beats 40, 80, 100 and 120
+        self.assertEqual(data['level_percentiles'], {'1': 80.0})
+
+    def test_reloading_results_records_the_game_once(self):
+        self.finish_game(100)
+        self.client.get('/api/results/')
+
+        self.assertEqual(views.get_percentile_store().local.count('overall'), 1)
+
+
+class SkipListTests(TestCase):
+    """Order statistics of the indexable skip list"""
+
+    def test_rank_and_slice_match_a_sorted_list(self):
+        rng = random.Random(3)
+        skip_list, reference = IndexableSkipList(seed=3), []
+        for _ in range(2000):
+            if reference and rng.random() < 0.3:
+                key = reference.pop(rng.randrange(len(reference)))
+                skip_list.remove(key)
+            else:
+                key = (rng.randrange(500), rng.random())
+                reference.append(key)
+                skip_list.insert(key, None)
+        reference.sort()
+
+        self.assertEqual(len(skip_list), len(reference))
+        self.assertEqual([skip_list.rank(key) for key in reference], list(range(len(reference))))
+        self.assertEqual([key for key, _ in skip_list.slice(10, 20)], reference[10:20])
+
+
+@override_settings(GAME_LEADERBOARD_FLUSH_SECONDS=0)
+class LeaderboardTests(TestCase):
+    """Ranking in memory, persisting write-behind"""
+
+    def setUp(self):
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        leaderboard._leaderboard = None
+
+    def test_rank_neighbours_and_best_score(self):
+        board = Leaderboard(flush_seconds=0)
+        for n, score in enumerate([50, 200, 120, 90, 160]):
+            board.submit(f'p{n}', f'Player {n}', score, achieved=n)
+
+        self.assertFalse(board.submit('p0', 'Player 0', 40))
+        self.assertTrue(board.submit('p0', 'Player 0', 130, achieved=9))
+        self.assertEqual([row.score for row in board.top(3)], [200, 160, 130])
+        self.assertEqual(board.rank('p0'), 3)
+        self.assertEqual([row.player_id for row in board.neighbours('p0', radius=1)], ['p4', 'p0', 'p2'])
+        self.assertIsNone(board.rank('nobody'))
+
+    def test_flush_writes_behind_and_load_rebuilds(self):
+        board = Leaderboard(flush_seconds=0)
+        board.submit('a', 'Ana', 180)
+        board.submit('b', 'Bo', 90)
+        self.assertEqual(LeaderboardEntry.objects.count(), 0)
+
+        board.flush()
+        board.submit('b', 'Bo', 200)
+        board.flush()
+        rebuilt = Leaderboard(flush_seconds=0)
+        rebuilt.load()
+
+        self.assertEqual(LeaderboardEntry.objects.get(player_id='b').score, 200)
+        self.assertEqual([(row.name, row.score) for row in rebuilt.top(5)], [('Bo', 200), ('Ana', 180)])
+
+    def test_stale_worker_never_lowers_a_stored_score(self):
+        stale = Leaderboard(flush_seconds=0)  # Loaded before the other worker's games
+        board = Leaderboard(flush_seconds=0)
+        board.submit('a', 'Ana', 180)
+        board.flush()
+        stale.submit('a', 'Ana', 120)
+        stale.submit('b', 'Bo', 90)
+        stale.flush()
+
+        self.assertEqual(
+            list(LeaderboardEntry.objects.order_by('player_id').values_list('player_id', 'score')),
+            [('a', 180), ('b', 90)]
+        )
+
+    def test_finished_game_appears_on_the_leaderboard(self):
+        self.client.get('/api/start/?player=Ana')
+        session = self.client.session
+        session['current_level'] = 5
+        session['total_score'] = 175
+        session.save()
+        self.client.get('/api/next/')
+        data = self.client.get('/api/leaderboard/').json()
+
+        self.assertEqual(data['rank'], 1)
+        self.assertEqual(data['top'], [{'rank': 1, 'name': 'Ana', 'score': 175, 'is_you': True}])
+        self.assertNotIn(self.client.session.session_key, str(data))
+
+
+class EventLogTests(TestCase):
+    """Finished web games in the binary event log"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings = override_settings(GAME_EVENT_LOG_DIR=self.tmp.name, GAME_LEADERBOARD_FLUSH_SECONDS=0)
+        self.settings.enable()
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        self.settings.disable()
+        views.close_event_log()
+        leaderboard._leaderboard = None
+        self.tmp.cleanup()
+
+    def play_game(self):
+        """Play all five levels, picking every good item"""
+        self.client.get('/api/start/')
+        for level in range(1, 6):
+            good = {item['name'] for item in self.client.get('/api/level/').json()['items'] if item['is_good']}
+            recall = self.client.get('/api/recall/').json()['items']
+            selected = [item['index'] for item in recall if item['name'] in good]
+            result = self.client.post('/api/submit/', {'selected': selected}, content_type='application/json').json()
+            self.assertTrue(result['success'], result)
+            self.client.get('/api/next/')
+
+    def test_finished_game_is_replayed_from_the_log(self):
+        self.play_game()
+        self.client.get('/api/next/')  # A repeated request does not log the game twice
+        views.get_event_log().commit()
+
+        games = list(read_games(self.tmp.name))
+        self.assertEqual(len(games), 1)
+        header, levels = games[0]
+        self.assertEqual(header.seed, self.client.session['seed'])
+        self.assertEqual(header.source, SOURCE_WEB)
+        public_id = hashlib.sha256(self.client.session.session_key.encode()).hexdigest()[:32]
+        self.assertEqual(header.player_id, player_key(public_id))
+        self.assertEqual(header.total_score, self.client.session['total_score'])
+        self.assertEqual([r.level_number for r in levels], [1, 2, 3, 4, 5])
+        self.assertTrue(all(r.forgotten_good == 0 and r.accuracy == 100.0 for r in levels))
+        self.assertEqual(sum(r.total_score for r in levels), header.total_score)
+
+    def test_changing_directory_closes_the_old_log(self):
+        self.play_game()
+        old = views.get_event_log()
+        with tempfile.TemporaryDirectory() as other, override_settings(GAME_EVENT_LOG_DIR=other):
+            self.assertIsNot(views.get_event_log(), old)
+            views.close_event_log()
+
+        self.assertIsNone(old._file)
+        self.assertEqual(len(list(read_games(self.tmp.name))), 1)  # Committed on close
+
+
+@override_settings(GAME_STATELESS=True, GAME_EVENT_LOG_DIR=None, GAME_PERCENTILE_DIR=None,
+                   GAME_LEADERBOARD_FLUSH_SECONDS=0)
+class StatelessTokenTests(TestCase):
+    """Game state in signed tokens instead of the session"""
+
+    def setUp(self):
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        leaderboard._leaderboard = None
+
+    def call(self, url, token, **kwargs):
+        """GET, or POST JSON if ``data`` is given; returns (json, rotated token)"""
+        if 'data' in kwargs:
+            response = self.client.post(url, kwargs['data'], content_type='application/json',
+                                        HTTP_X_GAME_TOKEN=token)
+        else:
+            response = self.client.get(url, HTTP_X_GAME_TOKEN=token)
+        return response.json(), response.headers.get('X-Game-Token')
+
+    def test_game_runs_without_sessions(self):
+        _, token = self.call('/api/start/?player=Ana', '')
+        for level in range(1, 6):
+            data, token = self.call('/api/level/', token)
+            self.assertEqual(data['level'], level)
+            good = {item['name'] for item in data['items'] if item['is_good']}
+            recall, token = self.call('/api/recall/', token)
+            selected = [item['index'] for item in recall['items'] if item['name'] in good]
+            result, token = self.call('/api/submit/', token, data={'selected': selected})
+            self.assertTrue(result['success'], result)
+            _, token = self.call('/api/next/', token)
+        results, token = self.call('/api/results/', token)
+        board, _ = self.call('/api/leaderboard/', token)
+
+        self.assertEqual(results['total_score'], sum(e['total_score'] for e in results['level_history']))
+        self.assertEqual(board['top'][0]['name'], 'Ana')
+        self.assertTrue(board['top'][0]['is_you'])
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_replayed_token_cannot_resubmit_a_level(self):
+        _, token = self.call('/api/start/', '')
+        _, before_submit = self.call('/api/level/', token)
+        first, _ = self.call('/api/submit/', before_submit, data={'selected': []})
+        replay, _ = self.call('/api/submit/', before_submit, data={'selected': [0, 1]})
+        _, rotated = self.call('/api/recall/', before_submit)
+        rotated_replay, _ = self.call('/api/submit/', rotated, data={'selected': [0, 1]})
+
+        self.assertTrue(first['success'])
+        self.assertFalse(replay['success'])
+        self.assertFalse(rotated_replay['success'])
+
+    def test_forged_and_expired_tokens_are_rejected(self):
+        _, token = self.call('/api/start/', '')
+
+        self.assertEqual(self.client.get('/api/level/', HTTP_X_GAME_TOKEN=token[:-2] + 'xx').status_code, 403)
+        self.assertEqual(self.client.get('/api/level/').status_code, 403)
+        with override_settings(GAME_TOKEN_MAX_AGE=-1):
+            self.assertEqual(self.client.get('/api/level/', HTTP_X_GAME_TOKEN=token).status_code, 403)
+
+    def test_rotation_does_not_outlive_the_game(self):
+        with mock.patch('game.game_state.time.time', return_value=time.time() - 7000):
+            _, token = self.call('/api/start/', '')
+        _, rotated = self.call('/api/level/', token)  # Freshly signed, game still current
+
+        with override_settings(GAME_TOKEN_MAX_AGE=6000):
+            self.assertEqual(self.client.get('/api/level/', HTTP_X_GAME_TOKEN=rotated).status_code, 403)
+
+    def test_token_does_not_reveal_the_deal(self):
+        _, token = self.call('/api/start/', '')
+        payload, _, _ = token.rpartition(':')[0].rpartition(':')
+        raw = base64.urlsafe_b64decode(payload + '=' * (-len(payload) % 4))
+
+        self.assertNotIn(b'"deal"', raw)
+        with self.assertRaises(zlib.error):
+            zlib.decompress(raw)
+
+    def test_system_check_requires_a_shared_cache(self):
+        locmem = {'default': {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'}}
+        database = {'default': {'BACKEND': 'django.core.cache.backends.db.DatabaseCache',
+                                'LOCATION': 'game_cache'}}
+        with override_settings(CACHES=locmem):
+            self.assertEqual([e.id for e in check_stateless_cache(None)], ['game.E001'])
+        with override_settings(CACHES=database):
+            self.assertEqual([e.id for e in check_stateless_cache(None)], ['game.W001'])
+        database['default']['OPTIONS'] = {'MAX_ENTRIES': 10_000_000}
+        with override_settings(CACHES=database):
+            self.assertEqual(check_stateless_cache(None), [])
+        with override_settings(CACHES=locmem, GAME_STATELESS=False):
+            self.assertEqual(check_stateless_cache(None), [])
+
+
+class SessionBackendTests(TestCase):
+    """In-process LRU and write-back file session engines"""
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.settings = override_settings(GAME_SESSION_FILE_DIR=self.tmp.name, GAME_EVENT_LOG_DIR=None,
+                                          GAME_PERCENTILE_DIR=None, GAME_LEADERBOARD_FLUSH_SECONDS=0)
+        self.settings.enable()
+        memory_sessions._cache = None
+        file_sessions._sessions = None
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        self.settings.disable()
+        memory_sessions._cache = None
+        file_sessions._sessions = None
+        leaderboard._leaderboard = None
+        self.tmp.cleanup()
+
+    def play_level(self):
+        good = {item['name'] for item in self.client.get('/api/level/').json()['items'] if item['is_good']}
+        recall = self.client.get('/api/recall/').json()['items']
+        selected = [item['index'] for item in recall if item['name'] in good]
+        result = self.client.post('/api/submit/', {'selected': selected}, content_type='application/json').json()
+        self.client.get('/api/next/')
+        return result
+
+    def test_game_plays_on_both_engines(self):
+        for engine in ('game.session_backends.memory', 'game.session_backends.file'):
+            with self.subTest(engine=engine), override_settings(SESSION_ENGINE=engine):
+                self.client.get('/api/start/')
+                scores = [self.play_level()['level_score'] for _ in range(5)]
+                results = self.client.get('/api/results/').json()
+
+                self.assertEqual(results['total_score'], sum(scores))
+                self.assertEqual(len(results['level_history']), 5)
+
+    def test_lru_evicts_least_recent_and_expired(self):
+        evicted = []
+        cache = SessionCache(2, on_evict=lambda key, *_: evicted.append(key))
+        cache.put('a', time.time() + 60, {})
+        cache.put('b', time.time() - 1, {})
+        cache.put('c', time.time() + 60, {})
+        self.assertIsNone(cache.get('b'))
+        cache.get('a')
+        cache.put('d', time.time() + 60, {})
+
+        self.assertEqual(evicted, ['c'])
+        self.assertEqual([key for key, _ in cache.items()], ['a', 'd'])
+
+    def test_full_lru_checks_only_a_batch_for_expiry(self):
+        expired = []
+        cache = SessionCache(4, on_expire=expired.append)
+        cache.EXPIRE_BATCH = 2
+        for key in ('a', 'b', 'c'):
+            cache.put(key, time.time() + 60, {})
+        cache.put('d', time.time() - 1, {})
+        cache.put('e', time.time() + 60, {})  # Over the cap: 'd' is past the batch
+
+        self.assertEqual(expired, [])
+        self.assertEqual([key for key, _ in cache.items()], ['b', 'c', 'd', 'e'])
+        self.assertIsNone(cache.get('d'))  # Dropped when read
+        self.assertEqual(expired, ['d'])
+
+    @override_settings(SESSION_ENGINE='game.session_backends.file')
+    def test_file_engine_writes_only_at_level_boundaries(self):
+        self.client.get('/api/start/')
+        sessions = file_sessions.get_sessions()
+        with mock.patch.object(sessions, 'write', wraps=sessions.write) as write:
+            self.play_level()
+
+        self.assertEqual(write.call_count, 2)  # Level scored, next level
+
+        # The file alone restores the session
+        key = self.client.session.session_key
+        file_sessions._sessions = None
+        self.assertEqual(self.client.session['current_level'], 2)
+        self.assertEqual(file_sessions.get_sessions().cache.get(key)[1]['current_level'], 2)
+
+    def test_file_engine_forgets_sessions_that_leave_the_lru(self):
+        sessions = file_sessions.FileSessions(self.tmp.name, max_files=100, max_entries=2)
+        for key in ('a', 'b', 'c'):
+            sessions.cache.put(key, time.time() + 60, {'seed': 1})
+            sessions.mark_persisted(key, level_marker({'seed': 1}))
+        sessions.mark_persisted('d', ())
+        sessions.cache.put('d', time.time() - 1, {})  # Expired: dropped at once
+
+        self.assertEqual(sorted(sessions._persisted), ['b', 'c'])
+
+
+class AsyncUrls:
+    """URLconf routing the API to the async views (as under ASGI)"""
+    urlpatterns = [
+        path('api/start/', async_views.start_game),
+        path('api/level/', async_views.get_level),
+        path('api/recall/', async_views.get_recall_items),
+        path('api/submit/', async_views.submit_answer),
+        path('api/next/', async_views.next_level),
+        path('api/round/', async_views.get_round),
+        path('api/answer/', async_views.submit_and_advance),
+        path('api/results/', async_views.get_final_results),
+        path('api/stream/<str:key>/', async_views.game_stream),
+    ]
+
+
+@override_settings(ROOT_URLCONF=AsyncUrls, GAME_EVENT_LOG_DIR=None, GAME_PERCENTILE_DIR=None,
+                   GAME_LEADERBOARD_FLUSH_SECONDS=0)
+class AsyncViewTests(TestCase):
+    """The async API views, with async session access"""
+
+    def setUp(self):
+        memory_sessions._cache = None
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        memory_sessions._cache = None
+        leaderboard._leaderboard = None
+
+    async def play_game(self):
+        await self.async_client.get('/api/start/?player=Ana')
+        scores = []
+        for _ in range(5):
+            level = (await self.async_client.get('/api/level/')).json()
+            good = {item['name'] for item in level['items'] if item['is_good']}
+            recall = (await self.async_client.get('/api/recall/')).json()['items']
+            selected = [item['index'] for item in recall if item['name'] in good]
+            result = (await self.async_client.post('/api/submit/', {'selected': selected},
+                                                   content_type='application/json')).json()
+            scores.append(result['level_score'])
+            await self.async_client.get('/api/next/')
+        return scores, (await self.async_client.get('/api/results/')).json()
+
+    async def test_game_plays_with_database_sessions(self):
+        scores, results = await self.play_game()
+
+        self.assertEqual(results['total_score'], sum(scores))
+        self.assertEqual([entry['level'] for entry in results['level_history']], [1, 2, 3, 4, 5])
+        self.assertEqual(leaderboard._leaderboard.top(1)[0].name, 'Ana')
+
+    @override_settings(SESSION_ENGINE='game.session_backends.memory')
+    async def test_game_plays_with_memory_sessions(self):
+        scores, results = await self.play_game()
+
+        self.assertEqual(results['total_score'], sum(scores))
+        self.assertEqual(len(memory_sessions.get_cache()), 1)
+
+    async def test_stream_pushes_the_level_phases(self):
+        start = (await self.async_client.get('/api/start/')).json()
+        stream = (await self.async_client.get(f"/api/stream/{start['stream']}/")).streaming_content
+
+        def quick(level, starts_at):
+            return {'level': level, 'starts_at': starts_at, 'recall_at': starts_at + 0.1,
+                    'deadline': starts_at + 0.2}
+
+        self.assertEqual(await anext(stream), b'retry: 3000\n\n')
+        with mock.patch('game.views.round_times', quick):
+            round_ = (await self.async_client.get('/api/round/')).json()
+        phases = []
+        for _ in range(3):
+            chunk = (await asyncio.wait_for(anext(stream), timeout=2)).decode()
+            event = json.loads(chunk.split('data: ')[1])
+            phases.append((event['phase'], event['level'], event['deadline']))
+
+        self.assertEqual(phases, [('memorize', 1, round_['recall_at']), ('recall', 1, round_['deadline']),
+                                  ('closed', 1, None)])
+
+    async def test_finishing_views_run_off_the_event_loop(self):
+        start = (await self.async_client.get('/api/start/')).json()
+        stream = (await self.async_client.get(f"/api/stream/{start['stream']}/")).streaming_content
+        await anext(stream)  # retry
+        threads = []
+        log_finished_game = views.log_finished_game
+
+        def record_thread(request):
+            threads.append(threading.get_ident())
+            return log_finished_game(request)
+
+        with mock.patch('game.views.log_finished_game', record_thread):
+            round_ = (await self.async_client.get('/api/round/')).json()
+            while True:
+                result = (await self.async_client.post('/api/answer/', {'selected': []},
+                                                       content_type='application/json')).json()
+                if result['game_complete']:
+                    break
+                round_ = result['next_round']
+        phases = []
+        while not phases or phases[-1] != 'complete':
+            chunk = (await asyncio.wait_for(anext(stream), timeout=2)).decode()
+            phases.append(chunk.split('\n')[0].removeprefix('event: '))
+
+        self.assertEqual(len(threads), 1)
+        self.assertNotEqual(threads[0], threading.get_ident())
+        self.assertIn('complete', phases)  # Published from the sync thread
+
+    async def test_stream_needs_a_started_game(self):
+        response = await self.async_client.get('/api/stream/made-up/')
+
+        self.assertEqual(response.status_code, 404)
+        self.assertNotIn('made-up', timers._listeners)
+
+    async def test_game_plays_one_request_per_level(self):
+        await self.async_client.get('/api/start/?player=Ana')
+        round_ = (await self.async_client.get('/api/round/')).json()
+        scores = []
+        while True:
+            good = {item['name'] for item in round_['items'] if item['is_good']}
+            selected = [item['index'] for item in round_['recall_items'] if item['name'] in good]
+            result = (await self.async_client.post('/api/answer/', {'selected': selected},
+                                                   content_type='application/json')).json()
+            scores.append(result['level_score'])
+            if result['game_complete']:
+                break
+            round_ = result['next_round']
+        results = (await self.async_client.get('/api/results/')).json()
+
+        self.assertEqual(results['total_score'], sum(scores))
+        self.assertEqual(leaderboard._leaderboard.top(1)[0].name, 'Ana')
+
+
+@override_settings(GAME_EVENT_LOG_DIR=None, GAME_PERCENTILE_DIR=None, GAME_LEADERBOARD_FLUSH_SECONDS=0)
+class RoundTripTests(TestCase):
+    """One request per level: round, then answer-and-advance"""
+
+    def setUp(self):
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        leaderboard._leaderboard = None
+
+    def answer(self, round_, pick_good=True):
+        """Submit the good items (or none) of a round"""
+        good = {item['name'] for item in round_['items'] if item['is_good']}
+        selected = [item['index'] for item in round_['recall_items'] if item['name'] in good] if pick_good else []
+        return self.client.post('/api/answer/', {'selected': selected}, content_type='application/json').json()
+
+    def test_round_matches_level_and_recall(self):
+        self.client.get('/api/start/')
+        round_ = self.client.get('/api/round/').json()
+
+        self.assertEqual(round_['items'], self.client.get('/api/level/').json()['items'])
+        self.assertEqual(round_['recall_items'], self.client.get('/api/recall/').json()['items'])
+        self.assertGreater(round_['display_time'], 0)
+        self.assertGreater(round_['typing_time'], 0)
+
+    def test_answer_scores_and_deals_the_next_level(self):
+        self.client.get('/api/start/')
+        result = self.answer(self.client.get('/api/round/').json())
+
+        self.assertTrue(result['is_perfect'])
+        self.assertFalse(result['game_complete'])
+        self.assertEqual(result['next_round']['level'], 2)
+        again = self.client.get('/api/round/').json()
+        for round_ in (result['next_round'], again):
+            del round_['server_time']
+        self.assertEqual(result['next_round'], again)  # Same deal, clock not restarted
+
+    def test_late_answer_is_not_accepted(self):
+        self.client.get('/api/start/')
+        round_ = self.client.get('/api/round/').json()
+        session = self.client.session
+        session['level_started'] -= round_['deadline'] - round_['starts_at'] + 60
+        session.save()
+        result = self.answer(round_)
+
+        self.assertTrue(result['late'])
+        self.assertEqual(result['correct_good'], 0)
+        self.assertEqual(result['next_round']['level'], 2)
+
+    def test_answer_without_fetching_the_level_is_late(self):
+        self.client.get('/api/start/')
+        result = self.client.post('/api/answer/', {'selected': [0]}, content_type='application/json').json()
+
+        self.assertTrue(result['late'])
+        self.assertEqual(result['correct_good'] + result['wrong_bad'], 0)
+
+    def test_next_round_starts_after_the_results_pause(self):
+        self.client.get('/api/start/')
+        before = time.time()
+        result = self.answer(self.client.get('/api/round/').json())
+        round_ = result['next_round']
+
+        self.assertFalse(result['late'])
+        self.assertGreaterEqual(round_['starts_at'], before + 5)
+        self.assertEqual(round_['recall_at'] - round_['starts_at'], round_['display_time'])
+        self.assertEqual(round_['deadline'] - round_['recall_at'], round_['typing_time'])
+
+    def test_whole_game_in_seven_requests(self):
+        self.client.get('/api/start/?player=Ana')
+        round_, scores = self.client.get('/api/round/').json(), []
+        for level in range(1, 6):
+            result = self.answer(round_, pick_good=level != 3)
+            self.assertTrue(result['success'], result)
+            scores.append(result['level_score'])
+            round_ = result.get('next_round')
+        results = self.client.get('/api/results/').json()
+
+        self.assertTrue(result['game_complete'])
+        self.assertNotIn('next_round', result)
+        self.assertEqual(results['total_score'], sum(scores))
+        self.assertEqual([entry['is_perfect'] for entry in results['level_history']],
+                         [True, True, False, True, True])
+        self.assertEqual(leaderboard._leaderboard.top(1)[0].name, 'Ana')
+
+
+@override_settings(GAME_EVENT_LOG_DIR=None, GAME_PERCENTILE_DIR=None, GAME_LEADERBOARD_FLUSH_SECONDS=0)
+class WholeGameSubmitTests(TestCase):
+    """Offline clients: fetch the whole game, submit all answers at once"""
+
+    def setUp(self):
+        leaderboard._leaderboard = None
+
+    def tearDown(self):
+        leaderboard._leaderboard = None
+
+    @staticmethod
+    def pick(round_, level):
+        """Every good item, except nothing at all on level 3"""
+        good = {item['name'] for item in round_['items'] if item['is_good']}
+        return [item['index'] for item in round_['recall_items'] if item['name'] in good] if level != 3 else []
+
+    def submit(self, game, answers=None, **extra):
+        answers = answers or [self.pick(r, r['level']) for r in game['rounds']]
+        return self.client.post('/api/game/submit/', {'deal_ref': game['deal_ref'], 'answers': answers, **extra},
+                                content_type='application/json').json()
+
+    def test_whole_game_in_two_requests(self):
+        game = self.client.get('/api/game/?player=Ana').json()
+        results = self.submit(game, times=[4, 5, 6, 7, 8])
+
+        self.assertTrue(results['success'], results)
+        self.assertEqual([r['level'] for r in game['rounds']], [1, 2, 3, 4, 5])
+        self.assertEqual(results['total_score'], sum(entry['total_score'] for entry in results['levels']))
+        self.assertEqual([entry['streak_bonus'] > 0 for entry in results['levels']],
+                         [False, True, False, False, True])
+        self.assertEqual(results['level_history'][4]['time_taken'], 8)
+        self.assertEqual(leaderboard._leaderboard.top(1)[0].name, 'Ana')
+
+    def test_scores_match_level_by_level_play(self):
+        with mock.patch('game.views.new_session_seed', return_value=1234):
+            game = self.client.get('/api/game/').json()
+            batch = self.submit(game)['level_history']
+
+            stepwise = self.client_class()
+            stepwise.get('/api/start/')
+            round_ = stepwise.get('/api/round/').json()
+            for level in range(1, 6):
+                result = stepwise.post('/api/answer/', {'selected': self.pick(round_, level)},
+                                       content_type='application/json').json()
+                round_ = result.get('next_round')
+            played = stepwise.get('/api/results/').json()['level_history']
+
+        for entry in batch + played:
+            del entry['time_taken']
+        self.assertEqual(batch, played)
+
+    def test_bad_or_replayed_references_are_rejected(self):
+        game = self.client.get('/api/game/').json()
+        forged = dict(game, deal_ref=game['deal_ref'][:-2] + 'xx')
+
+        self.assertFalse(self.submit(forged)['success'])
+        self.assertIn('5 levels', self.submit(game, answers=[[0]])['error'])
+        self.assertTrue(self.submit(game)['success'])
+        self.assertEqual(self.submit(game)['error'], 'Game already submitted')
+
+    def test_game_sent_after_its_deadline_is_not_ranked(self):
+        game = self.client.get('/api/game/').json()
+        with mock.patch('game.views.time.time', return_value=game['deadline'] + 60):
+            result = self.submit(game)
+
+        self.assertEqual(result['error'], 'Game deadline passed')
+        self.assertEqual(leaderboard.get_leaderboard().top(1), [])
+        self.assertTrue(self.submit(game, times=[999] * 5)['success'])
+        self.assertEqual(self.client.get('/api/results/').json()['level_history'][0]['time_taken'],
+                         views.level_seconds(1))
+
+        self.client.get('/api/game/')
+        self.assertEqual(self.submit(game)['error'], 'Deal reference is not for the current game')
+
+
+class TimerWheelTests(TestCase):
+    """Hashed timing wheel behind the event streams"""
+
+    def test_entries_fire_in_time_order_once(self):
+        wheel, fired = TimerWheel(tick=0.1, slots=8), []
+        wheel.advance(100.0)
+        for when in (100.55, 100.25, 103.05, 100.25):  # 103.05 is more than a turn ahead
+            wheel.schedule(when, fired.append, when)
+        wheel.advance(100.3)
+        self.assertEqual(fired, [100.25, 100.25])
+        wheel.advance(101.0)
+        self.assertEqual(fired, [100.25, 100.25, 100.55])
+        wheel.advance(110.0)  # Several turns at once
+        self.assertEqual(fired, [100.25, 100.25, 100.55, 103.05])
+        self.assertEqual(wheel.size, 0)
+
+    def test_cancelled_and_past_entries(self):
+        wheel, fired = TimerWheel(tick=0.1, slots=8), []
+        wheel.advance(50.0)
+        entry = wheel.schedule(50.5, fired.append, 'cancelled')
+        wheel.schedule(10.0, fired.append, 'past')
+        TimerWheel.cancel(entry)
+        wheel.advance(51.0)
+
+        self.assertEqual(fired, ['past'])
+        self.assertEqual(wheel.size, 0)
+
+    def test_many_games_share_one_wheel(self):
+        wheel, fired = TimerWheel(), []
+        wheel.advance(0.0)
+        rng = random.Random(4)
+        times = [rng.uniform(0.1, 120.0) for _ in range(30000)]
+        for n, when in enumerate(times):
+            wheel.schedule(when, fired.append, n)
+        for step in range(1, 2401):
+            wheel.advance(step * 0.05)
+
+        self.assertEqual(len(fired), len(times))
+        ticks = [int(times[n] / wheel.tick) for n in fired]
+        self.assertEqual(ticks, sorted(ticks))
+
+
+@override_settings(GAME_RATE_LIMITS={'/api/start/': (1, 3), '/api/round/': (2, 2)},
+                   GAME_EVENT_LOG_DIR=None)
+class RateLimitTests(TestCase):
+    """Per-address token buckets in front of the API"""
+
+    def test_burst_then_429_until_refilled(self):
+        with mock.patch('game.middleware.time.monotonic', return_value=100.0) as clock:
+            statuses = [self.client.get('/api/start/').status_code for _ in range(4)]
+            response = self.client.get('/api/start/')
+            self.assertEqual(self.client.get('/api/leaderboard/').status_code, 200)  # Not limited
+            clock.return_value = 101.0
+            refilled = self.client.get('/api/start/').status_code
+
+        self.assertEqual(statuses, [200, 200, 200, 429])
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['Retry-After'], '1')
+        self.assertEqual(response.json()['error'], 'Too many requests')
+        self.assertEqual(refilled, 200)
+
+    def test_made_up_session_cookies_share_the_address_bucket(self):
+        self.client.get('/api/start/')
+        with mock.patch('game.middleware.time.monotonic', return_value=100.0):
+            statuses = []
+            for n in range(3):
+                self.client.cookies['sessionid'] = f'made-up-{n}'
+                statuses.append(self.client.get('/api/round/').status_code)
+
+        self.assertEqual(statuses[-1], 429)
+
+    def test_only_starting_a_game_creates_state(self):
+        for url in ('/api/level/', '/api/recall/', '/api/round/', '/api/next/', '/api/results/'):
+            self.assertEqual(self.client_class().get(url).status_code, 409, url)
+        self.assertEqual(self.client_class().post('/api/submit/', {'selected': []},
+                                                  content_type='application/json').status_code, 409)
+
+        self.assertEqual(Session.objects.count(), 0)
+
+    def test_buckets_drop_the_least_recent_client(self):
+        buckets = TokenBuckets(rate=1, burst=2, max_clients=3)
+        for client in ('a', 'b', 'c'):
+            buckets.take(client, 0.0)
+        buckets.take('a', 0.0)  # 'a' is now empty and the most recent; 'b' is least recent
+        buckets.take('d', 0.0)
+
+        self.assertEqual(len(buckets), 3)
+        self.assertGreater(buckets.take('a', 0.0), 0)  # Still limited, however early it came
+        self.assertEqual(buckets.take('b', 0.0), 0.0)  # Dropped, so back with a full bucket
+
+    @override_settings(GAME_RATE_LIMITS={'/api/stream/*': (1, 2)})
+    def test_prefix_rule_limits_every_path_under_it(self):
+        with mock.patch('game.middleware.time.monotonic', return_value=100.0):
+            statuses = [self.client.get(f'/api/stream/key-{n}/').status_code for n in range(3)]
+
+        self.assertEqual(statuses, [501, 501, 429])
@@ -0,0 +1,297 @@
+"""
+Server-side phase timers for the game event stream
+
+Each level runs on the server's clock: memorize from ``starts_at``,
+recall from ``recall_at``, answers closed at ``deadline``. Clients with an
+open stream (``/api/stream/<key>/``, ASGI only) are told about every
+phase change as it happens. Only games started on this worker can be
+streamed, and only while they last.
+
+A worker keeps one hashed timing wheel, driven by a single asyncio task,
+for all its games. A level with listeners costs three wheel entries and
+no thread or task of its own, so one worker can time tens of thousands
+of concurrent games. Streams are per worker: a game's API calls and its
+stream must reach the same worker.
+"""
+import asyncio
+import time
+from typing import Callable, Dict, List, Optional, Set
+
+from django.conf import settings
+
+from .session_backends import SessionCache
+
+# Seconds per wheel slot, slots per turn, and seconds between keep-alive comments
+TICK = 0.05
+SLOTS = 1024
+HEARTBEAT = 15.0
+
+
+class TimerWheel:
+    """
+    Hashed timing wheel
+
+    Time is cut into ``tick``-second ticks laid on a ring of ``slots``
+    lists. An entry goes into the slot of the tick it is due on; entries
+    more than one turn ahead wait in their slot until that turn comes.
+    ``advance`` fires everything due, so the wheel can be driven by hand
+    (tests) or by ``run`` on the event loop.
+    """
+
+    def __init__(self, tick: float = TICK, slots: int = SLOTS):
+        self.tick = tick
+        self.slots: List[list] = [[] for _ in range(slots)]
+        self.size = 0
+        self._current: Optional[int] = None  # Last tick processed
+        self._wakeup: Optional[asyncio.Event] = None
+
+    def schedule(self, when: float, callback: Callable, *args) -> list:
+        """
+        Call ``callback(*args)`` at Unix time ``when`` (next tick if past)
+
+        Returns:
+            list: Handle for ``cancel``
+        """
+        due = int(when / self.tick)
+        if self._current is not None:
+            due = max(due, self._current + 1)
+        entry = [due, callback, args]
+        self.slots[due % len(self.slots)].append(entry)
+        self.size += 1
+        if self._wakeup is not None:
+            self._wakeup.set()
+        return entry
+
+    @staticmethod
+    def cancel(entry: list):
+        """Stop an entry from firing (it is dropped when its slot comes round)"""
+        entry[1] = None
+
+    def advance(self, now: float):
+        """Fire every entry due at or before ``now``"""
+        target = int(now / self.tick)
+        if self._current is None:  # First run: anything already due fires now
+            self._current = target - len(self.slots)
+        if target <= self._current:
+            return
+        ring = len(self.slots)
+        # More than a turn behind: every slot is visited once
+        first = max(self._current + 1, target - ring + 1)
+        self._current = target
+        for tick in range(first, target + 1):
+            slot = self.slots[tick % ring]
+            if not slot:
+                continue
+            waiting, due = [], []
+            for entry in slot:
+                if entry[1] is None:
+                    self.size -= 1
+                elif entry[0] <= target:
+                    due.append(entry)
+                else:
+                    waiting.append(entry)
+            self.slots[tick % ring] = waiting
+            for entry in due:
+                self.size -= 1
+                callback, entry[1] = entry[1], None
+                if callback is not None:  # Not cancelled by an earlier callback
+                    callback(*entry[2])
+
+    async def run(self):
+        """Drive the wheel from the event loop (sleeps while it is empty)"""
+        self._wakeup = asyncio.Event()
+        while True:
+            if self.size == 0:
+                self._wakeup.clear()
+                await self._wakeup.wait()
+            await asyncio.sleep(self.tick)
+            self.advance(time.time())
+
+
+# This worker's wheel and streams, bound to the event loop serving them
+_wheel: Optional[TimerWheel] = None
+_loop = None
+_task = None  # Keeps the wheel's task referenced
+_heartbeat_entry: Optional[list] = None
+_listeners: Dict[str, Set[asyncio.Queue]] = {}
+_timers: Dict[str, List[list]] = {}
+_rounds: Optional[SessionCache] = None
+_streaming = False  # A game was started on an event loop: this worker serves streams
+
+
+def max_games() -> int:
+    return getattr(settings, 'GAME_STREAM_MAX_GAMES', 100_000)
+
+
+def _running_loop():
+    try:
+        return asyncio.get_running_loop()
+    except RuntimeError:  # A worker thread: WSGI, or a sync view under ASGI
+        return None
+
+
+def _serves_streams() -> bool:
+    """True under ASGI, once a game has been started on the event loop"""
+    global _streaming
+    if not _streaming and _running_loop() is not None:
+        _streaming = True
+    return _streaming
+
+
+def _on_loop(function: Callable, *args):
+    """Call ``function`` on the wheel's event loop, from it or from a sync view's thread"""
+    running = _running_loop()
+    if running is not None and running is _loop:
+        function(*args)
+    elif running is None and _loop is not None and _loop.is_running():
+        _loop.call_soon_threadsafe(function, *args)
+
+
+def get_rounds() -> SessionCache:
+    """Stream key -> clock of the game's current level (None before its first), for streams opened mid-level"""
+    global _rounds
+    if _rounds is None:
+        _rounds = SessionCache(max_games())
+    return _rounds
+
+
+def get_wheel() -> TimerWheel:
+    """The wheel for the running event loop, started on first use"""
+    global _wheel, _loop, _task, _heartbeat_entry
+    loop = asyncio.get_running_loop()
+    if _wheel is None or _loop is not loop:
+        _wheel, _loop, _heartbeat_entry = TimerWheel(), loop, None
+        _listeners.clear()
+        _timers.clear()
+        _task = loop.create_task(_wheel.run())
+    return _wheel
+
+
+def _heartbeat():
+    """Keep-alive for every open stream; stops when there are none"""
+    global _heartbeat_entry
+    for queues in _listeners.values():
+        for queue in queues:
+            queue.put_nowait({'phase': 'ping'})
+    _heartbeat_entry = _wheel.schedule(time.time() + HEARTBEAT, _heartbeat) if _listeners else None
+
+
+def _event(phase: str, level: int, deadline: Optional[float]) -> Dict:
+    return {'phase': phase, 'level': level, 'deadline': deadline, 'server_time': time.time()}
+
+
+def _push(key: str, phase: str, level: int, deadline: Optional[float]):
+    event = _event(phase, level, deadline)
+    for queue in _listeners.get(key, ()):
+        queue.put_nowait(event)
+
+
+def _schedule_phases(key: str, times: Dict, after: float = None):
+    """Queue the level's phase changes (those later than ``after``) for the game's listeners"""
+    for entry in _timers.pop(key, ()):
+        TimerWheel.cancel(entry)
+    level = times['level']
+    phases = [
+        (times['starts_at'], 'memorize', times['recall_at']),
+        (times['recall_at'], 'recall', times['deadline']),
+        (times['deadline'], 'closed', None),
+    ]
+    _timers[key] = [
+        _wheel.schedule(when, _push, key, phase, level, deadline)
+        for when, phase, deadline in phases
+        if after is None or when > after
+    ]
+
+
+def current_phase(times: Dict, now: float) -> Dict:
+    """The phase event a level is in at ``now``"""
+    if now < times['starts_at']:
+        return _event('results', times['level'], times['starts_at'])
+    if now < times['recall_at']:
+        return _event('memorize', times['level'], times['recall_at'])
+    if now < times['deadline']:
+        return _event('recall', times['level'], times['deadline'])
+    return _event('closed', times['level'], None)
+
+
+def publish_game(key: Optional[str], expires_at: float):
+    """
+    A game has started: its stream may be opened until ``expires_at`` (or
+    the end of a later level). A no-op outside an event loop.
+    """
+    if not key or not _serves_streams():
+        return
+    get_rounds().put(key, expires_at, None)
+
+
+def publish_round(key: Optional[str], times: Dict):
+    """
+    A level's clock has been set (``times``: level, starts_at, recall_at,
+    deadline). A no-op under WSGI.
+    """
+    if not key or not _serves_streams():
+        return
+    rounds = get_rounds()
+    entry = rounds.get(key)
+    expires_at = times['deadline'] + HEARTBEAT
+    rounds.put(key, max(expires_at, entry[0]) if entry is not None else expires_at, times)
+    _on_loop(_reschedule, key, times)
+
+
+def _reschedule(key: str, times: Dict):
+    if key in _listeners:
+        _schedule_phases(key, times)
+
+
+def publish_complete(key: Optional[str]):
+    """The game is over: tell its listeners and forget its timers"""
+    if not key or not _serves_streams():
+        return
+    get_rounds().pop(key)
+    _on_loop(_complete, key)
+
+
+def _complete(key: str):
+    for entry in _timers.pop(key, ()):
+        TimerWheel.cancel(entry)
+    _push(key, 'complete', 0, None)
+
+
+def listen(key: str) -> Optional[asyncio.Queue]:
+    """
+    Subscribe to a game's phase changes (call on the event loop)
+
+    If a level is under way, its current phase is queued at once.
+
+    Returns:
+        asyncio.Queue: Events for the game, or None if no game on this
+        worker has that stream key
+    """
+    global _heartbeat_entry
+    entry = get_rounds().get(key)
+    if entry is None:
+        return None
+    wheel = get_wheel()
+    queue: asyncio.Queue = asyncio.Queue()
+    first = key not in _listeners
+    _listeners.setdefault(key, set()).add(queue)
+    if _heartbeat_entry is None:
+        _heartbeat_entry = wheel.schedule(time.time() + HEARTBEAT, _heartbeat)
+    if entry[1] is not None:
+        now = time.time()
+        queue.put_nowait(current_phase(entry[1], now))
+        if first:
+            _schedule_phases(key, entry[1], after=now)
+    return queue
+
+
+def unlisten(key: str, queue: asyncio.Queue):
+    """Drop a listener; a game nobody listens to keeps no timers"""
+    queues = _listeners.get(key)
+    if queues is None:
+        return
+    queues.discard(queue)
+    if not queues:
+        del _listeners[key]
+        for entry in _timers.pop(key, ()):
+            TimerWheel.cancel(entry)
@@ -1,17 +1,27 @@
 """
 URL configuration for game app
 """
+from django.conf import settings
 from django.urls import path
-from . import views
+from . import async_views, views
 
 app_name = 'game'
 
+# Native async views when GAME_ASYNC_VIEWS is set (ASGI only, see asgi.py), else sync views
+api = async_views if getattr(settings, 'GAME_ASYNC_VIEWS', False) else views
+
 urlpatterns = [
     path('', views.index, name='index'),
-    path('api/start/', views.start_game, name='start_game'),
-    path('api/level/', views.get_level, name='get_level'),
-    path('api/recall/', views.get_recall_items, name='get_recall'),
-    path('api/submit/', views.submit_answer, name='submit_answer'),
-    path('api/next/', views.next_level, name='next_level'),
-    path('api/results/', views.get_final_results, name='final_results'),
+    path('api/start/', api.start_game, name='start_game'),
+    path('api/level/', api.get_level, name='get_level'),
+    path('api/recall/', api.get_recall_items, name='get_recall'),
+    path('api/submit/', api.submit_answer, name='submit_answer'),
+    path('api/next/', api.next_level, name='next_level'),
+    path('api/round/', api.get_round, name='get_round'),
+    path('api/answer/', api.submit_and_advance, name='submit_and_advance'),
+    path('api/game/', api.start_whole_game, name='start_whole_game'),
+    path('api/game/submit/', api.submit_game, name='submit_game'),
+    path('api/results/', api.get_final_results, name='final_results'),
+    path('api/stream/<str:key>/', api.game_stream, name='game_stream'),
+    path('api/leaderboard/', views.get_leaderboard_view, name='leaderboard'),
 ]
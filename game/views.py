@@ -1,19 +1,91 @@
 """
 Views for Forget to Win browser-based game
 """
+from django.conf import settings
+from django.core import signing
 from django.shortcuts import render
 from django.http import JsonResponse
 from django.views.decorators.csrf import csrf_exempt
+import atexit
+import hashlib
 import json
-import random
+import secrets
+import time
 
 # Import game logic
 import sys
 from pathlib import Path
 sys.path.append(str(Path(__file__).resolve().parent.parent))
 
-from item_pool import ItemPool
-from game_engine import GameConfig, ScoreCalculator
+from item_pool import ItemPool, DealScheduler, new_session_seed, session_rng
+from deal_catalog import DealCatalog
+from percentiles import PercentileStore
+from event_log import EventLog, GameHeader, SOURCE_WEB, player_key
+from .game_state import (
+    claim_once, dump_deal_ref, game_api, issue, load_deal_ref, pack_deal, player_secret, unpack_deal
+)
+from .leaderboard import get_leaderboard
+from . import timers
+from game_engine import GameConfig, LevelResult, ScoreCalculator
+
+# Shared, read-only item pool for all requests
+ITEM_POOL = ItemPool()
+
+# Deals whole games; remembers recent items per session for the cooldown
+SCHEDULER = DealScheduler(ITEM_POOL, cooldown_games=GameConfig.DEAL_COOLDOWN_GAMES)
+
+# Stored with each session deal; a deal made against another catalog is re-dealt
+CATALOG_VERSION = ITEM_POOL.catalog_digest[:8]
+
+_deal_catalog = None
+
+
+def get_deal_catalog():
+    """Pre-generated deals from settings.GAME_DEAL_CATALOG, if configured"""
+    global _deal_catalog
+    path = getattr(settings, 'GAME_DEAL_CATALOG', None)
+    if path and _deal_catalog is None:
+        _deal_catalog = DealCatalog.open(str(path), ITEM_POOL)
+    return _deal_catalog if path else None
+
+
+_percentile_store = None
+
+
+def get_percentile_store():
+    """This worker's PercentileStore in settings.GAME_PERCENTILE_DIR, if configured"""
+    global _percentile_store
+    directory = getattr(settings, 'GAME_PERCENTILE_DIR', None)
+    if not directory:
+        return None
+    if _percentile_store is None or _percentile_store.directory != str(directory):
+        _percentile_store = PercentileStore(str(directory))
+    return _percentile_store
+
+
+_event_log = None
+
+
+def get_event_log():
+    """This worker's EventLog in settings.GAME_EVENT_LOG_DIR, if configured"""
+    global _event_log
+    directory = getattr(settings, 'GAME_EVENT_LOG_DIR', None)
+    if not directory:
+        return None
+    if _event_log is None or _event_log.directory != str(directory):
+        if _event_log is not None:
+            _event_log.close()  # The directory changed: finish the old log
+        _event_log = EventLog(str(directory))
+    return _event_log
+
+
+@atexit.register
+def close_event_log():
+    """Commit and close this worker's EventLog, if one is open"""
+    global _event_log
+    if _event_log is not None:
+        _event_log.close()
+        _event_log = None
 
 
 def index(request):
@@ -21,53 +93,170 @@ def index(request):
     return render(request, 'game/index.html')
 
 
+def get_session_seed(request) -> int:
+    """Seed for the session's random streams, created on first use"""
+    if 'seed' not in request.game:
+        request.game['seed'] = new_session_seed()
+    return request.game['seed']
+
+
+def deal_game(request) -> dict:
+    """Deal every level of the session's game up front (no repeated items)"""
+    # No player: the seed alone replays the deal (the cooldown picked the seed)
+    deal = SCHEDULER.deal_game_positions(
+        GameConfig.LEVELS,
+        rng=session_rng(get_session_seed(request), 'deal')
+    )
+    request.game['deal'] = pack_deal(deal)
+    request.game['catalog'] = CATALOG_VERSION
+    return deal
+
+
+def level_items(request, level: int):
+    """
+    Rebuild a level's items from the session's compact deal and seed
+    
+    Only called for a started game (game_api answers 409 otherwise); a
+    game dealt from an older item catalog is dealt again.
+    
+    Returns:
+        Tuple: (good_items, bad_items, display_items, recall_items)
+    """
+    if get_deal_catalog() is None or request.game.get('deal_number') is None:
+        if request.game.get('catalog') != CATALOG_VERSION:
+            deal_game(request)
+    return dealt_items(request.game, level)
+
+
+def dealt_items(state, level: int):
+    """
+    A level's items from a dealt game state (session, token or deal reference)
+    
+    Returns:
+        Tuple: (good_items, bad_items, display_items, recall_items)
+    """
+    deal_catalog = get_deal_catalog()
+    deal_number = state.get('deal_number')
+    if deal_catalog is not None and deal_number is not None:
+        # Pre-generated deal: positions and orders come from the file
+        return deal_catalog.level(deal_number, level).items(ITEM_POOL)
+    
+    good_positions, bad_positions = unpack_deal(state['deal'])[level]
+    good_items = [ITEM_POOL.all_items[p] for p in good_positions]
+    bad_items = [ITEM_POOL.all_items[p] for p in bad_positions]
+    
+    # Display and recall orders are replayed from the seed, never stored
+    seed = state['seed']
+    display_items = ItemPool.shuffle_display_items(good_items, bad_items, session_rng(seed, level, 'display'))
+    recall_items = list(display_items)
+    session_rng(seed, level, 'recall').shuffle(recall_items)
+    return good_items, bad_items, display_items, recall_items
+
+
+def new_game(request) -> int:
+    """Reset the game state and deal a new game; returns its seed"""
+    player = player_secret(request)
+    name = request.GET.get('player', '').strip()[:32]
+    if name or 'player_name' not in request.game:
+        request.game['player_name'] = name or f"Guest {player[:6]}"
+    
+    # Clear any existing game state; the returned seed replays the deal, so
+    # the player's cooldown chooses the seed rather than filtering its deal
+    deal_catalog = get_deal_catalog()
+    if deal_catalog is not None:
+        seed = new_session_seed()
+    else:
+        seed = SCHEDULER.pick_seed(GameConfig.LEVELS, player_id=player)
+    request.game['seed'] = seed
+    request.game['current_level'] = 1
+    request.game['total_score'] = 0
+    request.game['streak'] = 0
+    request.game['level_history'] = []
+    request.game['attempt'] = secrets.token_hex(8)  # Lets each level be scored once
+    request.game['stream'] = secrets.token_hex(16)  # Names the game's event stream
+    timers.publish_game(request.game['stream'], time.time() + game_duration())
+    issue(request.game)
+    request.game.pop('level_started', None)
+    request.game.pop('game_deadline', None)
+    
+    # Pick one pre-generated deal for the whole game, or deal it now
+    if deal_catalog is not None:
+        request.game['deal_number'] = session_rng(seed, 'deal_number').randrange(len(deal_catalog))
+    else:
+        request.game.pop('deal_number', None)
+        deal_game(request)
+    return seed
+
+
+@game_api(optional=True)
 def start_game(request):
     """Initialize a new game session"""
-    # Clear any existing game state
-    request.session['current_level'] = 1
-    request.session['total_score'] = 0
-    request.session['streak'] = 0
-    request.session['level_history'] = []
-    
+    seed = new_game(request)
     return JsonResponse({
         'success': True,
         'message': 'Game started!',
-        'level': 1
+        'level': 1,
+        'seed': str(seed),
+        'stream': request.game['stream']
     })
 
 
-def get_level(request):
-    """Get items for current level"""
-    level = request.session.get('current_level', 1)
+def round_times(level: int, starts_at: float) -> dict:
+    """Server clock of a level: memorize, recall and answer deadline"""
+    recall_at = starts_at + GameConfig.get_level_config(level)['display_time']
+    return {
+        'level': level,
+        'starts_at': starts_at,
+        'recall_at': recall_at,
+        'deadline': recall_at + GameConfig.TYPING_TIME.get(level, 30)
+    }
+
+
+def start_clock(request, starts_at: float = None) -> dict:
+    """
+    Start the current level's clock (now, or at ``starts_at``) and announce it
     
-    # Get level configuration
-    config = GameConfig.get_level_config(level)
+    The clock starts once per attempt; fetching the level again does not
+    restart it.
+    """
+    attempt = request.game.get('attempt')
+    if request.game.get('clock') == attempt and 'level_started' in request.game:
+        starts_at = request.game['level_started']
+    else:
+        starts_at = starts_at or time.time()
+        request.game['level_started'] = starts_at
+        request.game['clock'] = attempt
+    times = round_times(request.game.get('current_level', 1), starts_at)
+    timers.publish_round(request.game.get('stream'), times)
+    return times
+
+
+def level_data(request, level: int = None, starts_at: float = None) -> dict:
+    """
+    Memorization deal and timing for a level
     
-    # Get items from pool
-    good_items, bad_items = ItemPool.get_level_items(
-        config['good_items'],
-        config['bad_items']
-    )
+    For the current level (no ``level`` given) this also starts the
+    level's server clock and includes its phase times.
+    """
+    current = level is None
+    level = level or request.game.get('current_level', 1)
     
-    # Shuffle for display
-    all_items = ItemPool.shuffle_display_items(good_items, bad_items)
+    # Get level configuration
+    config = GameConfig.get_level_config(level)
     
-    # Store in session for validation
-    request.session['good_items'] = [item.name for item in good_items]
-    request.session['bad_items'] = [item.name for item in bad_items]
-    request.session['all_items'] = [item.name for item in all_items]
+    _, _, all_items, _ = level_items(request, level)
     
     # Create display data with symbols
     display_items = [
         {
-            'name': item.name,
+            'name': item.text,
             'symbol': '✅' if item.is_good else '❌',
             'is_good': item.is_good
         }
         for item in all_items
     ]
     
-    return JsonResponse({
+    data = {
         'success': True,
         'level': level,
         'display_time': config['display_time'],
@@ -76,146 +265,421 @@ def get_level(request):
         'total_items': len(all_items),
         'good_count': config['good_items'],
         'bad_count': config['bad_items']
-    })
+    }
+    if current:
+        data.update(start_clock(request, starts_at), server_time=time.time())
+    return data
 
 
-def get_recall_items(request):
-    """Get items for recall phase (without symbols)"""
-    all_items = request.session.get('all_items', [])
-    
-    # Shuffle again for recall (different order)
-    random.shuffle(all_items)
-    
-    # Store shuffled order
-    request.session['recall_order'] = all_items
+def recall_data(request, level: int = None) -> list:
+    """Recall order for a level, default the current one (names only, no symbols)"""
+    level = level or request.game.get('current_level', 1)
+    _, _, _, recall_order = level_items(request, level)
     
     recall_items = [
         {
             'index': i,
-            'name': name
+            'name': item.text
         }
-        for i, name in enumerate(all_items)
+        for i, item in enumerate(recall_order)
     ]
-    
+    return recall_items
+
+
+def round_data(request, level: int = None, starts_at: float = None) -> dict:
+    """Level data plus its recall order"""
+    data = level_data(request, level, starts_at)
+    data['recall_items'] = recall_data(request, level)
+    return data
+
+
+@game_api
+def get_level(request):
+    """Get items for current level"""
+    return JsonResponse(level_data(request))
+
+
+@game_api
+def get_recall_items(request):
+    """Get items for recall phase (without symbols)"""
     return JsonResponse({
         'success': True,
-        'items': recall_items
+        'items': recall_data(request)
     })
 
 
+@game_api
+def get_round(request):
+    """
+    Everything the client needs for the current level in one response:
+    the memorization deal, the recall order and the timing config
+    """
+    return JsonResponse(round_data(request))
+
+
+def submit_grace() -> float:
+    return getattr(settings, 'GAME_SUBMIT_GRACE_SECONDS', 2.0)
+
+
+def results_pause() -> float:
+    return getattr(settings, 'GAME_RESULTS_SECONDS', 5.0)
+
+
+def score_answer(request, selected_indices) -> dict:
+    """
+    Score the current level once; returns the submit response data
+    
+    An answer that arrives after the level's deadline (plus
+    GAME_SUBMIT_GRACE_SECONDS for the round trip) is rejected: the level
+    is scored as if nothing was selected and the response says ``late``.
+    So is an answer to a level whose clock was never started, i.e. whose
+    items were never fetched.
+    """
+    attempt = request.game.get('attempt')
+    if not claim_once(request, 'answered', attempt):
+        return {'success': False, 'error': 'Level already submitted'}
+    
+    # Rebuild the level from the session deal
+    current_level = request.game.get('current_level', 1)
+    current_streak = request.game.get('streak', 0)
+    started = request.game.get('level_started') if request.game.get('clock') == attempt else None
+    now = time.time()
+    late = started is None or now > round_times(current_level, started)['deadline'] + submit_grace()
+    if late:
+        selected_indices = []
+    good, bad, _, recall_order = level_items(request, current_level)
+    good_items = set(item.text for item in good)
+    
+    # Map indices to item names
+    selected_items = set(recall_order[i].text for i in selected_indices if 0 <= i < len(recall_order))
+    
+    # Calculate results
+    correct_good = len(selected_items & good_items)
+    forgotten_good = len(good_items - selected_items)
+    wrong_bad = len(selected_items - good_items)
+    
+    # Calculate score (the streak bonus uses the streak going into this level)
+    base_score, streak_bonus, total_score = ScoreCalculator.calculate_level_score(
+        correct_good,
+        len(good_items),
+        wrong_bad,
+        current_streak
+    )
+    total_bad = len(bad)
+    accuracy = ScoreCalculator.calculate_accuracy(correct_good, len(good_items), wrong_bad, total_bad)
+    
+    # Check if perfect (all good, no bad)
+    is_perfect = (correct_good == len(good_items) and wrong_bad == 0)
+    
+    # Update streak
+    if is_perfect:
+        current_streak += 1
+    else:
+        current_streak = 0
+    
+    # Update session
+    request.game['streak'] = current_streak
+    cumulative_score = request.game.get('total_score', 0) + total_score
+    request.game['total_score'] = cumulative_score
+    
+    # Store level history
+    level_history = request.game.get('level_history', [])
+    level_history.append({
+        'level': current_level,
+        'base_score': base_score,
+        'streak_bonus': streak_bonus,
+        'total_score': total_score,
+        'correct': correct_good,
+        'forgotten': forgotten_good,
+        'wrong': wrong_bad,
+        'total_good': len(good_items),
+        'total_bad': total_bad,
+        'accuracy': accuracy,
+        'time_taken': max(0.0, now - (started or now)),
+        'is_perfect': is_perfect
+    })
+    request.game['level_history'] = level_history
+    
+    return {
+        'success': True,
+        'correct_good': correct_good,
+        'total_good': len(good_items),
+        'forgotten_good': forgotten_good,
+        'wrong_bad': wrong_bad,
+        'base_score': base_score,
+        'streak': current_streak,
+        'streak_bonus': streak_bonus,
+        'level_score': total_score,
+        'cumulative_score': cumulative_score,
+        'is_perfect': is_perfect,
+        'late': late,
+        'good_items': list(good_items)
+    }
+
+
+def check_indices(selected) -> list:
+    """``selected`` if it is a list of recall indices, else ValueError"""
+    if not isinstance(selected, list) or not all(isinstance(i, int) for i in selected):
+        raise ValueError('selected must be a list of recall indices')
+    return selected
+
+
+def parse_selected(request) -> list:
+    """The ``selected`` recall indices from a JSON POST body"""
+    return check_indices(json.loads(request.body).get('selected', []))
+
+
 @csrf_exempt
+@game_api
 def submit_answer(request):
     """Validate user's answer and calculate score"""
     if request.method != 'POST':
         return JsonResponse({'success': False, 'error': 'POST required'})
     
     try:
-        data = json.loads(request.body)
-        selected_indices = data.get('selected', [])
-        
-        # Get stored data
-        good_items = set(request.session.get('good_items', []))
-        recall_order = request.session.get('recall_order', [])
-        current_level = request.session.get('current_level', 1)
-        current_streak = request.session.get('streak', 0)
-        
-        # Map indices to item names
-        selected_items = set(recall_order[i] for i in selected_indices if i < len(recall_order))
-        
-        # Calculate results
-        correct_good = len(selected_items & good_items)
-        forgotten_good = len(good_items - selected_items)
-        wrong_bad = len(selected_items - good_items)
-        
-        # Calculate score
-        base_score = ScoreCalculator.calculate_base_score(
-            correct_good,
-            forgotten_good,
-            wrong_bad
-        )
-        
-        # Check if perfect (all good, no bad)
-        is_perfect = (correct_good == len(good_items) and wrong_bad == 0)
-        
-        # Update streak
-        if is_perfect:
-            current_streak += 1
-        else:
-            current_streak = 0
-        
-        # Calculate streak bonus
-        streak_bonus = ScoreCalculator.calculate_streak_bonus(base_score, current_streak)
-        total_score = base_score + streak_bonus
-        
-        # Update session
-        request.session['streak'] = current_streak
-        cumulative_score = request.session.get('total_score', 0) + total_score
-        request.session['total_score'] = cumulative_score
-        
-        # Store level history
-        level_history = request.session.get('level_history', [])
-        level_history.append({
-            'level': current_level,
-            'base_score': base_score,
-            'streak_bonus': streak_bonus,
-            'total_score': total_score,
-            'correct': correct_good,
-            'forgotten': forgotten_good,
-            'wrong': wrong_bad,
-            'is_perfect': is_perfect
-        })
-        request.session['level_history'] = level_history
-        
-        # Prepare response
-        response_data = {
-            'success': True,
-            'correct_good': correct_good,
-            'total_good': len(good_items),
-            'forgotten_good': forgotten_good,
-            'wrong_bad': wrong_bad,
-            'base_score': base_score,
-            'streak': current_streak,
-            'streak_bonus': streak_bonus,
-            'level_score': total_score,
-            'cumulative_score': cumulative_score,
-            'is_perfect': is_perfect,
-            'good_items': list(good_items)
-        }
-        
-        return JsonResponse(response_data)
-        
+        return JsonResponse(score_answer(request, parse_selected(request)))
     except Exception as e:
         return JsonResponse({'success': False, 'error': str(e)})
 
 
-def next_level(request):
-    """Advance to next level"""
-    current_level = request.session.get('current_level', 1)
+def advance_level(request) -> dict:
+    """Move to the next level, or finish the game after level 5"""
+    current_level = request.game.get('current_level', 1)
     
     if current_level >= 5:
-        # Game complete
-        return JsonResponse({
+        # Game complete: rank the player's best in the in-memory leaderboard
+        get_leaderboard().submit(
+            leaderboard_id(request),
+            request.game.get('player_name', 'Guest'),
+            request.game.get('total_score', 0)
+        )
+        log_finished_game(request)
+        timers.publish_complete(request.game.get('stream'))
+        return {
             'success': True,
             'game_complete': True,
-            'final_score': request.session.get('total_score', 0),
-            'level_history': request.session.get('level_history', [])
-        })
+            'final_score': request.game.get('total_score', 0),
+            'level_history': request.game.get('level_history', [])
+        }
     
     # Advance level
     next_level_num = current_level + 1
-    request.session['current_level'] = next_level_num
+    request.game['current_level'] = next_level_num
+    request.game['attempt'] = secrets.token_hex(8)
     
-    return JsonResponse({
+    return {
         'success': True,
         'game_complete': False,
         'next_level': next_level_num
+    }
+
+
+@game_api
+def next_level(request):
+    """Advance to next level"""
+    return JsonResponse(advance_level(request))
+
+
+@csrf_exempt
+@game_api
+def submit_and_advance(request):
+    """
+    Score the current level and move on in one request
+    
+    The response is the submit result plus ``game_complete`` and, while
+    the game goes on, ``next_round``: the next level as ``get_round``
+    returns it. Its clock starts GAME_RESULTS_SECONDS from now, which
+    leaves the player time to look at the level results.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'POST required'})
+    
+    try:
+        result = score_answer(request, parse_selected(request))
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    if not result['success']:
+        return JsonResponse(result)
+    
+    progress = advance_level(request)
+    result['game_complete'] = progress['game_complete']
+    if not progress['game_complete']:
+        result['next_round'] = round_data(request, starts_at=time.time() + results_pause())
+    return JsonResponse(result)
+
+
+@game_api(optional=True)
+def start_whole_game(request):
+    """
+    Start a game and hand out all of it, for clients that play offline
+    
+    Returns every level as ``get_round`` would, plus a signed deal
+    reference to send back with the answers to ``submit_game`` before
+    ``deadline``: the time the levels would take played back to back.
+    """
+    seed = new_game(request)
+    request.game['game_deadline'] = time.time() + game_duration()
+    return JsonResponse({
+        'success': True,
+        'seed': str(seed),
+        'deadline': request.game['game_deadline'],
+        'deal_ref': dump_deal_ref(request.game),
+        'rounds': [round_data(request, level) for level in sorted(GameConfig.LEVELS)]
     })
 
 
-def get_final_results(request):
-    """Get final game results"""
-    total_score = request.session.get('total_score', 0)
-    level_history = request.session.get('level_history', [])
+def level_seconds(level: int) -> float:
+    """Memorize plus recall time of a level"""
+    return GameConfig.get_level_config(level)['display_time'] + GameConfig.TYPING_TIME.get(level, 30)
+
+
+def game_duration() -> float:
+    """Seconds a whole game takes played level by level, results pauses included"""
+    levels = sorted(GameConfig.LEVELS)
+    return sum(level_seconds(level) for level in levels) + (len(levels) - 1) * results_pause()
+
+
+def score_game(request, ref: dict, answers: list, times: list) -> list:
+    """
+    Score every level of a locally played game in one pass
+    
+    Items are rebuilt from the deal reference. The streak going into a
+    level only depends on which earlier levels were perfect, so streaks
+    are worked out in level order first and all levels are then scored by
+    a single ``ScoreCalculator.score_levels_batch`` call. The history is
+    written to the game state once.
+    
+    Returns:
+        list: Per-level results, as in the game's level history
+    """
+    levels = sorted(GameConfig.LEVELS)
+    counts, streaks, streak = [], [], 0
+    for level, selected in zip(levels, answers):
+        good, bad, _, recall_order = dealt_items(ref, level)
+        good_items = set(item.text for item in good)
+        selected_items = set(recall_order[i].text for i in selected if 0 <= i < len(recall_order))
+        correct_good = len(selected_items & good_items)
+        wrong_bad = len(selected_items - good_items)
+        counts.append((correct_good, len(good_items), wrong_bad, len(bad)))
+        streaks.append(streak)
+        streak = streak + 1 if correct_good == len(good_items) and wrong_bad == 0 else 0
+    
+    correct, total_good, wrong, total_bad = zip(*counts)
+    base, bonus, total, accuracy = ScoreCalculator.score_levels_batch(
+        correct, total_good, wrong, total_bad, streaks
+    )
+    
+    history = [
+        {
+            'level': level,
+            'base_score': int(base[n]),
+            'streak_bonus': int(bonus[n]),
+            'total_score': int(total[n]),
+            'correct': correct[n],
+            'forgotten': total_good[n] - correct[n],
+            'wrong': wrong[n],
+            'total_good': total_good[n],
+            'total_bad': total_bad[n],
+            'accuracy': float(accuracy[n]),
+            'time_taken': min(times[n], level_seconds(level)),
+            'is_perfect': correct[n] == total_good[n] and wrong[n] == 0
+        }
+        for n, level in enumerate(levels)
+    ]
+    request.game['level_history'] = history
+    request.game['total_score'] = sum(entry['total_score'] for entry in history)
+    request.game['streak'] = streak
+    request.game['current_level'] = levels[-1]
+    return history
+
+
+@csrf_exempt
+@game_api
+def submit_game(request):
+    """
+    Score a whole game sent in one POST and return the final results
+    
+    Body: ``deal_ref`` from ``start_whole_game``, ``answers`` (one list of
+    recall indices per level) and optionally ``times`` (seconds per level,
+    as measured by the client, capped at the level's time). A game sent
+    after its deadline (plus GAME_SUBMIT_GRACE_SECONDS) is not scored, so
+    batch games are held to the same clock as games played round by round.
+    """
+    if request.method != 'POST':
+        return JsonResponse({'success': False, 'error': 'POST required'})
+    
+    try:
+        data = json.loads(request.body)
+        ref = load_deal_ref(data.get('deal_ref', ''))
+        answers = [check_indices(selected) for selected in data.get('answers', [])]
+        times = [max(0.0, float(t)) for t in data.get('times', [0.0] * len(answers))]
+    except signing.BadSignature:
+        return JsonResponse({'success': False, 'error': 'Invalid or expired deal reference'})
+    except Exception as e:
+        return JsonResponse({'success': False, 'error': str(e)})
+    
+    if len(answers) != len(GameConfig.LEVELS) or len(times) != len(answers):
+        return JsonResponse({'success': False, 'error': f'Expected answers for {len(GameConfig.LEVELS)} levels'})
+    if ref.get('attempt') != request.game.get('attempt'):
+        return JsonResponse({'success': False, 'error': 'Deal reference is not for the current game'})
+    if 'deal_number' not in ref and ref.get('catalog') != CATALOG_VERSION:
+        return JsonResponse({'success': False, 'error': 'Deal was made from another item catalog'})
+    if time.time() > request.game.get('game_deadline', 0) + submit_grace():
+        return JsonResponse({'success': False, 'error': 'Game deadline passed'})
+    if not claim_once(request, 'answered', ref['attempt']):
+        return JsonResponse({'success': False, 'error': 'Game already submitted'})
+    
+    levels = score_game(request, ref, answers, times)
+    advance_level(request)  # Last level: leaderboard and event log
+    results = final_results(request)
+    results['levels'] = levels
+    return JsonResponse(results)
+
+
+def game_stream(request, key):
+    """Phase events need the ASGI server (see async_views.game_stream)"""
+    return JsonResponse({'success': False, 'error': 'Event streams are served under ASGI only'}, status=501)
+
+
+def log_finished_game(request):
+    """Append the session's game to the event log (once per game)"""
+    log = get_event_log()
+    history = request.game.get('level_history', [])
+    seed = request.game.get('seed')
+    if log is None or not history or not claim_once(request, 'event_logged', seed):
+        return
+    levels = [
+        LevelResult(
+            level_number=entry['level'],
+            correct_good=entry['correct'],
+            total_good=entry['total_good'],
+            incorrect_bad=entry['wrong'],
+            total_bad=entry['total_bad'],
+            forgotten_good=entry['forgotten'],
+            base_score=entry['base_score'],
+            streak_bonus=entry['streak_bonus'],
+            total_score=entry['total_score'],
+            accuracy=entry['accuracy'],
+            time_taken=entry['time_taken']
+        )
+        for entry in history
+    ]
+    # Not durable=True: the request should not wait for the group commit
+    log.append_game(GameHeader(
+        game_id=new_session_seed(),
+        player_id=player_key(leaderboard_id(request) or ''),
+        seed=seed or 0,
+        finished_at=time.time(),
+        total_score=request.game.get('total_score', 0),
+        level_count=len(levels),
+        source=SOURCE_WEB
+    ), levels)
+
+
+def final_results(request) -> dict:
+    """Rank and standing for the finished game"""
+    total_score = request.game.get('total_score', 0)
+    level_history = request.game.get('level_history', [])
     
     # Calculate rank
     max_score = GameConfig.get_max_possible_score()
@@ -223,7 +687,16 @@ def get_final_results(request):
     
     rank_name, rank_badge, rank_tagline = GameConfig.get_rank(percentage)
     
-    return JsonResponse({
+    # Rank against other players; each game is recorded once
+    standing = {'overall': None, 'levels': {}}
+    store = get_percentile_store()
+    if store is not None:
+        level_scores = {entry['level']: entry['total_score'] for entry in level_history}
+        standing = store.percentiles(level_scores, total_score)
+        if claim_once(request, 'percentile_recorded', request.game.get('seed')):
+            store.record_game(level_scores, total_score)
+    
+    return {
         'success': True,
         'total_score': total_score,
         'max_score': max_score,
@@ -231,5 +704,44 @@ def get_final_results(request):
         'rank_name': rank_name,
         'rank_badge': rank_badge,
         'rank_tagline': rank_tagline,
+        'percentile': standing['overall'],
+        'level_percentiles': standing['levels'],
         'level_history': level_history
+    }
+
+
+@game_api
+def get_final_results(request):
+    """Get final game results"""
+    return JsonResponse(final_results(request))
+
+
+def leaderboard_id(request):
+    """Public player id: a hash of the player's secret id"""
+    key = player_secret(request, create=False)
+    return hashlib.sha256(key.encode()).hexdigest()[:32] if key else None
+
+
+@game_api(optional=True)
+def get_leaderboard_view(request):
+    """Top players, plus the caller's rank and neighbours (served from memory)"""
+    try:
+        limit = min(max(int(request.GET.get('limit', 10)), 1), 100)
+    except ValueError:
+        limit = 10
+    board = get_leaderboard()
+    player_id = leaderboard_id(request)
+    
+    def rows(standings):
+        return [
+            {'rank': s.rank, 'name': s.name, 'score': s.score, 'is_you': s.player_id == player_id}
+            for s in standings
+        ]
+    
+    return JsonResponse({
+        'success': True,
+        'players': len(board),
+        'top': rows(board.top(limit)),
+        'rank': board.rank(player_id) if player_id else None,
+        'neighbours': rows(board.neighbours(player_id)) if player_id else [],
     })
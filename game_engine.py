@@ -6,6 +6,7 @@ and UI components.
 
 Classes:
     - GameConfig: Static configuration for game difficulty and progression
+    - RankTable: Compiled rank thresholds with bisect lookup
     - ScoreCalculator: Handles all scoring logic
     - LevelManager: Manages level progression and state
     - GameDisplay: Handles all visual display elements
@@ -15,8 +16,11 @@ Author: Development Team
 Version: 1.1
 """
 
+from array import array
+from bisect import bisect_right
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from typing import List, Dict, Optional, Sequence, Tuple
+import random
 import time
 from rich.console import Console
 from rich.table import Table
@@ -25,10 +29,110 @@ from rich.text import Text
 from rich import box
 from rich.align import Align
 
+try:
+    import numpy as np
+except ImportError:  # Batch scoring falls back to array loops
+    np = None
+
 # Initialize Rich console
 console = Console()
 
 
+@dataclass(frozen=True)
+class RankInfo:
+    """
+    Data Transfer Object: Rank lookup result
+    
+    Attributes:
+        index (int): Position of the rank in ascending threshold order
+        name (str): Rank name
+        badge (str): Rank emoji
+        tagline (str): Rank tagline
+        min_score (float): Lowest value in this rank
+        next_threshold (float or None): Lowest value of the next rank
+        points_needed (float): Distance to ``next_threshold`` (0 at max rank)
+        progress (float): Fraction of the way to the next rank, 0.0 - 1.0
+    """
+    index: int
+    name: str
+    badge: str
+    tagline: str
+    min_score: float
+    next_threshold: Optional[float]
+    points_needed: float
+    progress: float
+
+
+class RankTable:
+    """
+    Rank tiers compiled into a sorted threshold array
+    
+    A lookup is one ``bisect`` over the tier minimums, so tables with
+    hundreds of tiers cost the same as six. Values between one tier's
+    maximum and the next tier's minimum (e.g. 20.5 with integer ranges)
+    stay in the lower tier; values past the top stay in the top tier.
+    
+    Example:
+        >>> table = RankTable(GameConfig.RANKS)
+        >>> table.lookup(50).name
+        'Selective Learner'
+    """
+    
+    def __init__(self, ranks: Sequence[Tuple]):
+        """
+        Args:
+            ranks (Sequence[Tuple]): (min_score, max_score, name, badge, tagline)
+        
+        Raises:
+            ValueError: If there are no ranks or two share a minimum
+        """
+        tiers = sorted(ranks, key=lambda rank: rank[0])
+        if not tiers:
+            raise ValueError("Rank table needs at least one rank")
+        self._mins = array("d", (tier[0] for tier in tiers))
+        if any(a == b for a, b in zip(self._mins, self._mins[1:])):
+            raise ValueError("Rank minimums must be distinct")
+        self._tiers = [tuple(tier[2:5]) for tier in tiers]
+    
+    def __len__(self) -> int:
+        return len(self._tiers)
+    
+    def lookup(self, value: float) -> RankInfo:
+        """
+        Rank for a score or percentage, with progress to the next rank
+        
+        Args:
+            value (float): Score (CLI) or percentage of the maximum (web)
+        
+        Returns:
+            RankInfo: Rank, next threshold and progress
+        """
+        index = max(0, bisect_right(self._mins, value) - 1)
+        name, badge, tagline = self._tiers[index]
+        low = self._mins[index]
+        
+        if index + 1 < len(self._tiers):
+            high = self._mins[index + 1]
+            next_threshold = int(high) if high.is_integer() else high
+            points_needed = next_threshold - value
+            progress = min(1.0, max(0.0, (value - low) / (high - low)))
+        else:
+            next_threshold = None
+            points_needed = 0
+            progress = 1.0
+        
+        return RankInfo(
+            index=index,
+            name=name,
+            badge=badge,
+            tagline=tagline,
+            min_score=int(low) if low.is_integer() else low,
+            next_threshold=next_threshold,
+            points_needed=points_needed,
+            progress=progress,
+        )
+
+
 @dataclass
 class GameConfig:
     """
@@ -78,6 +182,12 @@ class GameConfig:
     PENALTY_PER_REMEMBERED_BAD = 3
     STREAK_MULTIPLIER = 0.2  # 20% bonus per streak level
     
+    # Games an item stays out of a player's deals after being shown
+    DEAL_COOLDOWN_GAMES = 3
+    
+    # Where the CLI keeps score sketches and the high-score database
+    PERCENTILE_DIR = "stats"
+    
     # Typing timer for recall phase (seconds per level)
     TYPING_TIME = {
         1: 20,  # 5 items total
@@ -97,6 +207,26 @@ class GameConfig:
         (96, 100, "Cognitive Elite", "👑", "You've achieved mental clarity")
     ]
     
+    @classmethod
+    def rank_table(cls) -> RankTable:
+        """Compiled ``RANKS``; rebuilt only if ``RANKS`` is replaced"""
+        table = cls.__dict__.get("_rank_table")
+        if table is None or table[0] is not cls.RANKS:
+            table = (cls.RANKS, RankTable(cls.RANKS))
+            cls._rank_table = table
+        return table[1]
+    
+    @classmethod
+    def get_rank(cls, percentage: float) -> Tuple[str, str, str]:
+        """
+        Get the rank for a percentage of the maximum score (web frontend)
+        
+        Returns:
+            Tuple[str, str, str]: (rank_name, badge, tagline)
+        """
+        rank = cls.rank_table().lookup(percentage)
+        return rank.name, rank.badge, rank.tagline
+    
     @classmethod
     def get_level_config(cls, level: int) -> Dict:
         """Get configuration for a specific level"""
@@ -159,26 +289,92 @@ class ScoreCalculator:
         
         return (correct_items / total_items * 100) if total_items > 0 else 0
     
+    @staticmethod
+    def score_levels_batch(
+        correct_good: Sequence[int],
+        total_good: Sequence[int],
+        remembered_bad: Sequence[int],
+        total_bad: Sequence[int],
+        streak: Sequence[int],
+        config=GameConfig
+    ):
+        """
+        Score many levels at once
+        
+        Same arithmetic as ``calculate_level_score`` and
+        ``calculate_accuracy``, in the same order, so every element matches
+        the scalar result exactly. With NumPy installed this is one
+        vectorized pass; without it the inputs are scored in a loop into
+        ``array`` buffers.
+        
+        Args:
+            correct_good (Sequence[int]): Good items remembered, per level
+            total_good (Sequence[int]): Good items shown, per level
+            remembered_bad (Sequence[int]): Bad items selected, per level
+            total_bad (Sequence[int]): Bad items shown, per level
+            streak (Sequence[int]): Streak before each level
+            config (type, optional): Class with the scoring constants, e.g.
+                a ``GameConfig`` subclass with tuned values
+        
+        Returns:
+            Tuple: (base_score, streak_bonus, total_score, accuracy); int64
+            and float64 NumPy arrays, or ``array('q')`` / ``array('d')``
+        
+        Example:
+            >>> base, bonus, total, acc = ScoreCalculator.score_levels_batch(
+            ...     [3, 2], [3, 3], [0, 1], [2, 2], [0, 1])
+            >>> list(total)
+            [30, 8]
+        """
+        points = config.POINTS_PER_CORRECT_GOOD
+        forgot_penalty = config.PENALTY_PER_FORGOTTEN_GOOD
+        bad_penalty = config.PENALTY_PER_REMEMBERED_BAD
+        multiplier = config.STREAK_MULTIPLIER
+        
+        if np is None:
+            base = array("q", (
+                max(0, c * points - (t - c) * forgot_penalty - r * bad_penalty)
+                for c, t, r in zip(correct_good, total_good, remembered_bad)
+            ))
+            bonus = array("q", (int(b * (s * multiplier)) for b, s in zip(base, streak)))
+            total = array("q", (b + s for b, s in zip(base, bonus)))
+            accuracy = array("d", (
+                ((c + (tb - r)) / (t + tb) * 100) if t + tb > 0 else 0.0
+                for c, t, r, tb in zip(correct_good, total_good, remembered_bad, total_bad)
+            ))
+            return base, bonus, total, accuracy
+        
+        correct_good = np.asarray(correct_good, dtype=np.int64)
+        total_good = np.asarray(total_good, dtype=np.int64)
+        remembered_bad = np.asarray(remembered_bad, dtype=np.int64)
+        total_bad = np.asarray(total_bad, dtype=np.int64)
+        streak = np.asarray(streak, dtype=np.int64)
+        
+        base = (
+            correct_good * points
+            - (total_good - correct_good) * forgot_penalty
+            - remembered_bad * bad_penalty
+        )
+        np.maximum(base, 0, out=base)
+        # Bases are non-negative, so truncating matches int()
+        bonus = (base * (streak * multiplier)).astype(np.int64)
+        total = base + bonus
+        
+        total_items = total_good + total_bad
+        correct_items = correct_good + (total_bad - remembered_bad)
+        accuracy = np.zeros(len(total_items), dtype=np.float64)
+        np.divide(correct_items, total_items, out=accuracy, where=total_items > 0)
+        accuracy *= 100
+        return base, bonus, total, accuracy
+    
     @staticmethod
     def get_rank(score: int) -> Tuple[str, str, str, int]:
         """
         Get rank information based on score
         Returns: (rank_name, badge, tagline, points_to_next_rank)
         """
-        for i, (min_score, max_score, name, badge, tagline) in enumerate(GameConfig.RANKS):
-            if min_score <= score <= max_score:
-                # Calculate points to next rank
-                if i < len(GameConfig.RANKS) - 1:
-                    next_rank_min = GameConfig.RANKS[i + 1][0]
-                    points_needed = next_rank_min - score
-                else:
-                    points_needed = 0  # Already at max rank
-                
-                return name, badge, tagline, points_needed
-        
-        # Fallback for scores > 100
-        last_rank = GameConfig.RANKS[-1]
-        return last_rank[2], last_rank[3], last_rank[4], 0
+        rank = GameConfig.rank_table().lookup(score)
+        return rank.name, rank.badge, rank.tagline, rank.points_needed
 
 
 @dataclass
@@ -328,45 +524,32 @@ class LevelManager:
     
     def _display_rank_progress(self):
         """Display current rank with progress bar to next rank"""
-        rank_name, badge, tagline, points_needed = ScoreCalculator.get_rank(self.total_score)
+        rank = GameConfig.rank_table().lookup(self.total_score)
         
-        console.print(f"[bold cyan]Current Rank: {badge} {rank_name}[/bold cyan]", justify="center")
-        console.print(f'[italic dim]"{tagline}"[/italic dim]', justify="center")
+        console.print(f"[bold cyan]Current Rank: {rank.badge} {rank.name}[/bold cyan]", justify="center")
+        console.print(f'[italic dim]"{rank.tagline}"[/italic dim]', justify="center")
         
-        if points_needed > 0:
-            # Find current rank index
-            current_rank_idx = next(
-                i for i, (min_s, max_s, name, _, _) in enumerate(GameConfig.RANKS)
-                if name == rank_name
-            )
-            
-            # Safe next rank retrieval
-            if current_rank_idx < len(GameConfig.RANKS) - 1:
-                current_rank_min = GameConfig.RANKS[current_rank_idx][0]
-                next_rank_min = GameConfig.RANKS[current_rank_idx + 1][0]
-                
-                # Calculate progress
-                rank_range = next_rank_min - current_rank_min
-                score_in_rank = self.total_score - current_rank_min
-                # Ensure score_in_rank is non-negative (for degraded ranks)
-                score_in_rank = max(0, score_in_rank)
-                
-                progress_pct = (score_in_rank / rank_range) * 100 if rank_range > 0 else 0
-                progress_pct = min(100, max(0, progress_pct))
-                
-                # Progress bar
-                width = 30
-                filled = int(progress_pct / 100 * width)
-                bar = "█" * filled + "░" * (width - filled)
-                console.print(f"\n[{bar}] [bold]{self.total_score}[/bold]/{next_rank_min}", justify="center")
-                console.print(f"[dim]{points_needed} points to next rank![/dim]", justify="center")
+        if rank.points_needed > 0:
+            # Progress bar
+            width = 30
+            filled = int(rank.progress * width)
+            bar = "█" * filled + "░" * (width - filled)
+            console.print(f"\n[{bar}] [bold]{self.total_score}[/bold]/{rank.next_threshold}", justify="center")
+            console.print(f"[dim]{rank.points_needed} points to next rank![/dim]", justify="center")
         else:
             console.print("\n[bold yellow]🏆 MAX RANK ACHIEVED! 🏆[/bold yellow]", justify="center")
         
         console.print()
     
-    def display_final_results(self, total_time: float):
-        """Display final game completion screen with statistics"""
+    def display_final_results(self, total_time: float, rng: random.Random = None, standing: Dict = None):
+        """
+        Display final game completion screen with statistics
+        
+        Args:
+            total_time (float): Game duration in seconds
+            rng (random.Random, optional): Session generator for the daily tip
+            standing (Dict, optional): Percentiles from ``PercentileStore.percentiles``
+        """
         console.clear()
         
         # Header
@@ -400,6 +583,18 @@ class LevelManager:
         table.add_row("✨ Perfect Levels:", f"{perfect_levels} / 5")
         table.add_row("🔥 Max Streak:", f"{max_streak}")
         table.add_row("⏱ Total Time:", f"{int(total_time // 60)}m {int(total_time % 60)}s")
+        if standing is not None:
+            overall = standing["overall"]
+            table.add_row(
+                "📊 Better Than:",
+                f"[bold green]{overall:.0f}%[/bold green] of players" if overall is not None else "First recorded game!"
+            )
+            levels = [
+                f"L{level} {pct:.0f}%"
+                for level, pct in sorted(standing["levels"].items()) if pct is not None
+            ]
+            if levels:
+                table.add_row("📈 Level Percentiles:", " · ".join(levels))
         
         console.print(table, justify="center")
         
@@ -429,7 +624,6 @@ class LevelManager:
         console.print(rank_panel, justify="center")
         
         # Daily wisdom
-        import random
         daily_tips = [
             "Just like this game, your brain filters 99% of sensory input. Choose what to remember wisely.",
             "Productivity isn't about doing more—it's about forgetting the unimportant.",
@@ -444,7 +638,7 @@ class LevelManager:
         ]
         
         console.print("\n[bold cyan]💡 Daily Wisdom:[/bold cyan]", justify="center")
-        console.print(f'[italic]{random.choice(daily_tips)}[/italic]', justify="center")
+        console.print(f'[italic]{(rng or random).choice(daily_tips)}[/italic]', justify="center")
         console.print("\n")
 
 
@@ -523,7 +717,43 @@ def test_game_config():
     print("[OK] Test 3: Ranks")
     name, badge, _, _ = ScoreCalculator.get_rank(100)
     print(f"   Top rank: {badge} {name}")
-    
+    for score in range(0, 300):
+        # Same answers as a linear scan over the tiers
+        tier = next((r for r in GameConfig.RANKS if r[0] <= score <= r[1]), GameConfig.RANKS[-1])
+        following = [r[0] for r in GameConfig.RANKS if r[0] > tier[0]]
+        expected = (tier[2], tier[3], tier[4], following[0] - score if following else 0)
+        assert ScoreCalculator.get_rank(score) == expected, score
+    assert GameConfig.get_rank(20.5)[0] == "Information Overloaded"
+    rank = GameConfig.rank_table().lookup(50)
+    assert (rank.index, rank.next_threshold, rank.points_needed) == (2, 61, 11)
+    assert abs(rank.progress - 9 / 20) < 1e-9
+    many = RankTable([(n * 10, n * 10 + 9, f"Tier {n}", "*", "") for n in range(500)])
+    assert many.lookup(2345).name == "Tier 234" and many.lookup(-5).index == 0
+    print(f"   {len(many)}-tier table: 2345 -> {many.lookup(2345).name}")
+
+    # Test 4: Batch scoring matches the scalar path
+    print("[OK] Test 4: Batch Scoring")
+    global np
+    rows = [
+        (c, t, r, tb, s)
+        for t in range(0, 8) for c in range(t + 1)
+        for tb in range(0, 7) for r in range(tb + 1)
+        for s in range(0, 6)
+    ]
+    columns = [list(column) for column in zip(*rows)]
+    expected = [
+        ScoreCalculator.calculate_level_score(c, t, r, s)
+        + (ScoreCalculator.calculate_accuracy(c, t, r, tb),)
+        for c, t, r, tb, s in rows
+    ]
+    numpy_module = np
+    for backend in ([numpy_module] if numpy_module is not None else []) + [None]:
+        np = backend
+        batch = ScoreCalculator.score_levels_batch(*columns)
+        assert [tuple(v) for v in zip(*batch)] == expected
+        print(f"   {len(rows)} levels identical to scalar ({'numpy' if backend else 'array'} backend)")
+    np = numpy_module
+
     print("\n" + "=" * 60)
     print("  SUCCESS: Basic tests completed.")
     print("=" * 60 + "\n")
@@ -0,0 +1,325 @@
+"""
+Forget to Win - Columnar Game History
+
+This module turns the event log into one flat binary file per field
+(every LevelResult field plus the game and player ids), one row per
+played level. Readers memory-map the files and see each column as a
+NumPy array (or a typed memoryview without NumPy), so aggregations run
+over raw numbers instead of lists of dicts.
+
+Directory layout:
+    - manifest.json: row count, byte order, and the typecode of each column
+    - <column>.col:  the column's values, packed back to back
+
+Rows are grouped by game and ordered by level within a game.
+
+Classes:
+    - GameHistory: Memory-mapped reader with level and streak aggregations
+
+Author: Development Team
+Version: 1.0
+"""
+
+from array import array
+import json
+import mmap
+import os
+import sys
+from typing import Dict, Iterable, List, Tuple
+
+from event_log import GameHeader, read_games
+from game_engine import LevelResult
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; columns fall back to memoryviews
+    np = None
+
+MANIFEST = "manifest.json"
+
+# Column name -> array typecode, in row order
+COLUMNS: Dict[str, str] = {
+    "game_id": "Q",
+    "player_id": "Q",
+    "finished_at": "d",
+    "level_number": "B",
+    "correct_good": "B",
+    "total_good": "B",
+    "incorrect_bad": "B",
+    "total_bad": "B",
+    "forgotten_good": "B",
+    "base_score": "i",
+    "streak_bonus": "i",
+    "total_score": "i",
+    "accuracy": "d",
+    "time_taken": "d",
+}
+
+# Accuracy that keeps a streak going (same rule as LevelManager)
+STREAK_ACCURACY = 80
+
+
+def export_columns(games: Iterable[Tuple[GameHeader, List[LevelResult]]], directory: str,
+                   chunk_rows: int = 65536) -> int:
+    """
+    Write games as column files
+
+    Columns are buffered in typed arrays and appended to their files every
+    ``chunk_rows`` rows, so memory stays flat however long the history is.
+    The manifest is written last; a directory without one is incomplete.
+
+    Args:
+        games: (header, level results) pairs, e.g. from ``read_games``
+        directory (str): Output directory (existing columns are replaced)
+        chunk_rows (int): Rows buffered per column between writes
+
+    Returns:
+        int: Number of rows written
+    """
+    os.makedirs(directory, exist_ok=True)
+    manifest_path = os.path.join(directory, MANIFEST)
+    if os.path.exists(manifest_path):
+        os.remove(manifest_path)
+
+    files = {name: open(os.path.join(directory, f"{name}.col"), "wb") for name in COLUMNS}
+    buffers = {name: array(code) for name, code in COLUMNS.items()}
+    level_fields = [name for name in COLUMNS if name not in ("game_id", "player_id", "finished_at")]
+    rows = 0
+    try:
+        for header, levels in games:
+            count = len(levels)
+            buffers["game_id"].extend([header.game_id] * count)
+            buffers["player_id"].extend([header.player_id] * count)
+            buffers["finished_at"].extend([header.finished_at] * count)
+            for name in level_fields:
+                buffers[name].extend([getattr(result, name) for result in levels])
+            rows += count
+            if len(buffers["game_id"]) >= chunk_rows:
+                _write_chunk(files, buffers)
+        _write_chunk(files, buffers)
+    finally:
+        for f in files.values():
+            f.close()
+
+    with open(manifest_path, "w") as f:
+        json.dump({"rows": rows, "byteorder": sys.byteorder, "columns": COLUMNS}, f)
+    return rows
+
+
+def _write_chunk(files, buffers):
+    for name, buffer in buffers.items():
+        buffer.tofile(files[name])
+        del buffer[:]
+
+
+def export_event_log(log_directory: str, directory: str) -> int:
+    """Export every game in an event log directory (see ``export_columns``)"""
+    return export_columns(read_games(log_directory), directory)
+
+
+class GameHistory:
+    """
+    Memory-mapped column reader
+
+    Example:
+        >>> history = GameHistory("stats/history")
+        >>> history.column("total_score").sum()     # with NumPy
+        >>> history.accuracy_by_level()
+        {1: 91.4, 2: 84.0, ...}
+    """
+
+    def __init__(self, directory: str, use_numpy: bool = True):
+        """
+        Args:
+            directory (str): Directory written by ``export_columns``
+            use_numpy (bool): Return NumPy arrays when NumPy is installed
+        """
+        with open(os.path.join(directory, MANIFEST)) as f:
+            manifest = json.load(f)
+        if manifest["byteorder"] != sys.byteorder:
+            raise ValueError(f"Columns were written {manifest['byteorder']}-endian")
+        self.directory = directory
+        self.rows = manifest["rows"]
+        self.use_numpy = use_numpy and np is not None
+        self._typecodes: Dict[str, str] = manifest["columns"]
+        self._maps: Dict[str, mmap.mmap] = {}
+
+    def __len__(self) -> int:
+        return self.rows
+
+    def column(self, name: str):
+        """
+        One column as a read-only view over the mapped file (no copy)
+
+        Returns:
+            numpy.ndarray or memoryview: ``rows`` values
+        """
+        typecode = self._typecodes[name]
+        if self.rows == 0:
+            empty = array(typecode)
+            return np.frombuffer(empty, dtype=typecode) if self.use_numpy else memoryview(empty)
+        if name not in self._maps:
+            with open(os.path.join(self.directory, f"{name}.col"), "rb") as f:
+                self._maps[name] = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self.use_numpy:
+            return np.frombuffer(self._maps[name], dtype=typecode, count=self.rows)
+        return memoryview(self._maps[name]).cast(typecode)[:self.rows]
+
+    def accuracy_by_level(self) -> Dict[int, float]:
+        """Mean accuracy of each level number"""
+        levels, accuracy = self.column("level_number"), self.column("accuracy")
+        if self.use_numpy:
+            counts = np.bincount(levels)
+            sums = np.bincount(levels, weights=accuracy)
+            return {int(level): float(sums[level] / counts[level]) for level in np.flatnonzero(counts)}
+        sums: Dict[int, float] = {}
+        counts: Dict[int, int] = {}
+        for level, value in zip(levels, accuracy):
+            sums[level] = sums.get(level, 0.0) + value
+            counts[level] = counts.get(level, 0) + 1
+        return {level: sums[level] / counts[level] for level in sorted(counts)}
+
+    def streak_distribution(self) -> Dict[int, int]:
+        """
+        Games by longest streak
+
+        A streak is a run of consecutive levels at 80% accuracy or better
+        within one game.
+
+        Returns:
+            Dict[int, int]: Longest streak -> number of games
+        """
+        if self.rows == 0:
+            return {}
+        games, accuracy = self.column("game_id"), self.column("accuracy")
+        if self.use_numpy:
+            good = (accuracy >= STREAK_ACCURACY).astype(np.int64)
+            starts = np.flatnonzero(np.r_[True, games[1:] != games[:-1]])
+            # Streak length at each row: good rows since the last reset
+            resets = good == 0
+            resets[starts] = True
+            done = np.cumsum(good)
+            last_reset = np.maximum.accumulate(np.where(resets, np.arange(self.rows), 0))
+            streak = done - (done - good)[last_reset]
+            counts = np.bincount(np.maximum.reduceat(streak, starts))
+            return {length: int(n) for length, n in enumerate(counts) if n}
+        counts: Dict[int, int] = {}
+        previous, streak, best = None, 0, 0
+        for game, value in zip(games, accuracy):
+            if game != previous:
+                if previous is not None:
+                    counts[best] = counts.get(best, 0) + 1
+                previous, streak, best = game, 0, 0
+            streak = streak + 1 if value >= STREAK_ACCURACY else 0
+            best = max(best, streak)
+        counts[best] = counts.get(best, 0) + 1
+        return dict(sorted(counts.items()))
+
+    def close(self):
+        """Unmap the column files (views from ``column`` must be released first)"""
+        for mapped in self._maps.values():
+            mapped.close()
+        self._maps.clear()
+
+    def __enter__(self) -> "GameHistory":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Module-level test function
+def test_game_history():
+    """Test function to verify export, mapping and aggregations"""
+    import random
+    import tempfile
+    import time
+
+    from event_log import EventLog, player_key
+
+    print("\n" + "=" * 60)
+    print("  Columnar Game History Test Suite")
+    print("=" * 60 + "\n")
+
+    rng = random.Random(11)
+    games = []
+    for game_id in range(1, 3001):
+        levels = []
+        for level in range(1, 6):
+            good, bad = level + 2, level + 1
+            correct, wrong = rng.randint(0, good), rng.randint(0, bad)
+            accuracy = (correct + bad - wrong) / (good + bad) * 100
+            levels.append(LevelResult(level, correct, good, wrong, bad, good - correct,
+                                      correct * 10, 0, correct * 10, accuracy, rng.uniform(1, 60)))
+        header = GameHeader(game_id, player_key(f"player{game_id % 40}"), game_id, time.time(),
+                            sum(r.total_score for r in levels), len(levels))
+        games.append((header, levels))
+
+    def expected_streaks():
+        counts: Dict[int, int] = {}
+        for _, levels in games:
+            streak = best = 0
+            for result in levels:
+                streak = streak + 1 if result.accuracy >= STREAK_ACCURACY else 0
+                best = max(best, streak)
+            counts[best] = counts.get(best, 0) + 1
+        return dict(sorted(counts.items()))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        log_dir, out_dir = os.path.join(tmp, "events"), os.path.join(tmp, "history")
+        with EventLog(log_dir, fsync=False) as log:
+            for header, levels in games:
+                log.append_game(header, levels)
+
+        # Test 1: Export from the event log
+        print("[OK] Test 1: Export")
+        rows = export_event_log(log_dir, out_dir)
+        assert rows == 5 * len(games)
+        sizes = sum(os.path.getsize(os.path.join(out_dir, f"{name}.col")) for name in COLUMNS)
+        print(f"   {rows:,} rows, {sizes / rows:.0f} bytes per row")
+        print()
+
+        # Test 2: Columns match the source records
+        print("[OK] Test 2: Memory-Mapped Columns")
+        for use_numpy in (True, False):
+            history = GameHistory(out_dir, use_numpy=use_numpy)
+            scores = history.column("total_score")
+            assert list(scores[:5]) == [r.total_score for r in games[0][1]]
+            assert history.column("player_id")[7] == games[1][0].player_id
+            del scores
+            history.close()
+        print()
+
+        # Test 3: Aggregations agree with and without NumPy
+        print("[OK] Test 3: Aggregations")
+        expected = {}
+        for _, levels in games:
+            for result in levels:
+                expected.setdefault(result.level_number, []).append(result.accuracy)
+        for use_numpy in (True, False):
+            with GameHistory(out_dir, use_numpy=use_numpy) as history:
+                by_level = history.accuracy_by_level()
+                for level, values in expected.items():
+                    assert abs(by_level[level] - sum(values) / len(values)) < 1e-9
+                streaks = history.streak_distribution()
+                assert streaks == expected_streaks()
+        print(f"   Accuracy by level: {', '.join(f'{k}: {v:.1f}%' for k, v in by_level.items())}")
+        print(f"   Games by longest streak: {streaks}")
+        print()
+
+        # Test 4: Empty history
+        print("[OK] Test 4: Empty History")
+        export_columns([], os.path.join(tmp, "empty"))
+        with GameHistory(os.path.join(tmp, "empty")) as history:
+            assert len(history) == 0 and history.streak_distribution() == {}
+            assert history.accuracy_by_level() == {}
+        print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Columnar Game History Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_game_history()
@@ -0,0 +1,222 @@
+"""
+Forget to Win - High Score Store
+
+This module keeps every finished game in a local SQLite database in WAL
+mode. Writes are queued and inserted in batches inside one transaction,
+with the SQL kept constant so sqlite3's statement cache reuses the
+prepared statements. Reads never scan the table:
+
+    - top N:   walks the (score DESC, played_at) index for N rows
+    - my best: one seek into the (player, score DESC, played_at) index
+
+Both cost a B-tree descent plus the rows returned, so they stay at the
+same latency with millions of recorded games.
+
+Classes:
+    - HighScore: One recorded game
+    - HighScoreStore: SQLite-backed store with batched writes
+
+Author: Development Team
+Version: 1.0
+"""
+
+from dataclasses import dataclass
+import os
+import sqlite3
+import time
+from typing import Iterable, List, Optional
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    player TEXT NOT NULL,
+    score INTEGER NOT NULL,
+    accuracy REAL NOT NULL,
+    duration REAL NOT NULL,
+    played_at REAL NOT NULL,
+    seed TEXT
+);
+CREATE INDEX IF NOT EXISTS games_by_score ON games (score DESC, played_at);
+CREATE INDEX IF NOT EXISTS games_by_player ON games (player, score DESC, played_at);
+"""
+
+INSERT_GAME = (
+    "INSERT INTO games (player, score, accuracy, duration, played_at, seed) "
+    "VALUES (?, ?, ?, ?, ?, ?)"
+)
+SELECT_TOP = (
+    "SELECT player, score, accuracy, duration, played_at, seed FROM games "
+    "INDEXED BY games_by_score ORDER BY score DESC, played_at LIMIT ?"
+)
+SELECT_BEST = (
+    "SELECT player, score, accuracy, duration, played_at, seed FROM games "
+    "INDEXED BY games_by_player WHERE player = ? ORDER BY score DESC, played_at LIMIT 1"
+)
+
+
+@dataclass(frozen=True)
+class HighScore:
+    """
+    Data Transfer Object: One recorded game
+
+    Attributes:
+        player (str): Player name
+        score (int): Final score
+        accuracy (float): Overall accuracy percentage
+        duration (float): Game length in seconds
+        played_at (float): Unix time the game finished
+        seed (str or None): Session seed, to replay the game
+    """
+    player: str
+    score: int
+    accuracy: float
+    duration: float
+    played_at: float
+    seed: Optional[str] = None
+
+
+class HighScoreStore:
+    """
+    Local high-score table
+
+    Example:
+        >>> with HighScoreStore("stats/high_scores.db") as store:
+        ...     store.record(HighScore("ana", 180, 92.5, 64.0, time.time()))
+        ...     store.top(10)[0].score
+        180
+    """
+
+    def __init__(self, path: str, batch_size: int = 512):
+        """
+        Args:
+            path (str): Database file (":memory:" for a throwaway store)
+            batch_size (int): Queued games that trigger a write
+        """
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self.batch_size = batch_size
+        self._pending: List[tuple] = []
+
+        self._db = sqlite3.connect(path, cached_statements=16)
+        self._db.execute("PRAGMA journal_mode=WAL")
+        self._db.execute("PRAGMA synchronous=NORMAL")
+        self._db.executescript(SCHEMA)
+
+    def record(self, game: HighScore):
+        """Queue one game; written once ``batch_size`` games are queued"""
+        self._pending.append((
+            game.player, game.score, game.accuracy, game.duration, game.played_at, game.seed
+        ))
+        if len(self._pending) >= self.batch_size:
+            self.flush()
+
+    def record_many(self, games: Iterable[HighScore]):
+        """Queue several games"""
+        for game in games:
+            self.record(game)
+
+    def flush(self):
+        """Write all queued games in one transaction"""
+        if not self._pending:
+            return
+        with self._db:
+            self._db.executemany(INSERT_GAME, self._pending)
+        self._pending.clear()
+
+    def top(self, limit: int = 10) -> List[HighScore]:
+        """
+        Best games overall, highest score first (earlier game wins a tie)
+
+        Args:
+            limit (int): Number of games
+
+        Returns:
+            List[HighScore]: Up to ``limit`` games
+        """
+        self.flush()
+        return [HighScore(*row) for row in self._db.execute(SELECT_TOP, (limit,))]
+
+    def best(self, player: str) -> Optional[HighScore]:
+        """
+        A player's best game
+
+        Returns:
+            HighScore or None: None if the player has no games
+        """
+        self.flush()
+        row = self._db.execute(SELECT_BEST, (player,)).fetchone()
+        return HighScore(*row) if row else None
+
+    def count(self) -> int:
+        """Number of recorded games (a full count; not for hot paths)"""
+        self.flush()
+        return self._db.execute("SELECT COUNT(*) FROM games").fetchone()[0]
+
+    def close(self):
+        """Write queued games and close the database"""
+        self.flush()
+        self._db.close()
+
+    def __enter__(self) -> "HighScoreStore":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Module-level test function
+def test_high_scores():
+    """Test function to verify recording and queries"""
+    import tempfile
+
+    print("\n" + "=" * 60)
+    print("  High Score Store Test Suite")
+    print("=" * 60 + "\n")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "scores.db")
+
+        # Test 1: Batched writes land on flush and on close
+        print("[OK] Test 1: Batched Writes")
+        store = HighScoreStore(path, batch_size=100)
+        now = time.time()
+        store.record_many(
+            HighScore(f"player{n % 7}", (n * 37) % 250, 80.0, 60.0, now + n) for n in range(250)
+        )
+        assert len(store._pending) == 50
+        store.close()
+        store = HighScoreStore(path)
+        assert store.count() == 250
+        print("   250 games written in 3 batches")
+        print()
+
+        # Test 2: Top N and personal best
+        print("[OK] Test 2: Queries")
+        top = store.top(5)
+        assert [g.score for g in top] == sorted((g.score for g in top), reverse=True)
+        assert top[0].score == 249
+        best = store.best("player3")
+        expected = max((n * 37) % 250 for n in range(250) if n % 7 == 3)
+        assert best.score == expected and store.best("nobody") is None
+        print(f"   Top score {top[0].score} by {top[0].player}, player3 best {best.score}")
+        print()
+
+        # Test 3: Queries use the indexes
+        print("[OK] Test 3: Query Plans")
+        for sql, args in ((SELECT_TOP, (10,)), (SELECT_BEST, ("player1",))):
+            plan = " ".join(row[-1] for row in store._db.execute("EXPLAIN QUERY PLAN " + sql, args))
+            assert "USING INDEX" in plan and "TEMP B-TREE" not in plan, plan
+            print(f"   {plan}")
+        assert store._db.execute("PRAGMA journal_mode").fetchone()[0] == "wal"
+        store.close()
+        print()
+
+    print("=" * 60)
+    print("  SUCCESS: All High Score Store Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_high_scores()
@@ -0,0 +1,475 @@
+"""
+Forget to Win - External Item Catalogs
+
+This module loads item catalogs from JSONL or CSV files without reading
+them into memory. The catalog file is memory-mapped and addressed through
+an offset index, so an Item is only parsed when a deal samples it.
+
+Catalog formats:
+    - JSONL: one object per line with "text", "is_good" and "category"
+    - CSV: header row naming the "text", "is_good" and "category" columns;
+      one item per physical line (quoted newlines are not supported)
+
+The offset index is persisted next to the catalog as ``<catalog>.idx`` and
+memory-mapped on later loads, so reopening a catalog costs the same no
+matter how many items it holds. The sidecar also keeps the catalog's
+validation report (digest, duplicates, conflicts and text index), worked
+out in the same scan that builds the offsets, so an ``ItemPool`` over a
+reopened catalog does not read a single item.
+
+Classes:
+    - CatalogIndex: Offsets and (polarity, category) partition of a catalog
+    - MappedCatalog: Lazily materializing, memory-mapped item catalog
+
+Author: Development Team
+Version: 1.0
+"""
+
+from array import array
+import csv
+import io
+import json
+import mmap
+import os
+import struct
+import sys
+from typing import Dict, List, Sequence, Tuple
+
+from catalog_validation import CatalogReport, CatalogValidator, TextIndex
+from item_pool import Item
+
+INDEX_MAGIC = b"FTWIDX3\0"
+INDEX_HEADER = struct.Struct("<8sQQQI")  # magic, source size, mtime_ns, count, meta length
+
+TRUE_VALUES = {"1", "true", "yes", "good", "+"}
+FALSE_VALUES = {"0", "false", "no", "bad", "-"}
+
+
+def _parse_polarity(value) -> bool:
+    """Parse an ``is_good`` field from JSON or CSV"""
+    if isinstance(value, bool):
+        return value
+    text = str(value).strip().lower()
+    if text in TRUE_VALUES:
+        return True
+    if text in FALSE_VALUES:
+        return False
+    raise ValueError(f"Invalid is_good value: {value!r}")
+
+
+def _aligned(offset: int) -> int:
+    """Round an offset up to the next 8-byte boundary"""
+    return (offset + 7) & ~7
+
+
+def _parse_record(line: bytes, fmt: str, columns: List[str]) -> dict:
+    """Fields of one catalog line"""
+    if fmt == "jsonl":
+        return json.loads(line)
+    values = next(csv.reader(io.StringIO(line.rstrip(b"\r\n").decode("utf-8"))))
+    return dict(zip(columns, values))
+
+
+class CatalogIndex:
+    """
+    Offset index and bucket partition for a catalog file
+
+    Attributes:
+        offsets (Sequence[int]): Byte offset of each item line (count + 1 entries)
+        order (Sequence[int]): Item positions grouped by (polarity, category)
+        buckets (List[Tuple[bool, str, int, int]]): (is_good, category, start, end)
+            slices of ``order``
+        fmt (str): "jsonl" or "csv"
+        columns (List[str]): CSV header (empty for JSONL)
+        validation (dict): Saved validation result: "digest", "duplicates",
+            "conflicts" and "text_count"
+        text_keys, text_positions (Sequence[int]): Saved ``TextIndex`` table
+    """
+
+    def __init__(self, offsets, order, buckets, fmt, columns, validation, text_keys, text_positions,
+                 backing=None):
+        self.offsets = offsets
+        self.order = order
+        self.buckets = buckets
+        self.fmt = fmt
+        self.columns = columns
+        self.validation = validation
+        self.text_keys = text_keys
+        self.text_positions = text_positions
+        self._backing = backing
+
+    @property
+    def count(self) -> int:
+        """Number of items in the catalog"""
+        return len(self.offsets) - 1
+
+    @classmethod
+    def build(cls, data, fmt: str) -> "CatalogIndex":
+        """
+        Scan a catalog once and build its index
+
+        The same scan validates the catalog (see ``catalog_validation``).
+
+        Args:
+            data: Memory-mapped catalog contents
+            fmt (str): "jsonl" or "csv"
+
+        Returns:
+            CatalogIndex: In-memory index
+        """
+        offsets = array("Q")
+        codes = array("H")
+        polarity = bytearray()
+        categories: Dict[str, int] = {}
+        columns: List[str] = []
+
+        pos = 0
+        size = len(data)
+
+        def text_of(position: int) -> str:  # Only asked about earlier lines, whose end is known
+            line = data[offsets[position]:offsets[position + 1]]
+            return str(_parse_record(line, fmt, columns)["text"])
+
+        validator = CatalogValidator(max(1, size // 64), text_of)
+
+        if fmt == "csv":
+            end = data.find(b"\n", 0)
+            end = size if end < 0 else end
+            columns = next(csv.reader([data[0:end].decode("utf-8-sig").rstrip("\r")]))
+            columns = [c.strip() for c in columns]
+            missing = {"text", "is_good", "category"} - set(columns)
+            if missing:
+                raise ValueError(f"CSV catalog is missing columns: {sorted(missing)}")
+            pos = end + 1
+
+        while pos < size:
+            end = data.find(b"\n", pos)
+            end = size if end < 0 else end
+            line = data[pos:end]
+            if line.strip():
+                record = _parse_record(line, fmt, columns)
+                is_good, category = _parse_polarity(record["is_good"]), str(record["category"])
+                code = categories.setdefault(category, len(categories))
+                if code > 0xFFFF:
+                    raise ValueError("Catalogs support at most 65536 categories")
+                offsets.append(pos)
+                codes.append(code)
+                polarity.append(is_good)
+                validator.add(str(record["text"]), is_good, category)
+            pos = end + 1
+        offsets.append(size)
+        report = validator.report()
+
+        # Counting sort by (polarity, category) so each bucket is one slice
+        names = list(categories)
+        counts: Dict[Tuple[bool, int], int] = {}
+        for i in range(len(codes)):
+            key = (bool(polarity[i]), codes[i])
+            counts[key] = counts.get(key, 0) + 1
+
+        buckets = []
+        starts: Dict[Tuple[bool, int], int] = {}
+        start = 0
+        for key in sorted(counts, key=lambda k: (not k[0], k[1])):
+            starts[key] = start
+            buckets.append((key[0], names[key[1]], start, start + counts[key]))
+            start += counts[key]
+
+        order = array("I", bytes(4 * len(codes)))
+        for i in range(len(codes)):
+            key = (bool(polarity[i]), codes[i])
+            order[starts[key]] = i
+            starts[key] += 1
+
+        validation = {
+            "digest": report.digest,
+            "duplicates": report.duplicates,
+            "conflicts": report.conflicts,
+            "text_count": len(report.index),
+        }
+        text_keys, text_positions = report.index.arrays()
+        return cls(offsets, order, buckets, fmt, columns, validation, text_keys, text_positions)
+
+    def save(self, path: str, source_size: int, source_mtime_ns: int):
+        """
+        Write the index to a sidecar file
+
+        Layout: header, JSON metadata (with the validation result), then the
+        offsets ("Q"), order ("I"), text key ("Q") and text position ("I")
+        arrays in native byte order, each aligned to 8 bytes.
+        """
+        meta = json.dumps({
+            "format": self.fmt,
+            "columns": self.columns,
+            "buckets": self.buckets,
+            "byteorder": sys.byteorder,
+            "validation": self.validation,
+            "text_slots": len(self.text_keys),
+        }).encode("utf-8")
+
+        with open(path, "wb") as f:
+            f.write(INDEX_HEADER.pack(INDEX_MAGIC, source_size, source_mtime_ns, self.count, len(meta)))
+            f.write(meta)
+            f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+            array("Q", self.offsets).tofile(f)
+            array("I", self.order).tofile(f)
+            f.write(b"\0" * (_aligned(f.tell()) - f.tell()))
+            array("Q", self.text_keys).tofile(f)
+            array("I", self.text_positions).tofile(f)
+
+    @classmethod
+    def load(cls, path: str, source_size: int, source_mtime_ns: int):
+        """
+        Memory-map a sidecar index if it matches the catalog file
+
+        Returns:
+            CatalogIndex or None: None if the sidecar is missing or stale
+        """
+        try:
+            f = open(path, "rb")
+        except OSError:
+            return None
+
+        with f:
+            header = f.read(INDEX_HEADER.size)
+            if len(header) < INDEX_HEADER.size:
+                return None
+            magic, size, mtime_ns, count, meta_len = INDEX_HEADER.unpack(header)
+            if magic != INDEX_MAGIC or size != source_size or mtime_ns != source_mtime_ns:
+                return None
+            meta = json.loads(f.read(meta_len))
+            if meta.get("byteorder") != sys.byteorder:
+                return None
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        view = memoryview(data)
+        start = _aligned(INDEX_HEADER.size + meta_len)
+        offsets = view[start:start + 8 * (count + 1)].cast("Q")
+        start += 8 * (count + 1)
+        order = view[start:start + 4 * count].cast("I")
+        start = _aligned(start + 4 * count)
+        slots = meta["text_slots"]
+        text_keys = view[start:start + 8 * slots].cast("Q")
+        start += 8 * slots
+        text_positions = view[start:start + 4 * slots].cast("I")
+        buckets = [(bool(g), c, s, e) for g, c, s, e in meta["buckets"]]
+        validation = dict(meta["validation"])
+        for name in ("duplicates", "conflicts"):
+            validation[name] = tuple((p, f) for p, f in validation[name])
+        return cls(offsets, order, buckets, meta["format"], meta["columns"], validation,
+                   text_keys, text_positions, backing=data)
+
+    def release(self):
+        """Release the memory-mapped sidecar, if any"""
+        if self._backing is not None:
+            for view in (self.offsets, self.order, self.text_keys, self.text_positions):
+                view.release()
+            self._backing.close()
+            self._backing = None
+
+
+class MappedCatalog(Sequence):
+    """
+    Read-only item catalog backed by a memory-mapped JSONL or CSV file
+
+    Behaves as a ``Sequence[Item]``: ``catalog[i]`` parses line ``i`` on
+    demand. ``partition()`` exposes the (polarity, category) buckets and
+    ``report()`` the saved validation result, so ``ItemPool`` can index
+    the catalog without touching item text.
+
+    Example:
+        >>> catalog = MappedCatalog.open("items.jsonl")
+        >>> pool = ItemPool(catalog)
+        >>> good, bad = pool.get_level_items(3, 2)
+    """
+
+    def __init__(self, data: mmap.mmap, index: CatalogIndex, path: str = ""):
+        self._data = data
+        self._index = index
+        self.path = path
+
+    @classmethod
+    def open(cls, path: str, fmt: str = None, index_path: str = None) -> "MappedCatalog":
+        """
+        Open a catalog file, reusing or building its offset index
+
+        Args:
+            path (str): Catalog file (.jsonl or .csv)
+            fmt (str, optional): "jsonl" or "csv"; inferred from the extension
+            index_path (str, optional): Sidecar location (default ``<path>.idx``)
+
+        Returns:
+            MappedCatalog: Opened catalog
+
+        Raises:
+            ValueError: If the format is unknown or the file is empty
+        """
+        if fmt is None:
+            fmt = "csv" if path.lower().endswith(".csv") else "jsonl"
+        if fmt not in ("jsonl", "csv"):
+            raise ValueError(f"Unknown catalog format: {fmt}")
+        if index_path is None:
+            index_path = path + ".idx"
+
+        stat = os.stat(path)
+        if stat.st_size == 0:
+            raise ValueError(f"Catalog {path} is empty")
+
+        with open(path, "rb") as f:
+            data = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+        index = CatalogIndex.load(index_path, stat.st_size, stat.st_mtime_ns)
+        if index is None or index.fmt != fmt:
+            index = CatalogIndex.build(data, fmt)
+            try:
+                index.save(index_path, stat.st_size, stat.st_mtime_ns)
+            except OSError:
+                pass  # Read-only location: keep the in-memory index
+
+        return cls(data, index, path)
+
+    def __len__(self) -> int:
+        return self._index.count
+
+    def __getitem__(self, position: int) -> Item:
+        """Parse and return the item at ``position``"""
+        if position < 0:
+            position += len(self)
+        if not 0 <= position < len(self):
+            raise IndexError("catalog index out of range")
+
+        record = self._record(position)
+        return Item(
+            text=str(record["text"]),
+            is_good=_parse_polarity(record["is_good"]),
+            category=str(record["category"]),
+        )
+
+    def _record(self, position: int) -> dict:
+        offsets = self._index.offsets
+        line = self._data[offsets[position]:offsets[position + 1]].rstrip(b"\r\n")
+        return _parse_record(line, self._index.fmt, self._index.columns)
+
+    def text_at(self, position: int) -> str:
+        """Text of the item at ``position`` (parses only that line)"""
+        return str(self._record(position)["text"])
+
+    def report(self) -> CatalogReport:
+        """
+        Validation result saved with the index, without reading any item
+
+        Returns:
+            CatalogReport: Same as ``validate_catalog(self)`` would return
+        """
+        validation = self._index.validation
+        index = TextIndex.from_arrays(self._index.text_keys, self._index.text_positions,
+                                      validation["text_count"], self.text_at)
+        return CatalogReport(
+            count=len(self),
+            digest=validation["digest"],
+            duplicates=validation["duplicates"],
+            conflicts=validation["conflicts"],
+            index=index,
+        )
+
+    def partition(self) -> Dict[Tuple[bool, str], Sequence[int]]:
+        """
+        Get item positions grouped by (polarity, category)
+
+        Returns:
+            Dict[Tuple[bool, str], Sequence[int]]: Zero-copy slices of the index
+        """
+        order = self._index.order
+        return {
+            (is_good, category): order[start:end]
+            for is_good, category, start, end in self._index.buckets
+        }
+
+    def close(self):
+        """Unmap the catalog and its index"""
+        self._index.release()
+        self._data.close()
+
+    def __enter__(self) -> "MappedCatalog":
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+# Module-level test function
+def test_item_catalog():
+    """Test function to verify MappedCatalog functionality"""
+    import tempfile
+    from catalog_validation import validate_catalog
+    from item_pool import ItemPool
+
+    print("\n" + "=" * 60)
+    print("  Item Catalog Test Suite")
+    print("=" * 60 + "\n")
+
+    builtin = ItemPool().all_items
+
+    with tempfile.TemporaryDirectory() as tmp:
+        jsonl_path = os.path.join(tmp, "items.jsonl")
+        with open(jsonl_path, "w", encoding="utf-8") as f:
+            for item in builtin:
+                f.write(json.dumps({"text": item.text, "is_good": item.is_good, "category": item.category}) + "\n")
+
+        csv_path = os.path.join(tmp, "items.csv")
+        with open(csv_path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["category", "text", "is_good"])
+            for item in builtin:
+                writer.writerow([item.category, item.text, "good" if item.is_good else "bad"])
+
+        for path in (jsonl_path, csv_path):
+            # Test 1: Build index on first open, reuse sidecar afterwards
+            print(f"[OK] Test: {os.path.basename(path)}")
+            with MappedCatalog.open(path) as catalog:
+                assert len(catalog) == 80
+                assert list(catalog) == list(builtin), "Items must round-trip in file order"
+            assert os.path.exists(path + ".idx"), "Sidecar index should be written"
+
+            catalog = MappedCatalog.open(path)
+            assert catalog._index._backing is not None, "Second open should map the sidecar"
+            reads = []
+            catalog._record = lambda p, read=catalog._record: reads.append(p) or read(p)
+            pool = ItemPool(catalog)
+            assert not reads, "The saved report should spare reading items"
+            fresh = validate_catalog(catalog)
+            assert pool.catalog_digest == fresh.digest == ItemPool().catalog_digest
+            assert (pool.catalog_report.duplicates, pool.catalog_report.conflicts) == (fresh.duplicates, fresh.conflicts)
+            assert pool.find(builtin[7].text.upper()) == 7
+            stats = pool.get_stats()
+            assert stats == {"total_items": 80, "good_items": 40, "bad_items": 40, "categories": 8}
+            good, bad = pool.get_level_items(3, 2, preferred_themes=["cybersecurity"])
+            assert all(i.is_good and i.category == "cybersecurity" for i in good)
+            assert all(not i.is_good and i.category == "cybersecurity" for i in bad)
+            print(f"   Sampled: {', '.join(i.text for i in good + bad)}")
+            del pool, good, bad, fresh
+            catalog.close()
+            print()
+
+        # Test 2: Repeated texts are found by the indexing scan and kept out of the stats
+        print("[OK] Test: Duplicates")
+        dup_path = os.path.join(tmp, "dups.jsonl")
+        with open(dup_path, "w", encoding="utf-8") as f:
+            for text, is_good in (("Deep Work", True), ("Soda", False), ("deep  work", True)):
+                f.write(json.dumps({"text": text, "is_good": is_good, "category": "focus"}) + "\n")
+        for _ in range(2):  # Built, then loaded from the sidecar
+            with MappedCatalog.open(dup_path) as catalog:
+                pool = ItemPool(catalog)
+                assert pool.catalog_report.duplicates == ((2, 0),)
+                assert pool.get_stats() == {"total_items": 2, "good_items": 1, "bad_items": 1, "categories": 1}
+                del pool
+        print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Item Catalog Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_item_catalog()
@@ -5,16 +5,56 @@ This module manages all game items organized by theme.
 
 Classes:
     - Item: Dataclass representing a game item
+    - CompactCatalog: Struct-of-arrays storage for large item catalogs
     - ItemPool: Repository for all game items
+    - DealScheduler: Deals whole games without repeating items
     - ItemDisplay: Formatter for item display
 
 Author: Development Team
 Version: 1.0
 """
 
+from array import array
+from collections import OrderedDict, deque
 from dataclasses import dataclass
-from typing import List, Dict, Tuple
+from bisect import bisect_right
+from functools import lru_cache
+from typing import List, Dict, Optional, Sequence, Tuple, Union
 import random
+import secrets
+import threading
+
+from alias_sampler import BucketSampler
+from catalog_validation import describe_conflicts, validate_catalog
+
+
+def new_session_seed() -> int:
+    """Create a fresh 64-bit seed for a game session"""
+    return secrets.randbits(64)
+
+
+def session_rng(seed: int, *stream) -> random.Random:
+    """
+    Create an independent random generator for one stream of a session
+    
+    Each (seed, stream) pair gets its own generator, so a level's deal,
+    its recall shuffle and the final tip never consume each other's draws
+    and can be rebuilt in any order. Replaying a game only needs its seed.
+    
+    Args:
+        seed (int): Session seed (see ``new_session_seed``)
+        *stream: Labels naming the stream, e.g. ``(level, "deal")``
+    
+    Returns:
+        random.Random: Generator private to the stream
+    
+    Example:
+        >>> a = session_rng(42, 1, "deal").random()
+        >>> a == session_rng(42, 1, "deal").random()
+        True
+    """
+    # String seeds are hashed with SHA-512, stable across runs and platforms
+    return random.Random(":".join(map(str, (seed,) + stream)))
 
 
 @dataclass(frozen=True, eq=True)
@@ -41,6 +81,152 @@ class Item:
         return f"Item('{self.text}', {self.is_good}, '{self.category}')"
 
 
+class CompactCatalog(Sequence):
+    """
+    Struct-of-arrays item storage
+    
+    Stores a catalog as parallel arrays instead of one Item object per entry:
+    - text table: unique texts as one UTF-8 blob plus an offsets array
+    - text codes: ``array("I")`` index into the text table per item
+    - category codes: ``array("B")`` (``"H"`` past 256 categories)
+    - polarity: bitset, one bit per item
+    
+    Indexing returns a fresh ``Item`` view, so callers that compare, hash
+    or format items keep working unchanged.
+    
+    Example:
+        >>> catalog = CompactCatalog.from_items([Item("Water", True, "healthy_habits")])
+        >>> catalog[0]
+        Item('Water', True, 'healthy_habits')
+    """
+    
+    def __init__(self):
+        """Create an empty catalog (use ``append`` or ``from_items``)"""
+        self._text_blob = bytearray()
+        self._text_offsets = array("I", [0])
+        self._text_lookup: Dict[str, int] = {}
+        self._text_codes = array("I")
+        self._category_names: List[str] = []
+        self._category_lookup: Dict[str, int] = {}
+        self._category_codes = array("B")
+        self._polarity = bytearray()
+        self._count = 0
+    
+    @classmethod
+    def from_items(cls, items) -> "CompactCatalog":
+        """
+        Build a compact catalog from an iterable of items
+        
+        Args:
+            items (Iterable[Item]): Items to store
+        
+        Returns:
+            CompactCatalog: Catalog holding the same items in the same order
+        """
+        catalog = cls()
+        for item in items:
+            catalog.append(item.text, item.is_good, item.category)
+        catalog.seal()
+        return catalog
+    
+    def append(self, text: str, is_good: bool, category: str):
+        """Add one item to the end of the catalog"""
+        text_code = self._text_lookup.get(text) if self._text_lookup is not None else None
+        if text_code is None:
+            text_code = len(self._text_offsets) - 1
+            if self._text_lookup is not None:
+                self._text_lookup[text] = text_code
+            self._text_blob += text.encode("utf-8")
+            self._text_offsets.append(len(self._text_blob))
+        
+        category_code = self._category_lookup.get(category)
+        if category_code is None:
+            category_code = len(self._category_names)
+            self._category_lookup[category] = category_code
+            self._category_names.append(category)
+            if category_code == 256:
+                self._category_codes = array("H", self._category_codes)
+        
+        position = self._count
+        if position % 8 == 0:
+            self._polarity.append(0)
+        if is_good:
+            self._polarity[position >> 3] |= 1 << (position & 7)
+        
+        self._text_codes.append(text_code)
+        self._category_codes.append(category_code)
+        self._count += 1
+    
+    def seal(self):
+        """
+        Drop the build-time text lookup
+        
+        The lookup holds one str object per unique text, which would undo
+        the savings of the blob. Items appended after sealing still work
+        but are no longer deduplicated.
+        """
+        self._text_lookup = None
+    
+    def __len__(self) -> int:
+        return self._count
+    
+    def __getitem__(self, position: Union[int, slice]) -> Union[Item, List[Item]]:
+        """Create an Item view for ``position`` (a list of views for a slice)"""
+        if isinstance(position, slice):
+            return [self[i] for i in range(*position.indices(self._count))]
+        if position < 0:
+            position += self._count
+        if not 0 <= position < self._count:
+            raise IndexError("catalog index out of range")
+        
+        return Item(
+            text=self.text_at(position),
+            is_good=self.is_good_at(position),
+            category=self._category_names[self._category_codes[position]]
+        )
+    
+    def text_at(self, position: int) -> str:
+        """Get an item's text without creating an Item"""
+        code = self._text_codes[position]
+        start, end = self._text_offsets[code], self._text_offsets[code + 1]
+        return self._text_blob[start:end].decode("utf-8")
+    
+    def is_good_at(self, position: int) -> bool:
+        """Get an item's polarity without creating an Item"""
+        return bool(self._polarity[position >> 3] >> (position & 7) & 1)
+    
+    def partition(self) -> Dict[Tuple[bool, str], Sequence[int]]:
+        """
+        Get item positions grouped by (polarity, category)
+        
+        Returns:
+            Dict[Tuple[bool, str], Sequence[int]]: ``array("I")`` per bucket
+        """
+        buckets: Dict[Tuple[bool, int], array] = {}
+        codes = self._category_codes
+        for position in range(self._count):
+            key = (self.is_good_at(position), codes[position])
+            bucket = buckets.get(key)
+            if bucket is None:
+                bucket = buckets[key] = array("I")
+            bucket.append(position)
+        
+        return {
+            (is_good, self._category_names[code]): positions
+            for (is_good, code), positions in buckets.items()
+        }
+    
+    def nbytes(self) -> int:
+        """Approximate storage size of the catalog arrays in bytes"""
+        return (
+            len(self._text_blob)
+            + self._text_offsets.itemsize * len(self._text_offsets)
+            + self._text_codes.itemsize * len(self._text_codes)
+            + self._category_codes.itemsize * len(self._category_codes)
+            + len(self._polarity)
+        )
+
+
 class ItemPool:
     """
     Manages all game items organized by theme
@@ -94,44 +280,315 @@ class ItemPool:
         }
     }
     
-    def __init__(self):
-        """Initialize the item pool by building all items from themes"""
-        self.all_items: List[Item] = self._build_item_pool()
+    # Built-in weight profiles: category weights, and item weights by text.
+    # Unlisted categories and items weigh 1.0.
+    WEIGHT_PROFILES = {
+        "developer": {
+            "categories": {"code_quality": 3.0, "cybersecurity": 2.0, "productivity": 1.5},
+            "items": {}
+        }
+    }
+    
+    def __init__(self, catalog: Sequence[Item] = None):
+        """
+        Initialize the item pool
+        
+        Args:
+            catalog (Sequence[Item], optional): Item source to draw from.
+                Defaults to items built from ``ITEM_THEMES``. Catalogs that
+                provide ``partition()`` and ``report()`` methods (see
+                ``item_catalog``) are indexed and validated without
+                materializing their items.
+        
+        Raises:
+            ValueError: If a text appears as both a good and a bad item
+        """
+        if catalog is None:
+            catalog = self._build_item_pool()
+        self.all_items: Sequence[Item] = catalog
+        
+        # One validation pass (or the catalog's saved one); repeated texts are left out of the index
+        report = getattr(catalog, "report", None)
+        self.catalog_report = report() if report is not None else validate_catalog(catalog)
+        if not self.catalog_report.ok:
+            raise ValueError(
+                "Catalog lists the same text as good and bad:\n"
+                + describe_conflicts(catalog, self.catalog_report.conflicts)
+            )
+        self._build_index()
+        
+        self._weight_profiles: Dict[str, Dict[str, Dict[str, float]]] = {
+            name: profile for name, profile in self.WEIGHT_PROFILES.items()
+        }
+        # (profile, polarity, themes) -> sampler, built on first use
+        self._samplers: Dict[Tuple[str, bool, Tuple[str, ...]], BucketSampler] = {}
+        self._search_index = None
     
-    def _build_item_pool(self) -> List[Item]:
+    @classmethod
+    def from_catalog_file(cls, path: str, **kwargs) -> "ItemPool":
         """
-        Build list of all items from themes
+        Create a pool backed by an external JSONL or CSV catalog file
+        
+        Args:
+            path (str): Catalog file path
+            **kwargs: Passed through to ``MappedCatalog.open``
         
         Returns:
-            List[Item]: List of 80 Item objects (40 good, 40 bad)
+            ItemPool: Pool whose items are read lazily from the file
         """
-        items = []
+        from item_catalog import MappedCatalog
+        return cls(MappedCatalog.open(path, **kwargs))
+    
+    def _build_item_pool(self) -> CompactCatalog:
+        """
+        Build the catalog of all items from themes
+        
+        Returns:
+            CompactCatalog: 80 items (40 good, 40 bad) in compact storage
+        """
+        items = CompactCatalog()
         
         for category, theme_items in self.ITEM_THEMES.items():
             # Add good items
             for text in theme_items["good"]:
-                items.append(Item(text=text, is_good=True, category=category))
+                items.append(text, True, category)
             
             # Add bad items
             for text in theme_items["bad"]:
-                items.append(Item(text=text, is_good=False, category=category))
+                items.append(text, False, category)
         
+        items.seal()
         return items
     
+    def _partition(self) -> Dict[Tuple[bool, str], Sequence[int]]:
+        """
+        Group item positions by (polarity, category)
+        
+        Returns:
+            Dict[Tuple[bool, str], Sequence[int]]: Positions in ``all_items``
+        """
+        repeated = {position for position, _ in self.catalog_report.duplicates}
+        partition = getattr(self.all_items, "partition", None)
+        if partition is not None:
+            buckets = partition()
+            if repeated:
+                buckets = {
+                    key: array("I", (p for p in positions if p not in repeated))
+                    for key, positions in buckets.items()
+                }
+            return {key: positions for key, positions in buckets.items() if len(positions)}
+        
+        buckets: Dict[Tuple[bool, str], List[int]] = {}
+        for position, item in enumerate(self.all_items):
+            if position not in repeated:
+                buckets.setdefault((item.is_good, item.category), []).append(position)
+        return buckets
+    
+    def _build_index(self):
+        """
+        Partition item positions once so deals never rescan the pool
+        
+        Builds three views over positions in ``all_items``:
+        - by (polarity, category): one position sequence per bucket
+        - by polarity: ``True`` / ``False`` -> list of buckets
+        - by category: category name -> list of buckets
+        """
+        self._by_bucket: Dict[Tuple[bool, str], Sequence[int]] = self._partition()
+        self._by_polarity: Dict[bool, List[Sequence[int]]] = {True: [], False: []}
+        self._by_category: Dict[str, List[Sequence[int]]] = {}
+        
+        for (is_good, category), positions in self._by_bucket.items():
+            self._by_polarity[is_good].append(positions)
+            self._by_category.setdefault(category, []).append(positions)
+    
+    def _candidate_buckets(
+        self,
+        is_good: bool,
+        preferred_themes: List[str] = None
+    ) -> List[Sequence[int]]:
+        """
+        Get the index buckets a draw should come from
+        
+        Args:
+            is_good (bool): Polarity to draw
+            preferred_themes (List[str], optional): Restrict to these themes
+        
+        Returns:
+            List[Sequence[int]]: Position sequences; their union is the candidate pool
+        """
+        if not preferred_themes:
+            return self._by_polarity[is_good]
+        
+        # dict.fromkeys drops repeated themes while keeping order
+        return [
+            self._by_bucket[(is_good, theme)]
+            for theme in dict.fromkeys(preferred_themes)
+            if (is_good, theme) in self._by_bucket
+        ]
+    
+    @staticmethod
+    def _sample_positions(
+        buckets: List[Sequence[int]],
+        count: int,
+        rng: random.Random = None
+    ) -> List[int]:
+        """
+        Sample positions from the union of buckets without concatenating them
+        
+        Draws ``count`` offsets into the virtual concatenation of ``buckets``
+        and maps each back through the bucket prefix sums, so the cost is
+        O(k log b) for k draws over b buckets instead of O(N).
+        
+        Raises:
+            ValueError: If the buckets hold fewer than ``count`` positions
+        """
+        rng = rng or random
+        
+        if len(buckets) == 1:
+            bucket = buckets[0]
+            return [bucket[i] for i in rng.sample(range(len(bucket)), count)]
+        
+        starts = []
+        total = 0
+        for bucket in buckets:
+            starts.append(total)
+            total += len(bucket)
+        
+        positions = []
+        for offset in rng.sample(range(total), count):
+            b = bisect_right(starts, offset) - 1
+            positions.append(buckets[b][offset - starts[b]])
+        return positions
+    
+    def set_weight_profile(
+        self,
+        name: str,
+        category_weights: Dict[str, float] = None,
+        item_weights: Dict[str, float] = None
+    ):
+        """
+        Register or replace a weight profile
+        
+        Only the samplers cached for this profile are dropped; the catalog
+        and its index are untouched.
+        
+        Args:
+            name (str): Profile name passed as ``weight_profile``
+            category_weights (Dict[str, float], optional): Weight per category
+            item_weights (Dict[str, float], optional): Multiplier per item text
+        
+        Example:
+            >>> pool = ItemPool()
+            >>> pool.set_weight_profile("security", {"cybersecurity": 4.0})
+            >>> good, bad = pool.get_level_items(3, 2, weight_profile="security")
+        """
+        self._weight_profiles[name] = {
+            "categories": dict(category_weights or {}),
+            "items": dict(item_weights or {})
+        }
+        for key in [key for key in self._samplers if key[0] == name]:
+            del self._samplers[key]
+    
+    def _weighted_sampler(
+        self,
+        name: str,
+        is_good: bool,
+        preferred_themes: List[str] = None
+    ) -> BucketSampler:
+        """
+        Get the cached alias sampler for a profile, building it on first use
+        
+        Raises:
+            KeyError: If the profile is not registered
+        """
+        themes = tuple(dict.fromkeys(preferred_themes or ()))
+        key = (name, is_good, themes)
+        sampler = self._samplers.get(key)
+        if sampler is not None:
+            return sampler
+        
+        profile = self._weight_profiles[name]
+        category_weights = profile["categories"]
+        item_weights = profile["items"]
+        
+        buckets = []
+        bucket_weights = []
+        multipliers = []
+        for (good, category), positions in self._by_bucket.items():
+            if good != is_good or (themes and category not in themes):
+                continue
+            buckets.append(positions)
+            bucket_weights.append(category_weights.get(category, 1.0))
+            if item_weights:
+                # Only profiles with item weights pay for reading item text
+                multipliers.append([
+                    item_weights.get(self.all_items[p].text, 1.0) for p in positions
+                ])
+            else:
+                multipliers.append(None)
+        
+        sampler = self._samplers[key] = BucketSampler(buckets, bucket_weights, multipliers)
+        return sampler
+    
+    def get_level_positions(
+        self,
+        num_good: int,
+        num_bad: int,
+        preferred_themes: List[str] = None,
+        rng: random.Random = None,
+        weight_profile: str = None
+    ) -> Tuple[List[int], List[int]]:
+        """
+        Get random item positions for a level without materializing items
+        
+        Args:
+            num_good (int): Number of good items to select
+            num_bad (int): Number of bad items to select
+            preferred_themes (List[str], optional): Restrict to these themes
+            rng (random.Random, optional): Generator to draw from.
+                Defaults to the module-level ``random`` state.
+            weight_profile (str, optional): Registered weight profile; draws
+                are weighted in O(1) each via cached alias tables
+        
+        Returns:
+            Tuple[List[int], List[int]]: Positions in ``all_items``
+        """
+        if weight_profile is not None:
+            return (
+                self._weighted_sampler(weight_profile, True, preferred_themes).sample(num_good, rng),
+                self._weighted_sampler(weight_profile, False, preferred_themes).sample(num_bad, rng)
+            )
+        
+        good_positions = self._sample_positions(
+            self._candidate_buckets(True, preferred_themes), num_good, rng
+        )
+        bad_positions = self._sample_positions(
+            self._candidate_buckets(False, preferred_themes), num_bad, rng
+        )
+        return good_positions, bad_positions
+    
     def get_level_items(
         self,
         num_good: int,
         num_bad: int,
-        preferred_themes: List[str] = None
+        preferred_themes: List[str] = None,
+        rng: random.Random = None,
+        weight_profile: str = None
     ) -> Tuple[List[Item], List[Item]]:
         """
         Get random items for a level
         
+        Selection reads from the index built at construction time, so the
+        cost grows with the number of items drawn, not with the pool size.
+        
         Args:
             num_good (int): Number of good items to select
             num_bad (int): Number of bad items to select
             preferred_themes (List[str], optional): List of themes to prefer.
                 If None, selects from all themes.
+            rng (random.Random, optional): Session generator (see ``session_rng``).
+                Defaults to the module-level ``random`` state.
+            weight_profile (str, optional): Weight profile name, e.g. "developer"
         
         Returns:
             Tuple[List[Item], List[Item]]: (good_items, bad_items)
@@ -142,25 +599,21 @@ class ItemPool:
             >>> len(good), len(bad)
             (3, 2)
         """
-        # Filter by type
-        good_pool = [item for item in self.all_items if item.is_good]
-        bad_pool = [item for item in self.all_items if not item.is_good]
-        
-        # Optional theme filtering
-        if preferred_themes:
-            good_pool = [i for i in good_pool if i.category in preferred_themes]
-            bad_pool = [i for i in bad_pool if i.category in preferred_themes]
-        
         # Random selection (no duplicates within a level)
-        good_items = random.sample(good_pool, num_good)
-        bad_items = random.sample(bad_pool, num_bad)
+        good_positions, bad_positions = self.get_level_positions(
+            num_good, num_bad, preferred_themes, rng, weight_profile
+        )
+        
+        good_items = [self.all_items[p] for p in good_positions]
+        bad_items = [self.all_items[p] for p in bad_positions]
         
         return good_items, bad_items
     
     @staticmethod
     def shuffle_display_items(
         good_items: List[Item],
-        bad_items: List[Item]
+        bad_items: List[Item],
+        rng: random.Random = None
     ) -> List[Item]:
         """
         Combine and shuffle items for display
@@ -168,6 +621,7 @@ class ItemPool:
         Args:
             good_items (List[Item]): List of good items
             bad_items (List[Item]): List of bad items
+            rng (random.Random, optional): Session generator (see ``session_rng``)
         
         Returns:
             List[Item]: Shuffled list of all items
@@ -180,9 +634,38 @@ class ItemPool:
             2
         """
         all_items = good_items + bad_items
-        random.shuffle(all_items)
+        (rng or random).shuffle(all_items)
         return all_items
     
+    @property
+    def catalog_digest(self) -> str:
+        """SHA-256 of the catalog content; changes whenever any item does"""
+        return self.catalog_report.digest
+    
+    def find(self, text: str) -> Optional[int]:
+        """
+        Look up an item by text, ignoring case and extra whitespace
+        
+        Args:
+            text (str): Item text
+        
+        Returns:
+            int or None: Position in ``all_items``
+        """
+        return self.catalog_report.index.get(text)
+    
+    def search_index(self):
+        """
+        Name matcher over the whole catalog, built on first use
+
+        Returns:
+            ItemMatcher: Matcher whose ids are positions in ``all_items``
+        """
+        if self._search_index is None:
+            from item_search import ItemMatcher
+            self._search_index = ItemMatcher(item.text for item in self.all_items)
+        return self._search_index
+    
     def get_stats(self) -> Dict[str, int]:
         """
         Get statistics about the item pool
@@ -190,15 +673,233 @@ class ItemPool:
         Returns:
             Dict[str, int]: Statistics including total, good, bad, and category counts
         """
-        good_count = len([i for i in self.all_items if i.is_good])
-        bad_count = len([i for i in self.all_items if not i.is_good])
+        good = sum(len(b) for b in self._by_polarity[True])
+        bad = sum(len(b) for b in self._by_polarity[False])
+        return {
+            "total_items": good + bad,  # Dealable items: repeated texts are left out
+            "good_items": good,
+            "bad_items": bad,
+            "categories": len(self._by_category)
+        }
+
+
+class DealScheduler:
+    """
+    Deals whole games so no item repeats across levels
+    
+    All levels of a game are drawn from one lazy Fisher-Yates shuffle per
+    polarity. Only swapped slots are stored, so a game costs O(k) time and
+    memory for k items dealt, and an item drawn at level 1 is excluded from
+    later levels without rescanning the pool.
+    
+    With ``cooldown_games`` > 0 the scheduler also remembers the items each
+    player saw in their last games and skips them (O(1) per check), falling
+    back to cooled-down items only if the pool would otherwise run dry.
+    Such a deal depends on the player's history, not only on the session
+    seed; games whose seed is shown for replay use ``pick_seed`` instead.
+    
+    Example:
+        >>> scheduler = DealScheduler(ItemPool(), cooldown_games=2)
+        >>> deal = scheduler.deal_game(GameConfig.LEVELS, player_id="alice")
+        >>> good, bad = deal[3]
+    """
+    
+    def __init__(self, pool: ItemPool, cooldown_games: int = 0, max_players: int = 10000):
+        """
+        Args:
+            pool (ItemPool): Pool to deal from
+            cooldown_games (int): Games an item stays excluded for a player
+            max_players (int): Players whose history is kept (least recent dropped)
+        """
+        self.pool = pool
+        self.cooldown_games = cooldown_games
+        self.max_players = max_players
+        # player_id -> (recent games' positions, position -> times seen)
+        self._history: "OrderedDict[str, Tuple[deque, Dict[int, int]]]" = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def deal_game_positions(
+        self,
+        levels: Dict[int, Dict],
+        rng: random.Random = None,
+        player_id: str = None,
+        preferred_themes: List[str] = None
+    ) -> Dict[int, Tuple[List[int], List[int]]]:
+        """
+        Deal item positions for every level of one game
+        
+        Args:
+            levels (Dict[int, Dict]): Level table, e.g. ``GameConfig.LEVELS``
+            rng (random.Random, optional): Session generator (see ``session_rng``)
+            player_id (str, optional): Player to apply the cooldown window for
+            preferred_themes (List[str], optional): Restrict to these themes
+        
+        Returns:
+            Dict[int, Tuple[List[int], List[int]]]: level -> (good, bad) positions
         
+        Raises:
+            ValueError: If the pool is too small to deal the game without repeats
+        """
+        rng = rng or random
+        with self._lock:
+            cooldown = self._history.get(player_id) if player_id is not None else None
+            recent = dict(cooldown[1]) if cooldown else {}
+        
+        draws = {
+            is_good: _LazyDraw(self.pool._candidate_buckets(is_good, preferred_themes), rng, recent)
+            for is_good in (True, False)
+        }
+        
+        deal = {}
+        for level, config in sorted(levels.items()):
+            deal[level] = (
+                draws[True].take(config["good_items"]),
+                draws[False].take(config["bad_items"])
+            )
+        
+        if player_id is not None and self.cooldown_games > 0:
+            self._remember(player_id, [p for good, bad in deal.values() for p in good + bad])
+        
+        return deal
+    
+    def deal_game(
+        self,
+        levels: Dict[int, Dict],
+        rng: random.Random = None,
+        player_id: str = None,
+        preferred_themes: List[str] = None
+    ) -> Dict[int, Tuple[List[Item], List[Item]]]:
+        """
+        Deal items for every level of one game
+        
+        Same arguments as ``deal_game_positions``.
+        
+        Returns:
+            Dict[int, Tuple[List[Item], List[Item]]]: level -> (good_items, bad_items)
+        """
+        items = self.pool.all_items
         return {
-            "total_items": len(self.all_items),
-            "good_items": good_count,
-            "bad_items": bad_count,
-            "categories": len(self.ITEM_THEMES)
+            level: ([items[p] for p in good], [items[p] for p in bad])
+            for level, (good, bad) in self.deal_game_positions(
+                levels, rng, player_id, preferred_themes
+            ).items()
         }
+    
+    def pick_seed(
+        self,
+        levels: Dict[int, Dict],
+        player_id: str,
+        candidates: int = 16,
+        preferred_themes: List[str] = None
+    ) -> int:
+        """
+        Draw a session seed whose deal repeats few of the player's recent items
+        
+        The cooldown only chooses among ``candidates`` fresh seeds; the game
+        is then dealt with ``session_rng(seed, "deal")`` and no player, so
+        the seed alone replays it. The chosen deal enters the player's
+        cooldown window.
+        
+        Args:
+            levels (Dict[int, Dict]): Level table, e.g. ``GameConfig.LEVELS``
+            player_id (str): Player whose cooldown window to consult
+            candidates (int): Seeds to try at most
+            preferred_themes (List[str], optional): Restrict to these themes
+        
+        Returns:
+            int: Session seed
+        """
+        with self._lock:
+            cooldown = self._history.get(player_id)
+            recent = dict(cooldown[1]) if cooldown else {}
+        
+        best = None
+        for _ in range(candidates if recent else 1):
+            seed = new_session_seed()
+            deal = self.deal_game_positions(levels, session_rng(seed, "deal"), None, preferred_themes)
+            positions = [p for good, bad in deal.values() for p in good + bad]
+            repeats = sum(p in recent for p in positions)
+            if best is None or repeats < best[0]:
+                best = (repeats, seed, positions)
+            if repeats == 0:
+                break
+        
+        if self.cooldown_games > 0:
+            self._remember(player_id, best[2])
+        return best[1]
+    
+    def _remember(self, player_id: str, positions: List[int]):
+        """Record a game's items in the player's cooldown window"""
+        with self._lock:
+            entry = self._history.pop(player_id, None)
+            if entry is None:
+                entry = (deque(), {})
+            games, counts = entry
+            
+            games.append(positions)
+            for p in positions:
+                counts[p] = counts.get(p, 0) + 1
+            
+            while len(games) > self.cooldown_games:
+                for p in games.popleft():
+                    counts[p] -= 1
+                    if counts[p] == 0:
+                        del counts[p]
+            
+            self._history[player_id] = entry
+            while len(self._history) > self.max_players:
+                self._history.popitem(last=False)
+
+
+class _LazyDraw:
+    """
+    Partial Fisher-Yates over the virtual union of index buckets
+    
+    Slot ``i`` of the shuffle holds ``swaps.get(i, i)``; only slots that
+    were swapped are stored. Drawn offsets move to the front, so they can
+    never be drawn again.
+    """
+    
+    def __init__(self, buckets: List[Sequence[int]], rng: random.Random, cooldown: Dict[int, int]):
+        self.buckets = buckets
+        self.starts = []
+        self.total = 0
+        for bucket in buckets:
+            self.starts.append(self.total)
+            self.total += len(bucket)
+        self.rng = rng
+        self.cooldown = cooldown
+        self.swaps: Dict[int, int] = {}
+        self.drawn = 0
+        self.skipped: List[int] = []
+    
+    def take(self, count: int) -> List[int]:
+        """Draw ``count`` positions not drawn before in this game"""
+        positions = []
+        while len(positions) < count:
+            if self.drawn < self.total:
+                position = self._next()
+                if position in self.cooldown:
+                    self.skipped.append(position)
+                    continue
+            elif self.skipped:
+                # Pool exhausted: reuse items still in the cooldown window
+                position = self.skipped.pop(self.rng.randrange(len(self.skipped)))
+            else:
+                raise ValueError("Not enough items to deal a game without repeats")
+            positions.append(position)
+        return positions
+    
+    def _next(self) -> int:
+        """Advance the shuffle by one slot and return the item position"""
+        i = self.drawn
+        j = self.rng.randrange(i, self.total)
+        offset = self.swaps.get(j, j)
+        self.swaps[j] = self.swaps.get(i, i)
+        self.drawn += 1
+        
+        b = bisect_right(self.starts, offset) - 1
+        return self.buckets[b][offset - self.starts[b]]
 
 
 class ItemDisplay:
@@ -208,8 +909,39 @@ class ItemDisplay:
     Provides methods to format items for different display contexts:
     - Grid layout for memorization phase
     - Numbered list for recall phase
+    
+    Per-item markup is cached by (item, column width, style), so a board
+    that is redrawn, or items that recur across boards, are only formatted
+    once. Builders collect parts and join once, linear in output size.
     """
     
+    # Column widths for each display style
+    GRID_WIDTH = 20
+    RECALL_WIDTH = 30
+    
+    # Cached fragments (items are hashable, so Item views hit the cache too)
+    FRAGMENT_CACHE_SIZE = 65536
+    
+    @staticmethod
+    @lru_cache(maxsize=FRAGMENT_CACHE_SIZE)
+    def render_fragment(item: Item, width: int, style: str) -> str:
+        """
+        Render one item's markup for a display style
+        
+        Args:
+            item (Item): Item to render
+            width (int): Column width for the item text
+            style (str): "grid" (symbol and color) or "recall" (text only)
+        
+        Returns:
+            str: Rendered fragment
+        """
+        if style == "grid":
+            symbol = "[+]" if item.is_good else "[-]"
+            color = "green" if item.is_good else "red"
+            return f"[{color}]{symbol}  {item.text:<{width}}[/{color}]"
+        return f"{item.text:<{width}}"
+    
     @staticmethod
     def format_grid(items: List[Item], columns: int = 3) -> str:
         """
@@ -228,20 +960,14 @@ class ItemDisplay:
             >>> "[green]" in grid
             True
         """
-        lines = []
+        render = ItemDisplay.render_fragment
+        width = ItemDisplay.GRID_WIDTH
+        fragments = [render(item, width, "grid") for item in items]
         
-        for i in range(0, len(items), columns):
-            row_items = items[i:i+columns]
-            row_parts = []
-            
-            for item in row_items:
-                symbol = "[+]" if item.is_good else "[-]"
-                color = "green" if item.is_good else "red"
-                row_parts.append(f"[{color}]{symbol}  {item.text:<20}[/{color}]")
-            
-            lines.append("  " + "  ".join(row_parts))
-        
-        return "\n".join(lines)
+        return "\n".join(
+            "  " + "  ".join(fragments[i:i + columns])
+            for i in range(0, len(fragments), columns)
+        )
     
     @staticmethod
     def format_recall_list(items: List[Item]) -> str:
@@ -260,12 +986,13 @@ class ItemDisplay:
             >>> "1." in recall_list
             True
         """
-        lines = []
+        render = ItemDisplay.render_fragment
+        width = ItemDisplay.RECALL_WIDTH
         
-        for i, item in enumerate(items, 1):
-            lines.append(f"  {i}. {item.text:<30}")
-        
-        return "\n".join(lines)
+        return "\n".join(
+            f"  {i}. {render(item, width, 'recall')}"
+            for i, item in enumerate(items, 1)
+        )
     
     @staticmethod
     def create_display_box(content: str, title: str = "") -> str:
@@ -282,23 +1009,22 @@ class ItemDisplay:
         lines = content.split("\n")
         max_width = max(len(line) for line in lines) if lines else 0
         width = max(max_width, len(title)) + 4
+        border = f"+{'-' * (width - 2)}+"
         
         # Top border
+        parts = [border]
         if title:
-            box = f"+{'-' * (width - 2)}+\n"
-            box += f"| {title.center(width - 4)} |\n"
-            box += f"+{'-' * (width - 2)}+\n"
-        else:
-            box = f"+{'-' * (width - 2)}+\n"
+            parts.append(f"| {title.center(width - 4)} |")
+            parts.append(border)
         
         # Content
-        for line in lines:
-            box += f"| {line.ljust(width - 4)} |\n"
+        inner = width - 4
+        parts.extend(f"| {line.ljust(inner)} |" for line in lines)
         
         # Bottom border
-        box += f"+{'-' * (width - 2)}+\n"
+        parts.append(border)
         
-        return box
+        return "\n".join(parts) + "\n"
 
 
 # Module-level test function
@@ -376,7 +1102,92 @@ def test_item_pool():
         print(f"      - {item.text} ({item.category})")
     assert all(i.category in ["healthy_habits", "productivity"] for i in good + bad)
     print()
+
+    # Test 8: Index partitions
+    print("[OK] Test 8: Index Partitions")
+    good, bad = pool.get_level_items(5, 5, preferred_themes=["learning"])
+    assert len(set(good)) == 5 and len(set(bad)) == 5, "Draws must not repeat within a level"
+    assert all(i.is_good and i.category == "learning" for i in good)
+    assert all(not i.is_good and i.category == "learning" for i in bad)
+    bucket_total = sum(len(positions) for positions in pool._by_bucket.values())
+    assert bucket_total == stats['total_items'], "Every item belongs to exactly one bucket"
+    print(f"   {len(pool._by_bucket)} (polarity, category) buckets cover {bucket_total} items")
+    print()
+
+    # Test 9: Seeded session streams
+    print("[OK] Test 9: Seeded Session Streams")
+    first = pool.get_level_items(3, 2, rng=session_rng(1234, 1, "deal"))
+    again = pool.get_level_items(3, 2, rng=session_rng(1234, 1, "deal"))
+    assert first == again, "Same seed and stream must replay the same deal"
+    shuffled = ItemPool.shuffle_display_items(*first, rng=session_rng(1234, 1, "display"))
+    assert shuffled == ItemPool.shuffle_display_items(*again, rng=session_rng(1234, 1, "display"))
+    print(f"   Seed 1234, level 1: {', '.join(i.text for i in shuffled)}")
+    print()
+
+    # Test 10: Whole-game dealing
+    print("[OK] Test 10: Whole-Game Dealing")
+    levels = {n: {"good_items": n + 2, "bad_items": n + 1} for n in range(1, 6)}
+    scheduler = DealScheduler(pool, cooldown_games=1)
+    deal = scheduler.deal_game(levels, rng=session_rng(1234, "game"), player_id="p1")
+    dealt = [i for good, bad in deal.values() for i in good + bad]
+    assert len(dealt) == len(set(dealt)) == 45, "No item may repeat across levels"
+    assert all(i.is_good for good, _ in deal.values() for i in good)
+    following = scheduler.deal_game(levels, rng=session_rng(1234, "game"), player_id="p1")
+    overlap = set(dealt) & {i for good, bad in following.values() for i in good + bad}
+    print(f"   45 distinct items over 5 levels; {len(overlap)} repeated in the next game (cooldown 1)")
+    # 25 good items per game but only 40 - 25 = 15 fresh ones remain
+    assert len(overlap) == 25 - 15, "Cooldown should only reuse items once the pool runs dry"
     
+    # Replayable games: the cooldown picks the seed, the seed alone fixes the deal
+    picker = DealScheduler(pool, cooldown_games=1)
+    seeds = [picker.pick_seed(levels, "p2") for _ in range(2)]
+    games = [picker.deal_game_positions(levels, rng=session_rng(seed, "deal")) for seed in seeds]
+    assert games[1] == DealScheduler(pool).deal_game_positions(levels, rng=session_rng(seeds[1], "deal"))
+    repeated = {p for g, b in games[0].values() for p in g + b} & {p for g, b in games[1].values() for p in g + b}
+    print(f"   Replayable seeds: {len(repeated)} items repeated in the next game")
+    print()
+
+    # Test 11: Weighted profiles
+    print("[OK] Test 11: Weighted Profiles")
+    rng = session_rng(1234, "weights")
+    counts = {}
+    for _ in range(2000):
+        good, _ = pool.get_level_items(3, 0, rng=rng, weight_profile="developer")
+        assert len(set(good)) == 3
+        for i in good:
+            counts[i.category] = counts.get(i.category, 0) + 1
+    assert counts["code_quality"] > 2 * counts["learning"], "code_quality should be favoured"
+    pool.set_weight_profile("only_water", {"healthy_habits": 1.0}, {"Water": 1000.0})
+    waters = sum(pool.get_level_items(1, 0, rng=rng, weight_profile="only_water")[0][0].text == "Water" for _ in range(50))
+    assert waters >= 45, "Item weights should dominate the draw"
+    # Swapping the profile drops its cached samplers
+    pool.set_weight_profile("only_water", {c: 0.0 for c in pool.ITEM_THEMES}, {})
+    try:
+        pool.get_level_items(1, 0, weight_profile="only_water")
+        assert False, "A profile with no positive weight cannot deal"
+    except ValueError:
+        pass
+    print(f"   developer profile: code_quality {counts['code_quality']} vs learning {counts['learning']}")
+    print()
+
+    # Test 12: Compact storage
+    print("[OK] Test 12: Compact Catalog Storage")
+    items = [Item(t, g, c) for t, g, c in (("Water", True, "healthy_habits"), ("Soda", False, "healthy_habits"))]
+    catalog = CompactCatalog.from_items(items)
+    assert list(catalog) == items, "Item views must equal the original items"
+    assert catalog[-1] == Item("Soda", False, "healthy_habits")
+    assert catalog[:1] == items[:1] and catalog[::-1] == items[::-1]
+    source = [
+        Item(text, is_good, category)
+        for category, theme_items in ItemPool.ITEM_THEMES.items()
+        for is_good, texts in ((True, theme_items["good"]), (False, theme_items["bad"]))
+        for text in texts
+    ]
+    assert list(pool.all_items) == source, "Compact storage must hold the theme catalog in order"
+    assert pool.all_items[10:15] == source[10:15]
+    print(f"   {len(pool.all_items)} built-in items stored in {pool.all_items.nbytes()} bytes")
+    print()
+
     # Summary
     print("=" * 60)
     print("  SUCCESS: All Item Pool Tests Passed!")
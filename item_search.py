@@ -0,0 +1,520 @@
+"""
+Forget to Win - Item Name Search
+
+This module lets players recall items by name instead of by number. A
+prefix trie answers autocomplete queries and a BK-tree resolves typos
+("Spaced Repitition" -> "Spaced Repetition") by edit distance.
+
+Classes:
+    - PrefixTrie: Prefix completion with top results cached on every node
+    - BKTree: Edit-distance index for typo-tolerant lookup
+    - ItemMatcher: Trie + word-level BK-tree over a list of item names
+
+Author: Development Team
+Version: 1.0
+"""
+
+from typing import Dict, Iterable, List, Optional, Sequence, Set, Tuple
+
+
+def normalize_name(text: str) -> str:
+    """
+    Canonical form used for matching: case-folded, single-spaced
+
+    Example:
+        >>> normalize_name("  Clean   Function ")
+        'clean function'
+    """
+    return " ".join(text.casefold().split())
+
+
+def edit_distance(a: str, b: str, limit: int = None) -> int:
+    """
+    Levenshtein distance between two strings
+
+    Uses Myers' bit-parallel algorithm: one column of the edit matrix is
+    packed into an integer, so each character of the longer string costs a
+    handful of integer operations instead of a row of the DP table.
+
+    Args:
+        a (str): First string
+        b (str): Second string
+        limit (int, optional): Cap the result at ``limit + 1``; strings
+            whose lengths differ by more than ``limit`` return at once
+
+    Returns:
+        int: Number of single-character edits turning ``a`` into ``b``
+    """
+    if len(a) < len(b):
+        a, b = b, a
+    if limit is not None and len(a) - len(b) > limit:
+        return limit + 1
+    if not b:
+        return len(a)
+
+    # Bit i of peq[c] is set where b[i] == c
+    peq: Dict[str, int] = {}
+    for i, c in enumerate(b):
+        peq[c] = peq.get(c, 0) | (1 << i)
+    full = (1 << len(b)) - 1
+    last = 1 << (len(b) - 1)
+
+    # Vertical +1/-1 deltas of the current column
+    pv, mv, score = full, 0, len(b)
+    for c in a:
+        eq = peq.get(c, 0)
+        xv = eq | mv
+        xh = (((eq & pv) + pv) ^ pv) | eq
+        ph = (mv | ~(xh | pv)) & full
+        mh = pv & xh
+        if ph & last:
+            score += 1
+        elif mh & last:
+            score -= 1
+        ph = ((ph << 1) | 1) & full
+        mh = (mh << 1) & full
+        pv = (mh | ~(xv | ph)) & full
+        mv = ph & xv
+
+    return score if limit is None else min(score, limit + 1)
+
+
+class _TrieNode:
+    """Trie node: children by character and the best completions below it"""
+    __slots__ = ("children", "top")
+
+    def __init__(self):
+        self.children: Dict[str, "_TrieNode"] = {}
+        self.top: List[int] = []
+
+
+class PrefixTrie:
+    """
+    Prefix trie with cached completions
+
+    Every node keeps the ids of its first ``top_k`` completions, so a query
+    walks ``len(prefix)`` nodes and returns a list it already holds: the
+    cost does not depend on the size of the catalog.
+
+    Example:
+        >>> trie = PrefixTrie()
+        >>> trie.insert("clean function", 0)
+        >>> trie.complete("clea")
+        [0]
+    """
+
+    def __init__(self, top_k: int = 8):
+        """
+        Args:
+            top_k (int): Completions cached per node
+        """
+        self.top_k = top_k
+        self._root = _TrieNode()
+
+    def insert(self, key: str, item_id: int):
+        """
+        Add a key; ids inserted first rank first among completions
+
+        Args:
+            key (str): Normalized key
+            item_id (int): Id returned for completions of ``key``
+        """
+        node = self._root
+        for ch in key:
+            node = node.children.setdefault(ch, _TrieNode())
+            if len(node.top) < self.top_k and item_id not in node.top:
+                node.top.append(item_id)
+
+    def complete(self, prefix: str) -> List[int]:
+        """
+        Ids whose key starts with ``prefix``, best first
+
+        Args:
+            prefix (str): Normalized prefix
+
+        Returns:
+            List[int]: Up to ``top_k`` ids
+        """
+        node = self._root
+        for ch in prefix:
+            node = node.children.get(ch)
+            if node is None:
+                return []
+        return list(node.top)
+
+
+class BKTree:
+    """
+    Burkhard-Keller tree over strings
+
+    Children hang off each node by their edit distance to it. The triangle
+    inequality lets a search within distance d skip every subtree whose
+    edge label is outside [dist - d, dist + d].
+
+    Example:
+        >>> tree = BKTree(["function", "fiction", "review"])
+        >>> tree.search("funtion", 1)
+        [(1, 'function')]
+    """
+
+    def __init__(self, keys: Iterable[str] = ()):
+        """
+        Args:
+            keys (Iterable[str]): Initial keys
+        """
+        # Node: (key, {distance: child})
+        self._root: Optional[Tuple[str, dict]] = None
+        self._size = 0
+        for key in keys:
+            self.add(key)
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, key: str):
+        """
+        Add a key (repeated keys are ignored)
+
+        Args:
+            key (str): Normalized key
+        """
+        if self._root is None:
+            self._root = (key, {})
+            self._size = 1
+            return
+        node = self._root
+        while True:
+            distance = edit_distance(key, node[0])
+            if distance == 0:
+                return
+            child = node[1].get(distance)
+            if child is None:
+                node[1][distance] = (key, {})
+                self._size += 1
+                return
+            node = child
+
+    def search(self, key: str, max_distance: int) -> List[Tuple[int, str]]:
+        """
+        All keys within ``max_distance`` edits
+
+        Args:
+            key (str): Normalized query
+            max_distance (int): Largest edit distance to accept
+
+        Returns:
+            List[Tuple[int, str]]: (distance, key), closest first
+        """
+        if self._root is None:
+            return []
+        matches = []
+        stack = [self._root]
+        while stack:
+            node = stack.pop()
+            distance = edit_distance(key, node[0])
+            if distance <= max_distance:
+                matches.append((distance, node[0]))
+            low, high = distance - max_distance, distance + max_distance
+            stack.extend(child for d, child in node[1].items() if low <= d <= high)
+        matches.sort()
+        return matches
+
+
+class ItemMatcher:
+    """
+    Name lookup over a fixed list of item names
+
+    Names are indexed in the trie under the full name and under every word
+    start, so "func" completes "def function()". Typos are resolved word by
+    word: the BK-tree holds the distinct words of all names (a vocabulary
+    far smaller than the catalog) and an inverted index maps each word back
+    to the names containing it. The BK-tree is built on the first fuzzy
+    lookup, so autocomplete-only use never pays for it.
+
+    Example:
+        >>> matcher = ItemMatcher(["Clean function", "Spaghetti code"])
+        >>> matcher.resolve("funtion")
+        0
+    """
+
+    def __init__(self, names: Iterable[str], top_k: int = 8):
+        """
+        Args:
+            names (Iterable[str]): Item names; ids are their positions
+            top_k (int): Completions returned per query
+        """
+        self.names: List[str] = list(names)
+        self._trie = PrefixTrie(top_k)
+        self._tree: Optional[BKTree] = None
+        self._exact: Dict[str, int] = {}
+        self._postings: Dict[str, List[int]] = {}
+        self._word_counts: Dict[int, int] = {}
+
+        # Shorter names first, so the cached completions favour them
+        keyed = sorted(
+            ((normalize_name(name), i) for i, name in enumerate(self.names)),
+            key=lambda entry: (len(entry[0]), entry[0])
+        )
+        for key, i in keyed:
+            if not key or key in self._exact:
+                continue
+            self._exact[key] = i
+            words = key.split(" ")
+            self._word_counts[i] = len(words)
+            self._trie.insert(key, i)
+            for w, word in enumerate(words):
+                if w:
+                    self._trie.insert(" ".join(words[w:]), i)
+                postings = self._postings.setdefault(word, [])
+                if not postings or postings[-1] != i:
+                    postings.append(i)
+
+    def __len__(self) -> int:
+        return len(self.names)
+
+    def complete(self, prefix: str) -> List[int]:
+        """
+        Ids of names with a word starting with ``prefix``
+
+        Args:
+            prefix (str): Text typed so far
+
+        Returns:
+            List[int]: Up to ``top_k`` ids, shortest names first
+        """
+        prefix = normalize_name(prefix)
+        return self._trie.complete(prefix) if prefix else []
+
+    def _words_near(self, word: str) -> List[Tuple[int, str]]:
+        """Vocabulary words within the typo budget of ``word``"""
+        if word in self._postings:
+            return [(0, word)]
+        if self._tree is None:
+            self._tree = BKTree(self._postings)
+        return self._tree.search(word, self.typo_budget(word))
+
+    def candidates(self, text: str) -> List[Tuple[int, int]]:
+        """
+        Names containing a close match for every word of ``text``
+
+        Args:
+            text (str): Name or part of one, possibly misspelt
+
+        Returns:
+            List[Tuple[int, int]]: (total edits, id), closest first; among
+            equal edits, names with fewer extra words come first
+        """
+        key = normalize_name(text)
+        if not key:
+            return []
+        if key in self._exact:
+            return [(0, self._exact[key])]
+
+        scores: Optional[Dict[int, int]] = None
+        for word in key.split(" "):
+            best: Dict[int, int] = {}
+            for distance, vocab_word in self._words_near(word):
+                for i in self._postings[vocab_word]:
+                    if scores is None or i in scores:
+                        if distance < best.get(i, distance + 1):
+                            best[i] = distance
+            scores = {i: d + (scores[i] if scores else 0) for i, d in best.items()}
+            if not scores:
+                return []
+
+        words = len(key.split(" "))
+        ranked = sorted(
+            scores.items(),
+            key=lambda entry: (entry[1], self._word_counts[entry[0]] - words, entry[0])
+        )
+        return [(distance, i) for i, distance in ranked]
+
+    def resolve(self, text: str) -> Optional[int]:
+        """
+        Best single match for ``text``
+
+        An exact name wins, then a unique prefix completion, then the name
+        with the fewest edits. Ties between different names are left
+        unresolved rather than guessed.
+
+        Args:
+            text (str): Name typed by the player
+
+        Returns:
+            int or None: Id of the matched name
+        """
+        key = normalize_name(text)
+        if not key:
+            return None
+        if key in self._exact:
+            return self._exact[key]
+
+        completions = self._trie.complete(key)
+        if len(completions) == 1:
+            return completions[0]
+
+        matches = self.candidates(key)
+        if not matches:
+            return None
+        if len(matches) > 1:
+            first, second = matches[0][1], matches[1][1]
+            words = len(key.split(" "))
+            if (matches[0][0], self._word_counts[first] - words) == \
+                    (matches[1][0], self._word_counts[second] - words):
+                return None
+        return matches[0][1]
+
+    @staticmethod
+    def typo_budget(word: str) -> int:
+        """Edits tolerated in one word: none up to 3 letters, then 1, then 2"""
+        if len(word) <= 3:
+            return 0
+        return 1 if len(word) <= 6 else 2
+
+
+def parse_recall_answer(
+    answer: str,
+    matcher: ItemMatcher,
+    catalog: ItemMatcher = None
+) -> Tuple[List[int], List[str]]:
+    """
+    Parse a recall answer mixing item numbers and names
+
+    Entries are separated by commas. Numbers (ASCII digits, also
+    space-separated, as in ``"1 3 5"``) are 1-based positions in the
+    recall list; anything else is matched by name. When ``catalog`` is
+    given, a name that matches some other catalog item better than any
+    listed item is treated as a miss instead of being bent onto the list.
+
+    Args:
+        answer (str): Raw input, e.g. ``"1, funtion, spaghetti code"``
+        matcher (ItemMatcher): Matcher over the recall list
+        catalog (ItemMatcher, optional): Matcher over the whole catalog
+
+    Returns:
+        Tuple[List[int], List[str]]: (0-based recall indices, unresolved entries)
+
+    Example:
+        >>> matcher = ItemMatcher(["Clean function", "Spaghetti code"])
+        >>> parse_recall_answer("2, funtion", matcher)
+        ([1, 0], [])
+    """
+    indices: List[int] = []
+    unresolved: List[str] = []
+    for entry in answer.split(","):
+        entry = entry.strip()
+        if not entry:
+            continue
+        numbers = entry.split()
+        if all(n.isdecimal() and n.isascii() for n in numbers):  # Not "²" or "٣"
+            for n in numbers:
+                index = int(n) - 1
+                if not 0 <= index < len(matcher):
+                    unresolved.append(n)
+                elif index not in indices:
+                    indices.append(index)
+            continue
+
+        index = matcher.resolve(entry)
+        if index is not None and catalog is not None:
+            listed = normalize_name(matcher.names[index])
+            best = catalog.candidates(entry)
+            if best and normalize_name(catalog.names[best[0][1]]) != listed:
+                listed_distance = next(
+                    (d for d, i in best if normalize_name(catalog.names[i]) == listed), None
+                )
+                if listed_distance is None or best[0][0] < listed_distance:
+                    index = None
+        if index is None:
+            unresolved.append(entry)
+        elif index not in indices:
+            indices.append(index)
+    return indices, unresolved
+
+
+# Module-level test function
+def test_item_search():
+    """Test function to verify name completion and typo matching"""
+    import random
+    import time
+
+    print("\n" + "=" * 60)
+    print("  Item Search Test Suite")
+    print("=" * 60 + "\n")
+
+    from item_pool import ItemPool
+    pool = ItemPool()
+    names = [item.text for item in pool.all_items]
+    matcher = ItemMatcher(names)
+
+    # Test 1: Edit distance
+    print("[OK] Test 1: Edit Distance")
+    assert edit_distance("funtion", "function") == 1
+    assert edit_distance("kitten", "sitting") == 3
+    assert edit_distance("kitten", "sitting", limit=1) == 2
+    print("   funtion -> function: 1 edit")
+    print()
+
+    # Test 2: Prefix completion by name and by word
+    print("[OK] Test 2: Autocomplete")
+    hits = [names[i] for i in matcher.complete("code")]
+    assert "Code Review" in hits
+    word_hits = [names[i] for i in matcher.complete("func")]
+    assert word_hits == ["def function()"], word_hits
+    print(f"   'code' -> {hits}, 'func' -> {word_hits}")
+    print()
+
+    # Test 3: Typos resolve to the intended item
+    print("[OK] Test 3: Typo Resolution")
+    for typo, target in [("Spaced Repitition", "Spaced Repetition"),
+                         ("confirmaton bias", "Confirmation Bias"),
+                         ("Emergncy Fund", "Emergency Fund")]:
+        assert names[matcher.resolve(typo)] == target, typo
+        print(f"   '{typo}' -> '{target}'")
+    assert names[matcher.resolve("funtion()")] == "funtion()"
+    assert matcher.resolve("zzzzzzzz") is None
+    print()
+
+    # Test 4: Mixed recall answers
+    print("[OK] Test 4: Recall Parsing")
+    board = names[:6]
+    board_matcher = ItemMatcher(board)
+    answer = f"1, {board[2].upper()}, {board[3][:-1]}, 42 1, nonsense words"
+    indices, unresolved = parse_recall_answer(answer, board_matcher, matcher)
+    assert indices == [0, 2, 3], indices
+    assert unresolved == ["42", "nonsense words"], unresolved
+    print(f"   {answer!r} -> {indices}")
+    off_board = names[40]
+    indices, unresolved = parse_recall_answer(off_board, board_matcher, matcher)
+    assert indices == [] and unresolved == [off_board]
+    print(f"   {off_board!r} is not on the board -> ignored")
+    indices, unresolved = parse_recall_answer("2, ², ٣", board_matcher, matcher)
+    assert indices == [1] and unresolved == ["²", "٣"], (indices, unresolved)
+    print()
+
+    # Test 5: Completion cost does not grow with the catalog
+    print("[OK] Test 5: Keystroke Latency")
+    rng = random.Random(0)
+    words = ["clean", "code", "review", "secure", "token", "cache", "index", "query"]
+    big = [f"{rng.choice(words)} {rng.choice(words)} {n}" for n in range(20000)]
+    big_matcher = ItemMatcher(big)
+    start = time.perf_counter()
+    for prefix in ("c", "cl", "cle", "clea", "clean", "clean c", "clean co") * 1000:
+        big_matcher.complete(prefix)
+    per_query_us = (time.perf_counter() - start) / 7000 * 1e6
+    assert per_query_us < 1000
+    print(f"   {len(big):,} names, {per_query_us:.1f} us per keystroke")
+    start = time.perf_counter()
+    typo = big[1234].replace("e", "ee", 1)
+    assert big_matcher.resolve(typo) == 1234
+    print(f"   First typo lookup (builds BK-tree): {(time.perf_counter() - start) * 1000:.1f} ms")
+    print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Item Search Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_item_search()
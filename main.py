@@ -11,7 +11,6 @@ Version: 1.0
 import sys
 import os
 import time
-import random
 
 # Fix Windows console encoding
 if sys.platform == "win32":
@@ -30,7 +29,12 @@ from game_engine import (
     GameDisplay,
     console
 )
-from item_pool import ItemPool, ItemDisplay
+from item_pool import ItemPool, ItemDisplay, DealScheduler, new_session_seed, session_rng
+from deal_catalog import DealCatalog
+from item_search import ItemMatcher, parse_recall_answer
+from percentiles import PercentileStore
+from high_scores import HighScore, HighScoreStore
+from event_log import EventLog, GameHeader, player_key
 
 class ForgetToWinGame:
     """
@@ -41,11 +45,41 @@ class ForgetToWinGame:
     the game lifecycle (start, play, end).
     """
     
-    def __init__(self):
-        """Initialize game with fresh state"""
+    def __init__(self, deal_catalog: DealCatalog = None, seed: int = None, scheduler: DealScheduler = None,
+                 percentiles: PercentileStore = None, high_scores: HighScoreStore = None,
+                 player: str = "player", event_log: EventLog = None):
+        """
+        Initialize game with fresh state
+        
+        Args:
+            deal_catalog (DealCatalog, optional): Pre-generated deals to serve
+                levels from instead of sampling items at play time
+            seed (int, optional): Session seed; the same seed replays the
+                same deals. If omitted, a fresh seed is drawn that avoids
+                the items of the player's last games.
+            scheduler (DealScheduler, optional): Scheduler carried over from
+                the previous game so its item cooldown applies across games
+            percentiles (PercentileStore, optional): Score history to rank
+                the final score against; the game is added to it
+            high_scores (HighScoreStore, optional): Where finished games are saved
+            player (str): Name recorded with the player's games
+            event_log (EventLog, optional): Log that finished games are appended to
+        """
         self.level_manager = LevelManager()
-        self.item_pool = ItemPool()
+        self.scheduler = scheduler or DealScheduler(
+            ItemPool(), cooldown_games=GameConfig.DEAL_COOLDOWN_GAMES
+        )
+        self.item_pool = self.scheduler.pool
+        self.deal_catalog = deal_catalog
+        self.game_deal = None
+        self.replay = seed is not None
+        self.seed = seed if self.replay else new_session_seed()
+        self.deal_number = None
         self.game_start_time = None
+        self.percentiles = percentiles
+        self.high_scores = high_scores
+        self.player = player
+        self.event_log = event_log
     
     def run(self):
         """
@@ -60,6 +94,19 @@ class ForgetToWinGame:
         self.show_title_screen()
         self.game_start_time = time.time()
         
+        if self.deal_catalog is not None:
+            self.deal_number = session_rng(self.seed, "deal_number").randrange(len(self.deal_catalog))
+        else:
+            # The seed is shown for replay, so the deal must follow from it alone:
+            # the cooldown picks a fresh game's seed instead of filtering its deal
+            if not self.replay:
+                self.seed = self.scheduler.pick_seed(GameConfig.LEVELS, player_id="local")
+            # Deal all levels up front so no item repeats within the game
+            self.game_deal = self.scheduler.deal_game(
+                GameConfig.LEVELS,
+                rng=session_rng(self.seed, "deal")
+            )
+        
         # Play all 5 levels
         for level_num in range(1, 6):
             self.play_level(level_num)
@@ -67,8 +114,37 @@ class ForgetToWinGame:
         # Calculate total time
         total_time = time.time() - self.game_start_time
         
+        # Rank against earlier games, then add this one
+        standing = None
+        if self.percentiles is not None:
+            level_scores = {r.level_number: r.total_score for r in self.level_manager.level_results}
+            standing = self.percentiles.percentiles(level_scores, self.level_manager.total_score)
+            self.percentiles.record_game(level_scores, self.level_manager.total_score)
+        if self.high_scores is not None:
+            results = self.level_manager.level_results
+            self.high_scores.record(HighScore(
+                player=self.player,
+                score=self.level_manager.total_score,
+                accuracy=sum(r.accuracy for r in results) / len(results) if results else 0.0,
+                duration=total_time,
+                played_at=time.time(),
+                seed=str(self.seed)
+            ))
+            self.high_scores.flush()
+        if self.event_log is not None:
+            results = self.level_manager.level_results
+            self.event_log.append_game(GameHeader(
+                game_id=new_session_seed(),
+                player_id=player_key(self.player),
+                seed=self.seed % 2**64,  # --seed accepts any integer
+                finished_at=time.time(),
+                total_score=self.level_manager.total_score,
+                level_count=len(results)
+            ), results)
+        
         # Show final results
-        self.level_manager.display_final_results(total_time)
+        self.level_manager.display_final_results(total_time, session_rng(self.seed, "tip"), standing)
+        console.print(f"[dim]Game seed: {self.seed} (replay with --seed {self.seed})[/dim]", justify="center")
         
         # Post-game menu
         self.show_menu()
@@ -154,17 +230,19 @@ class ForgetToWinGame:
         self.level_manager.start_level(level_num)
         config = self.level_manager.get_level_config(level_num)
         
-        # Get random items
-        good_items, bad_items = self.item_pool.get_level_items(
-            config["good_items"],
-            config["bad_items"]
-        )
+        # Get items: a pre-generated deal if available, else this game's deal
+        display_items = recall_items = None
+        if self.deal_catalog is not None:
+            deal = self.deal_catalog.level(self.deal_number, level_num)
+            good_items, bad_items, display_items, recall_items = deal.items(self.item_pool)
+        else:
+            good_items, bad_items = self.game_deal[level_num]
         
         # Memorization phase
-        self.memorization_phase(level_num, good_items, bad_items, config["display_time"])
+        self.memorization_phase(level_num, good_items, bad_items, config["display_time"], display_items)
         
         # Recall phase
-        selected_items = self.recall_phase(good_items, bad_items, level_num)
+        selected_items = self.recall_phase(good_items, bad_items, level_num, recall_items)
         
         # Calculate results
         result = self.calculate_level_result(
@@ -183,7 +261,7 @@ class ForgetToWinGame:
         if level_num < 5:
             input("\nPress ENTER to continue to next level...")
     
-    def memorization_phase(self, level_num: int, good_items, bad_items, display_time: int):
+    def memorization_phase(self, level_num: int, good_items, bad_items, display_time: int, display_items=None):
         """
         Memorization phase - show items with symbols
         
@@ -192,6 +270,7 @@ class ForgetToWinGame:
             good_items (List[Item]): Good items to remember
             bad_items (List[Item]): Bad items to forget
             display_time (int): Time to display items (seconds)
+            display_items (List[Item], optional): Pre-shuffled display order
         """
         console.clear()
         
@@ -199,7 +278,9 @@ class ForgetToWinGame:
         GameDisplay.show_level_header(level_num, self.level_manager.total_score)
         
         # Shuffle and display items
-        all_items = ItemPool.shuffle_display_items(good_items, bad_items)
+        all_items = display_items or ItemPool.shuffle_display_items(
+            good_items, bad_items, session_rng(self.seed, level_num, "display")
+        )
         grid = ItemDisplay.format_grid(all_items, columns=3)
         
         console.print("\n")
@@ -215,7 +296,7 @@ class ForgetToWinGame:
         console.print("\n[bold cyan]Time's up! Get ready to recall...[/bold cyan]", justify="center")
         time.sleep(1)
     
-    def recall_phase(self, good_items, bad_items, level_num: int):
+    def recall_phase(self, good_items, bad_items, level_num: int, recall_items=None):
         """
         Recall phase - user selects items they remember with dynamic typing timer
         Uses prompt_toolkit Application with custom layout for live timer display
@@ -224,6 +305,7 @@ class ForgetToWinGame:
             good_items (List[Item]): Good items (correct answers)
             bad_items (List[Item]): Bad items (should not select)
             level_num (int): Current level number for timer configuration
+            recall_items (List[Item], optional): Pre-shuffled recall order
         
         Returns:
             Set[Item]: Items selected by user
@@ -236,13 +318,26 @@ class ForgetToWinGame:
         from prompt_toolkit.buffer import Buffer
         from prompt_toolkit.layout.containers import WindowAlign
         from prompt_toolkit.widgets import TextArea
+        from prompt_toolkit.completion import Completer, Completion
         from rich.panel import Panel
         
         console.clear()
         
         # Shuffle items again (different order)
-        all_items = ItemPool.shuffle_display_items(good_items, bad_items)
+        all_items = recall_items or ItemPool.shuffle_display_items(
+            good_items, bad_items, session_rng(self.seed, level_num, "recall")
+        )
         recall_list = ItemDisplay.format_recall_list(all_items)
+        matcher = ItemMatcher(item.text for item in all_items)
+        
+        class RecallCompleter(Completer):
+            """Complete the entry after the last comma from the recall list"""
+            def get_completions(self, document, complete_event):
+                entry = document.text_before_cursor.rsplit(",", 1)[-1].lstrip()
+                if not entry or entry.isdigit():
+                    return
+                for i in matcher.complete(entry):
+                    yield Completion(matcher.names[i], start_position=-len(entry))
         
         # Get typing time for this level
         typing_time = GameConfig.TYPING_TIME.get(level_num, 30)
@@ -309,11 +404,13 @@ class ForgetToWinGame:
             prompt="➤ ",
             multiline=False,
             focusable=True,
-            focus_on_click=True
+            focus_on_click=True,
+            completer=RecallCompleter(),
+            complete_while_typing=True
         )
         
         # Create instruction window
-        instruction_text = "Enter item numbers (comma-separated, e.g., 1,3,5) - Press Enter to submit"
+        instruction_text = "Enter item numbers or names (comma-separated, e.g., 1, 3, water) - Press Enter to submit"
         instruction_window = Window(
             content=FormattedTextControl(text=instruction_text),
             height=1,
@@ -409,39 +506,20 @@ class ForgetToWinGame:
                 time.sleep(1)
                 return set()
             
-            # Parse input
-            selected_indices = [int(x.strip()) - 1 for x in answer.split(',')]
-            
-            # Validate indices
-            if any(i < 0 or i >= len(all_items) for i in selected_indices):
-                console.print("[bold yellow]Warning: Some invalid item numbers detected. Using valid entries only...[/bold yellow]")
-                # Filter out invalid indices
-                selected_indices = [i for i in selected_indices if 0 <= i < len(all_items)]
-                if not selected_indices:
-                    time.sleep(1)
-                    return set()
+            # Numbers index the recall list; names are matched (typos allowed)
+            selected_indices, unresolved = parse_recall_answer(
+                answer, matcher, self.item_pool.search_index()
+            )
+            if unresolved:
+                console.print(
+                    "[bold yellow]Warning: Not on the list, ignored: "
+                    f"{', '.join(unresolved)}[/bold yellow]"
+                )
+                time.sleep(1)
             
             # Map to items
-            selected_items = {all_items[i] for i in selected_indices}
-            return selected_items
+            return {all_items[i] for i in selected_indices}
             
-        except ValueError:
-            console.print("[bold red]Invalid format detected! Attempting to parse valid numbers...[/bold red]")
-            # Try to extract valid numbers
-            import re
-            numbers = re.findall(r'\d+', answer)
-            if numbers:
-                try:
-                    selected_indices = [int(n) - 1 for n in numbers]
-                    selected_indices = [i for i in selected_indices if 0 <= i < len(all_items)]
-                    if selected_indices:
-                        selected_items = {all_items[i] for i in selected_indices}
-                        time.sleep(1)
-                        return selected_items
-                except:
-                    pass
-            time.sleep(1)
-            return set()
         except KeyboardInterrupt:
             console.print("\n[bold red]Game interrupted![/bold red]")
             exit(0)
@@ -512,7 +590,7 @@ class ForgetToWinGame:
         
         Options:
         - Play Again (P)
-        - High Scores (H) - Coming soon
+        - High Scores (H)
         - Quit (Q)
         """
         console.print("\n" * 2)
@@ -540,7 +618,9 @@ class ForgetToWinGame:
         if choice == "p":
             console.print("\n[bold green]Starting new game...[/bold green]\n")
             time.sleep(0.5)
-            self.__init__()  # Reset game
+            self.__init__(self.deal_catalog, scheduler=self.scheduler, percentiles=self.percentiles,
+                          high_scores=self.high_scores, player=self.player,
+                          event_log=self.event_log)  # Reset game
             self.run()
         elif choice == "h":
             self.show_high_scores()
@@ -548,14 +628,40 @@ class ForgetToWinGame:
             self.show_goodbye()
     
     def show_high_scores(self):
-        """Display high scores (placeholder for v1.1)"""
+        """Display the top 10 games and the player's best"""
+        from rich.table import Table
+        
         console.clear()
         console.print("\n" * 3)
         console.print("[bold yellow]" + "=" * 60 + "[/bold yellow]")
         console.print("[bold bright_cyan]                    HIGH SCORES[/bold bright_cyan]", justify="center")
         console.print("[bold yellow]" + "=" * 60 + "[/bold yellow]\n")
-        console.print("[bold cyan]This feature is coming soon in v1.1![/bold cyan]", justify="center")
-        console.print("[dim]High scores will be saved and displayed here.[/dim]", justify="center")
+        
+        top = self.high_scores.top(10) if self.high_scores is not None else []
+        if top:
+            table = Table(show_header=True, header_style="bold cyan", border_style="yellow")
+            table.add_column("#", justify="right")
+            table.add_column("Player")
+            table.add_column("Score", justify="right", style="bold yellow")
+            table.add_column("Accuracy", justify="right")
+            table.add_column("Date")
+            for place, game in enumerate(top, 1):
+                style = "bold green" if game.player == self.player else None
+                table.add_row(
+                    str(place), game.player, str(game.score), f"{game.accuracy:.1f}%",
+                    time.strftime("%Y-%m-%d", time.localtime(game.played_at)), style=style
+                )
+            console.print(table, justify="center")
+            
+            best = self.high_scores.best(self.player)
+            if best is not None:
+                console.print(
+                    f"\n[bold cyan]Your best: {best.score} pts ({best.accuracy:.1f}%) "
+                    f"- replay with --seed {best.seed}[/bold cyan]",
+                    justify="center"
+                )
+        else:
+            console.print("[bold cyan]No games recorded yet. Finish a game to get on the board![/bold cyan]", justify="center")
         console.print("\n[bold yellow]Press ENTER to return to menu...[/bold yellow]", justify="center")
         input()
         self.show_menu()
@@ -575,8 +681,26 @@ class ForgetToWinGame:
 
 def main():
     """Main entry point"""
+    import argparse
+    import getpass
+    
+    parser = argparse.ArgumentParser(description="Forget to Win")
+    parser.add_argument("--deals", help="Pre-generated deal file (see deal_catalog.py)")
+    parser.add_argument("--seed", type=int, help="Replay the game with this session seed")
+    parser.add_argument("--stats", default=GameConfig.PERCENTILE_DIR,
+                        help="Directory for score percentiles and high scores (default: %(default)s)")
+    parser.add_argument("--player", default=getpass.getuser(), help="Name for the high-score table")
+    args = parser.parse_args()
+    
+    high_scores = None
+    event_log = None
     try:
-        game = ForgetToWinGame()
+        deal_catalog = DealCatalog.open(args.deals, ItemPool()) if args.deals else None
+        percentiles = PercentileStore(args.stats, worker_id="local", flush_every=1)
+        high_scores = HighScoreStore(os.path.join(args.stats, "high_scores.db"))
+        event_log = EventLog(os.path.join(args.stats, "events"))
+        game = ForgetToWinGame(deal_catalog, args.seed, percentiles=percentiles,
+                               high_scores=high_scores, player=args.player, event_log=event_log)
         game.run()
     except KeyboardInterrupt:
         console.print("\n\n[bold red]Game interrupted! Goodbye![/bold red]")
@@ -584,6 +708,11 @@ def main():
         console.print(f"\n\n[bold red]An error occurred: {e}[/bold red]")
         import traceback
         traceback.print_exc()
+    finally:
+        if high_scores is not None:
+            high_scores.close()
+        if event_log is not None:
+            event_log.close()
 
 
 if __name__ == "__main__":
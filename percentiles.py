@@ -0,0 +1,540 @@
+"""
+Forget to Win - Player Percentiles
+
+This module answers "you beat X% of players" without keeping or sorting
+the full score history. Each score stream (overall and per level) feeds a
+KLL quantile sketch: a stack of compactors that keeps O(k log(n/k))
+samples with weights and bounds the rank error to about 1.7/k.
+
+Sketches are mergeable, so every worker keeps its own, persists it to a
+file now and then, and reads the other workers' files back. Rank counts
+add across sketches, so a query sums the ranks from the local and peer
+sketches (one bisect each) without merging them.
+
+Classes:
+    - KLLSketch: Mergeable streaming quantile sketch
+    - PercentileBoard: One sketch per score stream
+    - PercentileStore: Per-worker board with periodic persistence
+
+Author: Development Team
+Version: 1.0
+"""
+
+from bisect import bisect_left, bisect_right, insort
+import glob
+import itertools
+import json
+import math
+import os
+import random
+import tempfile
+import threading
+import time
+from typing import Dict, Iterable, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # No file locks (Windows): workers are named by pid
+    fcntl = None
+
+OVERALL = "overall"
+
+
+def level_key(level: int) -> str:
+    """Stream name for one level's scores"""
+    return f"level:{level}"
+
+
+class KLLSketch:
+    """
+    KLL streaming quantile sketch
+
+    Level h holds samples of weight 2**h. When the sketch is full, the
+    lowest full level is sorted and every other sample (random offset) is
+    promoted to the next level. Capacities shrink geometrically by ``c``
+    towards the lower levels, so the sketch stays O(k log(n/k)) in size.
+
+    Rank queries bisect a sorted copy of the samples. Values added since
+    that copy was made are kept in a short sorted list beside it, so the
+    copy is only rebuilt after a compaction or every ``RECENT_LIMIT``
+    updates rather than after each one.
+
+    Example:
+        >>> sketch = KLLSketch(seed=0)
+        >>> for score in range(1000):
+        ...     sketch.update(score)
+        >>> round(sketch.rank(500) / sketch.n, 1)
+        0.5
+    """
+
+    RECENT_LIMIT = 64
+
+    def __init__(self, k: int = 200, c: float = 2 / 3, seed: int = None):
+        """
+        Args:
+            k (int): Accuracy parameter (top-level capacity)
+            c (float): Capacity ratio between consecutive levels
+            seed (int, optional): Seed for compaction coin flips
+        """
+        self.k = k
+        self.c = c
+        self.n = 0
+        self.compactors: List[List[float]] = [[]]
+        self._size = 0
+        self._max_size = self._capacity(0)
+        self._rng = random.Random(seed)
+        self._cdf: Optional[Tuple[List[float], List[int]]] = None
+        self._recent: List[float] = []  # Sorted; weight 1, not yet in _cdf
+
+    def _capacity(self, level: int) -> int:
+        """Capacity of ``level`` given the current height"""
+        depth = len(self.compactors) - level - 1
+        return int(math.ceil(self.k * self.c ** depth)) + 1
+
+    def _grow(self):
+        """Add a level on top and recompute the total capacity"""
+        self.compactors.append([])
+        self._max_size = sum(self._capacity(h) for h in range(len(self.compactors)))
+
+    def update(self, value: float):
+        """Add one value in amortized O(1)"""
+        self.compactors[0].append(value)
+        self._size += 1
+        self.n += 1
+        if self._size >= self._max_size:
+            self._compress()
+            self._invalidate()
+        elif self._cdf is not None:
+            if len(self._recent) < self.RECENT_LIMIT:
+                insort(self._recent, value)
+            else:
+                self._invalidate()
+
+    def _invalidate(self):
+        """Drop the sorted copy of the samples"""
+        self._cdf = None
+        self._recent = []
+
+    def _compress(self):
+        """Compact full levels until the sketch is under capacity"""
+        for h in range(len(self.compactors)):
+            items = self.compactors[h]
+            if len(items) < self._capacity(h):
+                continue
+            if h + 1 >= len(self.compactors):
+                self._grow()
+            items.sort()
+            # An odd sample out stays behind at this level
+            keep = [items.pop()] if len(items) % 2 else []
+            self.compactors[h + 1].extend(items[self._rng.random() < 0.5::2])
+            self.compactors[h] = keep
+            self._size = sum(len(level) for level in self.compactors)
+            if self._size < self._max_size:
+                break
+
+    def merge(self, other: "KLLSketch"):
+        """
+        Fold another sketch into this one
+
+        Args:
+            other (KLLSketch): Sketch to merge (left unchanged)
+        """
+        while len(self.compactors) < len(other.compactors):
+            self._grow()
+        for h, items in enumerate(other.compactors):
+            self.compactors[h].extend(items)
+        self.n += other.n
+        self._size = sum(len(level) for level in self.compactors)
+        self._invalidate()
+        while self._size >= self._max_size:
+            self._compress()
+
+    def _weighted(self) -> Tuple[List[float], List[int]]:
+        """Sorted sample values and cumulative weights (without ``_recent``)"""
+        if self._cdf is None:
+            samples = sorted(
+                (value, 1 << h)
+                for h, items in enumerate(self.compactors)
+                for value in items
+            )
+            values = [value for value, _ in samples]
+            cumulative = []
+            total = 0
+            for _, weight in samples:
+                total += weight
+                cumulative.append(total)
+            self._cdf = (values, cumulative)
+        return self._cdf
+
+    def rank(self, value: float, inclusive: bool = True) -> int:
+        """
+        Estimated number of values <= ``value`` (< when not inclusive)
+
+        Two bisects, over the samples and the recent values: O(log n)
+        once the sketch is built.
+        """
+        values, cumulative = self._weighted()
+        bisect = bisect_right if inclusive else bisect_left
+        i = bisect(values, value)
+        return (cumulative[i - 1] if i else 0) + bisect(self._recent, value)
+
+    def quantile(self, q: float) -> Optional[float]:
+        """
+        Estimated value at quantile ``q`` (0.0 - 1.0)
+
+        Returns:
+            float or None: None for an empty sketch
+        """
+        if self._recent:
+            self._invalidate()
+        values, cumulative = self._weighted()
+        if not values:
+            return None
+        target = q * cumulative[-1]
+        return values[min(bisect_left(cumulative, target), len(values) - 1)]
+
+    def to_dict(self) -> Dict:
+        """JSON-serializable state"""
+        return {"k": self.k, "c": self.c, "n": self.n, "compactors": self.compactors}
+
+    @classmethod
+    def from_dict(cls, data: Dict, seed: int = None) -> "KLLSketch":
+        """Rebuild a sketch saved with ``to_dict``"""
+        sketch = cls(data["k"], data["c"], seed)
+        sketch.compactors = [list(level) for level in data["compactors"]] or [[]]
+        sketch.n = data["n"]
+        sketch._size = sum(len(level) for level in sketch.compactors)
+        sketch._max_size = sum(sketch._capacity(h) for h in range(len(sketch.compactors)))
+        return sketch
+
+
+class PercentileBoard:
+    """
+    Sketches for the overall score and each level's score
+
+    Example:
+        >>> board = PercentileBoard()
+        >>> board.record_game({1: 30, 2: 35}, 65)
+        >>> board.count(OVERALL)
+        1
+    """
+
+    def __init__(self, k: int = 200):
+        """
+        Args:
+            k (int): Accuracy parameter for new sketches
+        """
+        self.k = k
+        self.sketches: Dict[str, KLLSketch] = {}
+
+    def _sketch(self, stream: str) -> KLLSketch:
+        sketch = self.sketches.get(stream)
+        if sketch is None:
+            sketch = self.sketches[stream] = KLLSketch(self.k)
+        return sketch
+
+    def record_game(self, level_scores: Dict[int, int], total_score: int):
+        """
+        Add one completed game
+
+        Args:
+            level_scores (Dict[int, int]): Score per level number
+            total_score (int): Final score
+        """
+        for level, score in level_scores.items():
+            self._sketch(level_key(level)).update(score)
+        self._sketch(OVERALL).update(total_score)
+
+    def count(self, stream: str) -> int:
+        """Games recorded on ``stream``"""
+        sketch = self.sketches.get(stream)
+        return sketch.n if sketch else 0
+
+    def below(self, stream: str, score: float) -> int:
+        """Estimated number of recorded scores strictly below ``score``"""
+        sketch = self.sketches.get(stream)
+        return sketch.rank(score, inclusive=False) if sketch else 0
+
+    def merge(self, other: "PercentileBoard"):
+        """Fold another board into this one"""
+        for stream, sketch in other.sketches.items():
+            self._sketch(stream).merge(sketch)
+
+    def to_dict(self) -> Dict:
+        return {"k": self.k, "sketches": {s: sk.to_dict() for s, sk in self.sketches.items()}}
+
+    @classmethod
+    def from_dict(cls, data: Dict) -> "PercentileBoard":
+        board = cls(data.get("k", 200))
+        board.sketches = {s: KLLSketch.from_dict(sk) for s, sk in data["sketches"].items()}
+        return board
+
+
+def percentile_of(boards: Iterable[PercentileBoard], stream: str, score: float) -> Optional[float]:
+    """
+    Share of recorded scores below ``score`` across several boards
+
+    Returns:
+        float or None: Percentage 0 - 100, None if nothing is recorded
+    """
+    boards = list(boards)
+    total = sum(board.count(stream) for board in boards)
+    if not total:
+        return None
+    return sum(board.below(stream, score) for board in boards) / total * 100
+
+
+class PercentileStore:
+    """
+    A worker's board, persisted periodically and combined with its peers
+
+    Every worker writes ``percentiles-<worker>.json`` in a shared
+    directory (atomically, via rename) after ``flush_every`` games or
+    ``flush_seconds``, whichever comes first, and reloads the other
+    workers' files at the same time.
+
+    Without a ``worker_id``, a worker takes the lowest numbered slot not
+    held by a running worker (a lock file it keeps locked), so a restarted
+    worker picks up a previous worker's file instead of adding one; the
+    number of files stays at the most workers ever run at once.
+
+    Example:
+        >>> store = PercentileStore("stats", worker_id="local")
+        >>> store.percentiles({1: 30}, 30)
+        {'overall': None, 'levels': {1: None}}
+        >>> store.record_game({1: 30}, 30)
+    """
+
+    FILE_PATTERN = "percentiles-{}.json"
+    LOCK_PATTERN = "percentiles-{}.lock"
+
+    def __init__(self, directory: str, worker_id: str = None,
+                 flush_every: int = 50, flush_seconds: float = 60.0, k: int = 200):
+        """
+        Args:
+            directory (str): Shared directory for worker files
+            worker_id (str, optional): This worker's file name part (default:
+                a free slot number, or the pid where files cannot be locked)
+            flush_every (int): Games between writes
+            flush_seconds (float): Longest time between writes
+            k (int): Sketch accuracy parameter
+        """
+        self.directory = directory
+        self.flush_every = flush_every
+        self.flush_seconds = flush_seconds
+        self._lock = threading.Lock()  # Guards the boards and counters
+        self._flush_lock = threading.Lock()  # One writer of the worker file at a time
+        self._slot_file = None
+        self._pending = 0
+        self._last_flush = time.monotonic()
+
+        os.makedirs(directory, exist_ok=True)
+        self.worker_id = worker_id or self._claim_slot()
+        self.path = os.path.join(directory, self.FILE_PATTERN.format(self.worker_id))
+        self.local = self._read(self.path) or PercentileBoard(k)
+        self.peers = self._read_peers()
+
+    def _claim_slot(self) -> str:
+        """Lowest slot number whose lock no running worker holds"""
+        if fcntl is None:
+            return str(os.getpid())
+        for slot in itertools.count():
+            f = open(os.path.join(self.directory, self.LOCK_PATTERN.format(slot)), "a")
+            try:
+                fcntl.flock(f, fcntl.LOCK_EX | fcntl.LOCK_NB)
+            except OSError:
+                f.close()
+                continue
+            self._slot_file = f  # Held until the worker exits
+            return str(slot)
+
+    @staticmethod
+    def _read(path: str) -> Optional[PercentileBoard]:
+        """Board saved at ``path``; None if missing or unreadable"""
+        try:
+            with open(path, encoding="utf-8") as f:
+                return PercentileBoard.from_dict(json.load(f))
+        except (OSError, ValueError, KeyError):
+            return None
+
+    def _read_peers(self) -> PercentileBoard:
+        """Merge every other worker's saved board"""
+        merged = PercentileBoard(self.local.k)
+        pattern = os.path.join(self.directory, self.FILE_PATTERN.format("*"))
+        for path in glob.glob(pattern):
+            if os.path.abspath(path) != os.path.abspath(self.path):
+                board = self._read(path)
+                if board is not None:
+                    merged.merge(board)
+        return merged
+
+    def percentiles(self, level_scores: Dict[int, int], total_score: int) -> Dict:
+        """
+        Percent of recorded games each score beats
+
+        Args:
+            level_scores (Dict[int, int]): Score per level number
+            total_score (int): Final score
+
+        Returns:
+            Dict: ``{"overall": pct, "levels": {level: pct}}``; a value is
+            None while its stream has no games yet
+        """
+        with self._lock:
+            boards = (self.local, self.peers)
+            return {
+                OVERALL: percentile_of(boards, OVERALL, total_score),
+                "levels": {
+                    level: percentile_of(boards, level_key(level), score)
+                    for level, score in level_scores.items()
+                },
+            }
+
+    def record_game(self, level_scores: Dict[int, int], total_score: int):
+        """Add a completed game; writes the board when a flush is due"""
+        with self._lock:
+            self.local.record_game(level_scores, total_score)
+            self._pending += 1
+            due = (
+                self._pending >= self.flush_every
+                or time.monotonic() - self._last_flush >= self.flush_seconds
+            )
+        if due:
+            self.flush()
+
+    def flush(self):
+        """Write the local board and reload the peers"""
+        with self._flush_lock:
+            with self._lock:
+                data = json.dumps(self.local.to_dict(), separators=(",", ":"))
+                self._pending = 0
+                self._last_flush = time.monotonic()
+            fd, tmp = tempfile.mkstemp(prefix=os.path.basename(self.path) + ".", suffix=".tmp",
+                                       dir=self.directory)
+            try:
+                with os.fdopen(fd, "w", encoding="utf-8") as f:
+                    f.write(data)
+                os.replace(tmp, self.path)
+            except BaseException:
+                os.unlink(tmp)
+                raise
+            peers = self._read_peers()
+            with self._lock:
+                self.peers = peers
+
+
+# Module-level test function
+def test_percentiles():
+    """Test function to verify sketch accuracy, merging and persistence"""
+    import tempfile
+
+    print("\n" + "=" * 60)
+    print("  Percentile Engine Test Suite")
+    print("=" * 60 + "\n")
+
+    rng = random.Random(1)
+    scores = [rng.gauss(120, 40) for _ in range(200000)]
+    ordered = sorted(scores)
+
+    # Test 1: Rank error stays within a few percent
+    print("[OK] Test 1: Sketch Accuracy")
+    sketch = KLLSketch(seed=1)
+    for score in scores:
+        sketch.update(score)
+    samples = sum(len(level) for level in sketch.compactors)
+    worst = max(
+        abs(sketch.rank(x) - bisect_right(ordered, x)) / len(scores)
+        for x in (ordered[int(q * (len(ordered) - 1))] for q in (0.01, 0.1, 0.25, 0.5, 0.75, 0.9, 0.99))
+    )
+    assert worst < 0.02, worst
+    print(f"   {len(scores):,} scores in {samples} samples, worst rank error {worst:.2%}")
+    print()
+
+    # Test 2: Merged worker sketches agree with one sketch
+    print("[OK] Test 2: Mergeable Sketches")
+    workers = [KLLSketch(seed=w) for w in range(4)]
+    for i, score in enumerate(scores):
+        workers[i % 4].update(score)
+    merged = KLLSketch(seed=9)
+    for worker in workers:
+        merged.merge(worker)
+    assert merged.n == len(scores)
+    median = merged.quantile(0.5)
+    assert abs(bisect_right(ordered, median) / len(scores) - 0.5) < 0.02
+    print(f"   4 workers merged, median {median:.1f} (exact {ordered[len(ordered) // 2]:.1f})")
+    print()
+
+    # Test 3: Small streams are exact
+    print("[OK] Test 3: Exact Below Capacity")
+    board = PercentileBoard()
+    for total in range(100):
+        board.record_game({1: total % 30}, total)
+    assert percentile_of([board], OVERALL, 50) == 50.0
+    assert percentile_of([board], level_key(2), 10) is None
+    print("   Score 50 beats 50.0% of 100 games")
+    print()
+
+    # Test 4: Workers persist and read each other
+    print("[OK] Test 4: Persistence Across Workers")
+    with tempfile.TemporaryDirectory() as tmp:
+        a = PercentileStore(tmp, worker_id="a", flush_every=10)
+        b = PercentileStore(tmp, worker_id="b", flush_every=10)
+        for total in range(10):
+            a.record_game({1: total}, total)
+        assert b.percentiles({1: 5}, 5)[OVERALL] is None
+        b.flush()
+        result = b.percentiles({1: 5}, 5)
+        assert result == {OVERALL: 50.0, "levels": {1: 50.0}}, result
+        reopened = PercentileStore(tmp, worker_id="a")
+        assert reopened.local.count(OVERALL) == 10
+        print(f"   Worker b sees worker a's games: {result}")
+    print()
+
+    # Test 5: Concurrent flushes, and slots reused across restarts
+    print("[OK] Test 5: Concurrent Flushes")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = PercentileStore(tmp, flush_every=1)
+        threads = [
+            threading.Thread(target=lambda: [store.record_game({1: n}, n) for n in range(50)])
+            for _ in range(8)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert store.local.count(OVERALL) == 400
+        assert not glob.glob(os.path.join(tmp, "*.tmp")), "Temp files must not be left behind"
+        if fcntl is not None:
+            other = PercentileStore(tmp)
+            assert other.worker_id != store.worker_id, "A running worker's slot is not shared"
+            store._slot_file.close()  # The worker exits
+            restarted = PercentileStore(tmp)
+            assert restarted.worker_id == store.worker_id and restarted.local.count(OVERALL) == 400
+            other._slot_file.close()
+            restarted._slot_file.close()
+        print(f"   8 threads, 400 games, files: {sorted(os.listdir(tmp))}")
+    print()
+
+    # Test 6: Ranks see every update without rebuilding after each one
+    print("[OK] Test 6: Incremental Ranks")
+    sketch = KLLSketch(seed=2)
+    exact = []
+    for n in range(5000):
+        value = rng.random()
+        sketch.update(value)
+        insort(exact, value)
+        if n < 150:  # Exact below capacity, with a query after every update
+            assert sketch.rank(value) == bisect_right(exact, value)
+            assert sketch.rank(value, inclusive=False) == bisect_left(exact, value)
+    assert abs(sketch.rank(0.5) / sketch.n - bisect_right(exact, 0.5) / len(exact)) < 0.02
+    assert abs(sketch.quantile(0.5) - 0.5) < 0.03
+    print()
+
+    print("=" * 60)
+    print("  SUCCESS: All Percentile Engine Tests Passed!")
+    print("=" * 60 + "\n")
+
+
+if __name__ == "__main__":
+    # Run tests when module is executed directly
+    test_percentiles()